@@ -1,11 +1,27 @@
 from tests.test_saucelabs import SauceLabsTest
 from tests.test_data import login_search_data
+from pages.screenshots import ScreenshotPipeline
+from pages.screenshot_store import ScreenshotStore
+from pages.instrumentation import StepMetrics
+from pages.locator_registry import LocatorRegistry
+from pages.timeouts import TimeoutModel
+from utils.data_provider import DataProvider
 import time
 import allure
 import os
 import inspect
 
-def main():
+def main(workers=1):
+    # DATA_SOURCE, DATA_SAMPLE, DATA_OFFSET and DATA_LIMIT select the rows; see utils.data_provider
+    rows = DataProvider.from_environment(login_search_data)
+    if workers > 1:
+        # Each worker process owns its browser and its screenshots/<worker> directory
+        from utils.parallel_runner import run_flows_parallel
+        for search_term, success in run_flows_parallel(rows, workers):
+            status = "Successfully completed" if success else "Failed to complete"
+            print(f"{status} flow for {search_term}")
+        return
+
     print("Validating changes: Screenshots will only be taken on failures, not successes...")
     
     test = SauceLabsTest()
@@ -20,14 +36,15 @@ def main():
     if not os.path.exists(screenshots_dir):
         os.makedirs(screenshots_dir)
     
-    initial_screenshot_count = len([f for f in os.listdir(screenshots_dir) if f.endswith('.png')])
+    screenshot_store = ScreenshotStore.for_directory(screenshots_dir)
+    initial_screenshot_count = len(screenshot_store.entries())
     print(f"Initial screenshot count: {initial_screenshot_count}")
     
     try:
         print("\nPerforming search -> add product to cart -> checkout -> login tests")
         print("(Note: Screenshots will only be taken on failures, not successes)")
 
-        for i, user_data in enumerate(login_search_data):
+        for i, user_data in rows.iter_indexed():
             print(f"\nProcessing product {i+1}: {user_data['search_term']}")
             
             success = test.search_add_cart_checkout_login_flow(
@@ -45,7 +62,11 @@ def main():
         time.sleep(10)
         
     finally:
-        final_screenshot_count = len([f for f in os.listdir(screenshots_dir) if f.endswith('.png')])
+        ScreenshotPipeline.flush_shared()
+        StepMetrics.shared().write_summary()
+        TimeoutModel.save_shared()
+        LocatorRegistry.save_shared()
+        final_screenshot_count = len(screenshot_store.entries())
         print(f"\nFinal screenshot count: {final_screenshot_count}")
         print(f"Total screenshots taken during test: {final_screenshot_count - initial_screenshot_count}")
         
@@ -0,0 +1,261 @@
+"""
+Async twins of the page objects, driven by a utils.async_webdriver.AsyncWebDriver.
+
+Each async page mirrors a synchronous one (PAGE): locators, readiness
+conditions and NATIVE_EVENTS are read from it, and the locator registry keys
+are the synchronous page's, so both paths learn the same winning locators.
+The interactions use the same injected scripts, so a step costs the same
+number of round trips on either path; only the waiting yields to the event loop.
+
+Steps are not opened as allure steps: allure keeps one step stack per thread,
+and concurrent flows on one event loop would nest into each other's steps.
+"""
+import os
+
+import allure
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.keys import Keys
+
+from . import readiness as ready
+from .base_page import ACTION_SCRIPT, DEFAULT_BASE_URL, FIRST_VISIBLE_SCRIPT, POLL_INTERVAL_MS, PROBE_TIMEOUT, BasePage
+from .capture_policy import CapturePolicy
+from .cart_page import CartPage
+from .checkout_page import CheckoutPage
+from .locator_registry import LocatorRegistry
+from .product_page import ProductPage
+from .readiness import AsyncReadinessEngine
+from .screenshots import ScreenshotPipeline
+from .search_page import HomePage
+
+
+class AsyncBasePage:
+    # The synchronous page object this one mirrors
+    PAGE = BasePage
+
+    def __init__(self, driver, base_url=None):
+        self.driver = driver
+        self.base_url = (base_url or os.environ.get("BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.readiness = AsyncReadinessEngine.for_driver(driver)
+        self._script_timeout = 0
+
+    async def _ensure_script_timeout(self, timeout):
+        if self._script_timeout < timeout + 5:
+            self._script_timeout = timeout + 5
+            await self.driver.set_script_timeout(self._script_timeout)
+
+    def ready_condition(self, step):
+        return self.PAGE.READY_CONDITIONS[step]
+
+    async def wait_until_ready(self, step, legacy_sleep=0):
+        """Async BasePage.wait_until_ready."""
+        condition, ceiling = self.ready_condition(step)
+        return await self.readiness.wait(step, condition, ceiling=ceiling, legacy_sleep=legacy_sleep)
+
+    async def find_first_visible(self, candidates, timeout=10):
+        """
+        Async BasePage.find_first_visible.
+
+        Returns:
+            tuple: (winning xpath, AsyncElement), or (None, None) if nothing became visible
+        """
+        await self._ensure_script_timeout(timeout)
+        index, element = await self.driver.execute_async_script(
+            FIRST_VISIBLE_SCRIPT, list(candidates), int(timeout * 1000), POLL_INTERVAL_MS
+        )
+        if index < 0:
+            print(f"No candidate became visible within {timeout}s: {candidates}")
+            return None, None
+        return candidates[index], element
+
+    async def try_locators(self, step, candidates, action, timeout=10):
+        """
+        Async BasePage.try_locators; action is a coroutine function taking an xpath.
+
+        Raises:
+            NoSuchElementException: If no candidate became visible
+        """
+        registry = LocatorRegistry.shared()
+        page = self.PAGE.__name__
+        ordered = registry.order(page, step, candidates)
+        xpath, _ = await self.find_first_visible(ordered, timeout)
+        registry.record_resolution(page, step, ordered, xpath)
+        with registry.acting(page, step, xpath):
+            if await action(xpath) is False:
+                raise AssertionError(f"Element with xpath {xpath} was not found")
+        return xpath
+
+    async def perform_action(self, xpath, action, value=None, timeout=10):
+        """
+        Async BasePage.perform_action.
+
+        Raises:
+            TimeoutException: If the element is missing, hidden or disabled after the timeout
+        """
+        await self._ensure_script_timeout(timeout)
+        status, element = await self.driver.execute_async_script(
+            ACTION_SCRIPT, xpath, action, value, int(timeout * 1000), POLL_INTERVAL_MS, self.PAGE.NATIVE_EVENTS
+        )
+        if status == "done":
+            return element
+        if status != "ready":
+            raise TimeoutException(f"Element with xpath {xpath} is {status} after {timeout}s")
+        if action == "click":
+            await element.click()
+        else:
+            await element.clear()
+            await element.send_keys(value)
+            if action == "type_submit":
+                await element.send_keys(Keys.RETURN)
+        return element
+
+    async def click_element(self, xpath):
+        try:
+            await self.perform_action(xpath, "click")
+        except Exception:
+            element_name = xpath.split('/')[-1].replace('"', '').replace("'", "")
+            await self.take_screenshot(f"click_failure_{element_name}", locator=xpath)
+            raise
+
+    async def send_keys_to_element(self, xpath, keys, submit=False):
+        try:
+            await self.perform_action(xpath, "type_submit" if submit else "type", keys)
+        except Exception:
+            element_name = xpath.split('/')[-1].replace('"', '').replace("'", "")
+            await self.take_screenshot(f"send_keys_failure_{element_name}", locator=xpath)
+            raise
+
+    async def probe_element(self, xpath, timeout=PROBE_TIMEOUT):
+        xpath, _ = await self.find_first_visible([xpath], timeout)
+        return xpath is not None
+
+    async def take_screenshot(self, name="screenshot", locator=None):
+        if not CapturePolicy.shared().should_capture(name, locator):
+            print(f"Screenshot suppressed for repeated failure: {name}")
+            return None
+        png_bytes = await self.driver.get_screenshot_as_png()
+        screenshots_dir = os.environ.get("SCREENSHOTS_DIR", "screenshots")
+        job = ScreenshotPipeline.shared().submit(png_bytes, screenshots_dir, name)
+        allure.attach(png_bytes, name=name, attachment_type=allure.attachment_type.PNG)
+        print(f"Screenshot queued: {name} -> {screenshots_dir}")
+        return job
+
+
+class AsyncHomePage(AsyncBasePage):
+    PAGE = HomePage
+
+    async def navigate_to_home(self):
+        await self.driver.get(self.base_url)
+
+    async def search_product(self, search_term):
+        await self.send_keys_to_element(HomePage.SEARCH_INPUT, search_term, submit=True)
+        print(f"Product searched: {search_term}")
+
+    async def click_first_product_in_search_results(self):
+        try:
+            await self.perform_action(HomePage.SEARCH_RESULT, "click", timeout=10)
+            return True
+        except Exception as e:
+            await self.take_screenshot("click_first_product_failure")
+            print(f"Failed to click on the first product: {e}")
+            return False
+
+
+class AsyncProductPage(AsyncBasePage):
+    PAGE = ProductPage
+
+    def __init__(self, driver, base_url=None):
+        super().__init__(driver, base_url)
+        self.cart_count_before = None
+
+    def ready_condition(self, step):
+        if step == "added_to_cart":
+            return ready.any_of(
+                ready.count_changed(ProductPage.CART_COUNT, self.cart_count_before),
+                ready.url_contains("/cart"),
+            ), super().ready_condition(step)[1]
+        return super().ready_condition(step)
+
+    async def add_to_cart(self):
+        self.cart_count_before = await ready.read_count_async(self.driver, ProductPage.CART_COUNT)
+        try:
+            xpath = await self.try_locators(
+                "add_to_cart", [ProductPage.ADD_TO_CART_BUTTON, ProductPage.ADD_TO_CART_BUTTON_ALT], self.click_element
+            )
+            print(f"Added to cart: {xpath}")
+            return True
+        except Exception as e:
+            await self.take_screenshot("add_to_cart_failure")
+            print(f"Could not add to cart: {e}")
+            return False
+
+
+class AsyncCartPage(AsyncBasePage):
+    PAGE = CartPage
+
+    async def click_my_cart(self):
+        try:
+            await self.click_element(CartPage.MY_CART_LINK)
+            return True
+        except Exception as e:
+            print(f"Failed to click on My Cart link: {e}")
+            return False
+
+    async def click_checkout(self):
+        try:
+            await self.click_element(CartPage.CHECKOUT_BUTTON)
+            return True
+        except Exception as e:
+            print(f"Failed to click on checkout button: {e}")
+            return False
+
+
+class AsyncCheckoutPage(AsyncBasePage):
+    PAGE = CheckoutPage
+
+    async def click_login_option(self):
+        try:
+            await self.try_locators(
+                "login_option", [CheckoutPage.LOGIN_OPTION, CheckoutPage.LOGIN_OPTION_ALT], self.click_element
+            )
+            return True
+        except Exception as e:
+            await self.take_screenshot("click_login_option_failure")
+            print(f"Failed to click login option: {e}")
+            return False
+
+    async def enter_login_credentials(self, email, password):
+        for step, candidates, value in (
+            ("email_input", [CheckoutPage.EMAIL_INPUT, CheckoutPage.EMAIL_INPUT_ALT], email),
+            ("password_input", [CheckoutPage.PASSWORD_INPUT, CheckoutPage.PASSWORD_INPUT_ALT], password),
+        ):
+            try:
+                await self.try_locators(step, candidates, lambda xpath: self.send_keys_to_element(xpath, value))
+            except Exception as e:
+                await self.take_screenshot(f"enter_{step.split('_')[0]}_failure")
+                print(f"Failed to fill {step}: {e}")
+                return False
+        return True
+
+    async def click_sign_in(self):
+        try:
+            await self.try_locators(
+                "sign_in_button", [CheckoutPage.SIGN_IN_BUTTON, CheckoutPage.SIGN_IN_BUTTON_ALT], self.click_element
+            )
+            return True
+        except Exception as e:
+            await self.take_screenshot("click_sign_in_failure")
+            print(f"Failed to click sign in button: {e}")
+            return False
+
+    async def verify_login_success(self):
+        async def found(xpath):
+            return True
+
+        try:
+            await self.try_locators(
+                "account_element", [CheckoutPage.ACCOUNT_ELEMENT, CheckoutPage.ACCOUNT_ELEMENT_ALT], found, timeout=5
+            )
+            return True
+        except Exception:
+            print("Login may not have been successful - account element not found")
+            return False
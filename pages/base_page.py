@@ -1,91 +1,449 @@
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException
 import allure
 import os
+import time
+from functools import partial
+from .readiness import ReadinessEngine
+from .locator_registry import LocatorRegistry
+from .wire_calls import WireCallCounter, counted
+from .screenshots import ScreenshotPipeline
+from .capture_policy import CapturePolicy
+from .instrumentation import StepMetrics, instrumented
+from .request_blocking import RequestBlocker
+from .timeouts import TimeoutModel
+
+# Storefront the page objects drive; override with BASE_URL or per page object (e.g. a local stand-in)
+DEFAULT_BASE_URL = "https://sauce-demo.myshopify.com"
+
+POLL_INTERVAL_MS = 100
+# Probes answer "is it here right now?", so they only wait briefly
+PROBE_TIMEOUT = 1
+# The fixed timeout waits used before the timeout model had samples for them
+DEFAULT_TIMEOUT = TimeoutModel.LEGACY_TIMEOUT
+
+# Polls every candidate xpath inside the page and calls back with [index, element] for the
+# first one that matches a visible element, or [-1, null] once the deadline passes.
+FIRST_VISIBLE_SCRIPT = """
+var candidates = arguments[0], timeoutMs = arguments[1], pollMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var deadline = Date.now() + timeoutMs;
+function isVisible(el) {
+    if (!el || el.nodeType !== 1) return false;
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden') return false;
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+function poll() {
+    for (var i = 0; i < candidates.length; i++) {
+        var snapshot;
+        try {
+            snapshot = document.evaluate(candidates[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        } catch (e) {
+            continue;
+        }
+        for (var j = 0; j < snapshot.snapshotLength; j++) {
+            if (isVisible(snapshot.snapshotItem(j))) {
+                done([i, snapshot.snapshotItem(j)]);
+                return;
+            }
+        }
+    }
+    if (Date.now() >= deadline) {
+        done([-1, null]);
+        return;
+    }
+    setTimeout(poll, pollMs);
+}
+poll();
+"""
+
+# Finds the element, checks it is visible and enabled, scrolls it into view and performs the
+# action in one exchange. Calls back with [status, element]: "done" when the action ran in the
+# page, "ready" when the caller should fall back to native events, or the reason it timed out.
+ACTION_SCRIPT = """
+var xpath = arguments[0], action = arguments[1], value = arguments[2];
+var timeoutMs = arguments[3], pollMs = arguments[4], nativeEvents = arguments[5];
+var done = arguments[arguments.length - 1];
+var deadline = Date.now() + timeoutMs;
+function isVisible(el) {
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden') return false;
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+function find() {
+    try {
+        return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } catch (e) {
+        return null;
+    }
+}
+function attempt() {
+    var el = find();
+    var status = !el ? 'missing' : !isVisible(el) ? 'not visible' : el.disabled ? 'not enabled' : null;
+    if (status) {
+        if (Date.now() >= deadline) {
+            done([status, null]);
+        } else {
+            setTimeout(attempt, pollMs);
+        }
+        return;
+    }
+    el.scrollIntoView({block: 'center', inline: 'nearest'});
+    if (nativeEvents) {
+        done(['ready', el]);
+        return;
+    }
+    try {
+        if (action === 'click') {
+            el.click();
+        } else {
+            el.focus();
+            var descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value');
+            if (descriptor && descriptor.set) {
+                descriptor.set.call(el, value);
+            } else {
+                el.value = value;
+            }
+            el.dispatchEvent(new Event('input', {bubbles: true}));
+            el.dispatchEvent(new Event('change', {bubbles: true}));
+            if (action === 'type_submit') {
+                if (!el.form) {
+                    done(['ready', el]);
+                    return;
+                }
+                if (el.form.requestSubmit) {
+                    el.form.requestSubmit();
+                } else {
+                    el.form.submit();
+                }
+            }
+        }
+        done(['done', el]);
+    } catch (e) {
+        done(['ready', el]);
+    }
+}
+attempt();
+"""
 
 class BasePage:
-    def __init__(self, driver):
+    # Maps a transition name to (condition, ceiling seconds); page objects declare their own
+    READY_CONDITIONS = {}
+    # Set to True on a page object whose widgets need trusted keyboard/mouse events
+    NATIVE_EVENTS = False
+    # URL patterns added to the driver's request blocking; allowed ones win over any deny rule
+    ALLOWED_REQUESTS = ()
+    BLOCKED_REQUESTS = ()
+    # Maps a step to the timeout its waits use until the timeout model has learned one (default DEFAULT_TIMEOUT)
+    COLD_START_TIMEOUTS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        # Every page-object method decorated with @allure.step is recorded as a timed step
+        super().__init_subclass__(**kwargs)
+        for name, value in list(vars(cls).items()):
+            if callable(value) and hasattr(value, "__wrapped__") and not getattr(value, "instrumented", False):
+                setattr(cls, name, instrumented(value))
+
+    def __init__(self, driver, base_url=None):
         self.driver = driver
-        self.wait = WebDriverWait(driver, 10)
+        self.base_url = (base_url or os.environ.get("BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.readiness = ReadinessEngine.for_driver(driver)
+        self.wire_calls = WireCallCounter.for_driver(driver)
+        self.request_blocker = RequestBlocker.for_driver(driver)
+        self.request_blocker.add_rules(self.ALLOWED_REQUESTS, self.BLOCKED_REQUESTS)
+        self._script_timeout = 0
+
+    def _ensure_script_timeout(self, timeout):
+        # Async scripts poll inside the browser, so the session script timeout must outlast them
+        if self._script_timeout < timeout + 5:
+            self._script_timeout = timeout + 5
+            self.driver.set_script_timeout(self._script_timeout)
+
+    def wait_timeout(self, step, locator, timeout=None, legacy=None):
+        """
+        Choose the ceiling for a wait and the key its latency is recorded under.
+
+        Args:
+            step (str): Name of the interaction or wait
+            locator (str): Locator or condition waited for
+            timeout (float): Explicit timeout, used as is
+            legacy (float): Cold-start timeout; defaults to COLD_START_TIMEOUTS, then DEFAULT_TIMEOUT
+
+        Returns:
+            tuple: (key, seconds, learned) where learned is False for an explicit timeout
+        """
+        key = f"{type(self).__name__}.{step}|{locator}"
+        if timeout is not None:
+            return key, timeout, False
+        legacy = self.COLD_START_TIMEOUTS.get(step, DEFAULT_TIMEOUT) if legacy is None else legacy
+        return key, TimeoutModel.shared().timeout(key, legacy), True
+
+    def record_wait(self, key, start, satisfied, learned):
+        # Only successes are latency; a miss counts against the ceiling only when the model chose it
+        if satisfied:
+            TimeoutModel.shared().record(key, time.monotonic() - start)
+        elif learned:
+            TimeoutModel.shared().record_timeout(key)
+
+    def ready_condition(self, step):
+        """
+        Look up the declared readiness condition for a transition.
+
+        Args:
+            step (str): Name of the transition declared in READY_CONDITIONS
+
+        Returns:
+            tuple: (Condition, ceiling in seconds)
+        """
+        return self.READY_CONDITIONS[step]
+
+    @partial(instrumented, label=lambda self, step, *args, **kwargs: f"{type(self).__name__}.ready[{step}]")
+    @allure.step("Wait until ready: {step}")
+    def wait_until_ready(self, step, legacy_sleep=0):
+        """
+        Wait for the page's declared readiness condition instead of a fixed sleep.
+
+        Args:
+            step (str): Name of the transition declared in READY_CONDITIONS
+            legacy_sleep (float): Seconds of fixed sleep this wait replaces, for the report
+
+        Returns:
+            bool: True if the page became ready before the step ceiling, False otherwise
+        """
+        condition, ceiling = self.ready_condition(step)
+        key, ceiling, learned = self.wait_timeout("ready", step, legacy=ceiling)
+        start = time.monotonic()
+        ready = self.readiness.wait(step, condition, ceiling=ceiling, legacy_sleep=legacy_sleep)
+        self.record_wait(key, start, ready, learned)
+        return ready
+
+    @counted
+    @allure.step("Resolve first visible of {candidates}")
+    def find_first_visible(self, candidates, timeout=None, step="visible", locator=None):
+        """
+        Resolve an ordered list of candidate xpaths in a single script round trip.
+
+        The injected script polls inside the browser until one candidate matches a
+        visible element or the timeout expires, so a missing primary locator no longer
+        costs a full WebDriverWait before the next candidate is tried.
+
+        Args:
+            candidates (list): Xpaths in order of preference
+            timeout (float): Seconds to keep polling inside the browser; defaults to the timeout model's
+            step (str): Name the latency is recorded under
+            locator (str): Locator the latency is recorded under; defaults to the first candidate
+
+        Returns:
+            tuple: (winning xpath, WebElement), or (None, None) if nothing became visible
+        """
+        key, timeout, learned = self.wait_timeout(step, locator or candidates[0], timeout)
+        self._ensure_script_timeout(timeout)
+        start = time.monotonic()
+        with StepMetrics.shared().waiting():
+            index, element = self.driver.execute_async_script(
+                FIRST_VISIBLE_SCRIPT, list(candidates), int(timeout * 1000), POLL_INTERVAL_MS
+            )
+        self.record_wait(key, start, index >= 0, learned)
+        if index < 0:
+            print(f"No candidate became visible within {timeout}s: {candidates}")
+            return None, None
+        print(f"Resolved candidate {index + 1} of {len(candidates)}: {candidates[index]}")
+        return candidates[index], element
 
+    def try_locators(self, step, candidates, action, timeout=None):
+        """
+        Run an action against the first visible candidate locator, trying the last known winner first.
+
+        Args:
+            step (str): Name of the interaction, used as the registry key with the page class
+            candidates (list): Primary locator followed by its alternatives
+            action: Callable taking an xpath; raising or returning False counts as a miss
+            timeout (float): Seconds to wait for any candidate to become visible; defaults to the timeout model's
+
+        Returns:
+            str: The locator that succeeded
+
+        Raises:
+            NoSuchElementException: If no candidate became visible
+            Exception: Whatever the action raised on the winning locator
+        """
+        registry = LocatorRegistry.shared()
+        page = type(self).__name__
+        ordered = registry.order(page, step, candidates)
+        # Latency is kept under the declared primary, whichever candidate the registry tries first
+        xpath, _ = self.find_first_visible(ordered, timeout, step=step, locator=candidates[0])
+        registry.record_resolution(page, step, ordered, xpath)
+        with registry.acting(page, step, xpath):
+            if action(xpath) is False:
+                raise AssertionError(f"Element with xpath {xpath} was not found")
+        return xpath
+
+    def perform_action(self, xpath, action, value=None, timeout=None):
+        """
+        Find, check, scroll to and act on an element in a single protocol exchange.
+
+        Falls back to native WebDriver events when the page object sets NATIVE_EVENTS
+        or when the in-page action cannot be performed (e.g. no form to submit).
+
+        Args:
+            xpath (str): Locator of the target element
+            action (str): "click", "type" or "type_submit"
+            value (str): Text to type for the typing actions
+            timeout (float): Seconds to wait for the element to become visible and enabled; defaults to
+                the timeout model's
+
+        Returns:
+            WebElement: The element the action was performed on
+
+        Raises:
+            TimeoutException: If the element is missing, hidden or disabled after the timeout
+        """
+        key, timeout, learned = self.wait_timeout(action, xpath, timeout)
+        self._ensure_script_timeout(timeout)
+        start = time.monotonic()
+        with StepMetrics.shared().waiting():
+            status, element = self.driver.execute_async_script(
+                ACTION_SCRIPT, xpath, action, value, int(timeout * 1000), POLL_INTERVAL_MS, self.NATIVE_EVENTS
+            )
+        self.record_wait(key, start, status in ("done", "ready"), learned)
+        if status == "done":
+            return element
+        if status != "ready":
+            raise TimeoutException(f"Element with xpath {xpath} is {status} after {timeout}s")
+        if action == "click":
+            element.click()
+        else:
+            element.clear()
+            element.send_keys(value)
+            if action == "type_submit":
+                element.send_keys(Keys.RETURN)
+        return element
+
+    @counted
     @allure.step("Click on element with xpath: {xpath}")
     def click_element(self, xpath):
         try:
-            element = self.wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            assert element.is_displayed(), f"Element with xpath {xpath} is not visible"
-            element.click()
+            self.perform_action(xpath, "click")
             print(f"Successfully clicked on element: {xpath}")
         except Exception as e:
             element_name = xpath.split('/')[-1].replace('"', '').replace("'", "")
-            self.take_screenshot(f"click_failure_{element_name}")
+            self.take_screenshot(f"click_failure_{element_name}", locator=xpath)
             raise e
 
+    @counted
     @allure.step("Send keys '{keys}' to element with xpath: {xpath}")
-    def send_keys_to_element(self, xpath, keys):
+    def send_keys_to_element(self, xpath, keys, submit=False):
         try:
-            element = self.wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            assert element.is_enabled(), f"Element with xpath {xpath} is not enabled"
-            element.clear()
-            element.send_keys(keys)
+            self.perform_action(xpath, "type_submit" if submit else "type", keys)
             print(f"Successfully sent keys '{keys}' to element: {xpath}")
         except Exception as e:
             element_name = xpath.split('/')[-1].replace('"', '').replace("'", "")
-            self.take_screenshot(f"send_keys_failure_{element_name}")
+            self.take_screenshot(f"send_keys_failure_{element_name}", locator=xpath)
             raise e
 
+    @counted
     @allure.step("Assert element exists with xpath: {xpath}")
-    def assert_element_exists(self, xpath, timeout=10):
+    def assert_element_exists(self, xpath, timeout=None):
+        key, timeout, learned = self.wait_timeout("present", xpath, timeout)
+        start = time.monotonic()
         try:
-            WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located((By.XPATH, xpath)))
+            with StepMetrics.shared().waiting():
+                WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located((By.XPATH, xpath)))
+            self.record_wait(key, start, True, learned)
             element = self.driver.find_element(By.XPATH, xpath)
             assert element.is_displayed(), f"Element with xpath {xpath} is not visible"
             print(f"Assertion passed: Element {xpath} exists and is visible")
             return True
         except Exception as e:
+            if isinstance(e, TimeoutException):
+                self.record_wait(key, start, False, learned)
             element_name = xpath.split('/')[-1].replace('"', '').replace("'", "")
-            self.take_screenshot(f"element_exists_failure_{element_name}")
+            self.take_screenshot(f"element_exists_failure_{element_name}", locator=xpath)
             print(f"Assertion failed: Element {xpath} does not exist or is not visible")
             return False
 
+    @counted
+    @allure.step("Probe for element: {xpath}")
+    def probe_element(self, xpath, timeout=PROBE_TIMEOUT):
+        """
+        Cheaply check whether an element is visible, for branching rather than asserting.
+
+        Unlike assert_element_exists this uses a short timeout, resolves in a single
+        round trip and never captures a screenshot, since "not here" is an expected answer.
+
+        Args:
+            xpath (str): Locator to look for
+            timeout (float): Seconds to keep polling inside the browser
+
+        Returns:
+            bool: True if the element is visible, False otherwise
+        """
+        xpath, _ = self.find_first_visible([xpath], timeout)
+        return xpath is not None
+
+    @counted
     @allure.step("Wait for element to be visible: {xpath}")
-    def wait_for_element(self, xpath, timeout=10):
+    def wait_for_element(self, xpath, timeout=None):
+        key, timeout, learned = self.wait_timeout("visible", xpath, timeout)
+        start = time.monotonic()
         try:
-            return WebDriverWait(self.driver, timeout).until(EC.visibility_of_element_located((By.XPATH, xpath)))
+            with StepMetrics.shared().waiting():
+                element = WebDriverWait(self.driver, timeout).until(EC.visibility_of_element_located((By.XPATH, xpath)))
+            self.record_wait(key, start, True, learned)
+            return element
         except Exception as e:
+            if isinstance(e, TimeoutException):
+                self.record_wait(key, start, False, learned)
             element_name = xpath.split('/')[-1].replace('"', '').replace("'", "")
-            self.take_screenshot(f"wait_element_failure_{element_name}")
+            self.take_screenshot(f"wait_element_failure_{element_name}", locator=xpath)
             raise e
 
+    @counted
     @allure.step("Get element text: {xpath}")
     def get_element_text(self, xpath):
+        key, timeout, learned = self.wait_timeout("present", xpath)
+        start = time.monotonic()
         try:
-            element = self.wait.until(EC.presence_of_element_located((By.XPATH, xpath)))
+            with StepMetrics.shared().waiting():
+                element = WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located((By.XPATH, xpath)))
+            self.record_wait(key, start, True, learned)
             return element.text
         except Exception as e:
+            if isinstance(e, TimeoutException):
+                self.record_wait(key, start, False, learned)
             element_name = xpath.split('/')[-1].replace('"', '').replace("'", "")
-            self.take_screenshot(f"get_text_failure_{element_name}")
+            self.take_screenshot(f"get_text_failure_{element_name}", locator=xpath)
             raise e
 
+    @counted
     @allure.step("Take screenshot: {name}")
-    def take_screenshot(self, name="screenshot", timestamp=True):
-        #Timestamp avoids file overwrite issues when tests fail multiple times.
-        screenshots_dir = "screenshots"
-        if not os.path.exists(screenshots_dir):
-            os.makedirs(screenshots_dir)
+    def take_screenshot(self, name="screenshot", locator=None):
+        #The capture policy keeps only the first shots of each step+locator failure signature.
+        if not CapturePolicy.shared().should_capture(name, locator):
+            print(f"Screenshot suppressed for repeated failure: {name}")
+            return None
         
-        import time
-        if timestamp:
-            timestamp_str = int(time.time())
-            filename = f"{screenshots_dir}/{name}_{timestamp_str}.png"
-        else:
-            filename = f"{screenshots_dir}/{name}.png"
+        StepMetrics.shared().count_screenshot()
+        
+        #Parallel workers each get their own SCREENSHOTS_DIR so they never share a file.
+        screenshots_dir = os.environ.get("SCREENSHOTS_DIR", "screenshots")
         
-        self.driver.save_screenshot(filename)
+        #Capture once; encoding and the disk write happen on the pipeline's worker thread.
+        png_bytes = self.driver.get_screenshot_as_png()
+        job = ScreenshotPipeline.shared().submit(png_bytes, screenshots_dir, name)
         
-        allure.attach.file(
-            filename,
+        #Attach from memory on the test thread so allure links it to the current step.
+        allure.attach(
+            png_bytes,
             name=name,
             attachment_type=allure.attachment_type.PNG
         )
-        print(f"Screenshot taken: {filename}")
+        #The file is written (or deduplicated into an existing blob) later on the worker thread.
+        print(f"Screenshot queued: {name} -> {screenshots_dir}")
+        return job
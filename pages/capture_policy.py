@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+
+import allure
+
+
+class CapturePolicy:
+    """
+    Limits failure screenshots per failure signature for the whole run.
+
+    A signature is the step name plus the locator that failed. The first
+    max_per_signature captures of a signature are kept; repeats of a noisy
+    failure (retries, parametrized cases hitting the same broken locator) are
+    counted but not captured again.
+    """
+
+    DEFAULT_MAX_PER_SIGNATURE = 1
+
+    _shared = None
+
+    def __init__(self, max_per_signature=None):
+        if max_per_signature is None:
+            max_per_signature = int(
+                os.environ.get("SCREENSHOT_MAX_PER_SIGNATURE", self.DEFAULT_MAX_PER_SIGNATURE)
+            )
+        self.max_per_signature = max_per_signature
+        self.seen = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """Return the policy shared by every page object in this run."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @staticmethod
+    def signature(step, locator=None):
+        return f"{step}|{locator}" if locator else step
+
+    def should_capture(self, step, locator=None):
+        """
+        Record an occurrence of a failure and decide whether to capture it.
+
+        Args:
+            step (str): Screenshot/step name
+            locator (str): Locator that failed, if any
+
+        Returns:
+            bool: True while the signature is under its capture limit
+        """
+        key = self.signature(step, locator)
+        with self._lock:
+            count = self.seen.get(key, 0) + 1
+            self.seen[key] = count
+        # A limit of 0 or less disables the policy
+        return self.max_per_signature <= 0 or count <= self.max_per_signature
+
+    def report(self):
+        """Return occurrences, captures and suppressed captures per signature."""
+        with self._lock:
+            report = {}
+            for key, count in sorted(self.seen.items()):
+                captured = count if self.max_per_signature <= 0 else min(count, self.max_per_signature)
+                report[key] = {"occurrences": count, "captured": captured, "suppressed": count - captured}
+            return report
+
+    def attach_report(self, name="capture_policy"):
+        allure.attach(json.dumps(self.report(), indent=2), name=name, attachment_type=allure.attachment_type.JSON)
@@ -2,6 +2,8 @@
 from .base_page import BasePage
 # Import By class for locating elements using different strategies
 from selenium.webdriver.common.by import By
+# Import readiness conditions used to declare when the cart and checkout have loaded
+from . import readiness as ready
 # Import Allure for test reporting and step tracking
 import allure
 
@@ -11,16 +13,22 @@ class CartPage(BasePage):
     MY_CART_LINK = "//a[contains(@class,'toggle-drawer') and contains(@class,'cart')]"  
     # Locator for the checkout button
     CHECKOUT_BUTTON = "//a[@class='checkout']"  
+    # Readiness conditions for transitions that start on the cart page
+    READY_CONDITIONS = {
+        "cart_opened": (ready.element_visible(CHECKOUT_BUTTON), 5),
+        "checkout_loaded": (ready.all_of(ready.url_contains("checkout"), ready.document_ready()), 10),
+    }
     
-    def __init__(self, driver):
+    def __init__(self, driver, base_url=None):
         """
         Initialize the CartPage object by calling the parent BasePage constructor.
         
         Args:
             driver: The Selenium WebDriver instance to interact with the browser
+            base_url (str): Storefront root URL; defaults to BASE_URL or the Sauce demo store
         """
         # Call the parent class constructor to initialize the base page functionality
-        super().__init__(driver)
+        super().__init__(driver, base_url)
 
 
     @allure.step("Click on My Cart link")
@@ -31,8 +39,12 @@ class CartPage(BasePage):
         Returns:
             bool: True if cart link was successfully clicked, False otherwise
         """
-        # Click the cart link
-        self.click_element(self.MY_CART_LINK)
+        # Click the cart link; click_element has already captured a screenshot if it failed
+        try:
+            self.click_element(self.MY_CART_LINK)
+        except Exception as e:
+            print(f"Failed to click on My Cart link: {e}")
+            return False
         # Print confirmation message
         print("Clicked on My Cart link")
         # Return True to indicate success
@@ -46,8 +58,12 @@ class CartPage(BasePage):
         Returns:
             bool: True if checkout button was successfully clicked, False otherwise
         """
-        # Click the checkout button
-        self.click_element(self.CHECKOUT_BUTTON)
+        # Click the checkout button; click_element has already captured a screenshot if it failed
+        try:
+            self.click_element(self.CHECKOUT_BUTTON)
+        except Exception as e:
+            print(f"Failed to click on checkout button: {e}")
+            return False
         # Print confirmation message
         print("Clicked on Check Out link")
         # Return True to indicate success
@@ -0,0 +1,198 @@
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import allure
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list of numbers."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StepMetrics:
+    """
+    Collects wall time, wait time, WebDriver commands and screenshots per page-object step.
+
+    Samples from every parametrized case are kept so the summary can report
+    p50/p95/p99 per step across the whole run. The samples of the current test
+    are attached to its Allure result as one JSON attachment at test end, so
+    timings never become test parameters that would change its history id.
+    """
+
+    _shared = None
+
+    def __init__(self):
+        self.samples = {}
+        self.pending = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def step(self, label):
+        """Measure a page-object step; nested steps are measured on their own too."""
+        frame = {"wait": 0.0, "screenshots": 0}
+        stack = self._stack()
+        stack.append(frame)
+        start = time.monotonic()
+        try:
+            yield frame
+        finally:
+            frame["wall"] = time.monotonic() - start
+            stack.pop()
+            self.record(label, frame)
+
+    @contextmanager
+    def waiting(self):
+        """Attribute the time spent inside the with-block to every active step as waiting."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            for frame in self._stack():
+                frame["wait"] += elapsed
+
+    def count_screenshot(self):
+        for frame in self._stack():
+            frame["screenshots"] += 1
+
+    def record(self, label, frame):
+        sample = {
+            "wall": frame["wall"],
+            "wait": frame["wait"],
+            "commands": frame.get("commands", 0),
+            "screenshots": frame["screenshots"],
+        }
+        with self._lock:
+            self.samples.setdefault(label, []).append(sample)
+            self.pending.setdefault(label, []).append(sample)
+
+    def attach_pending(self, name="step_metrics"):
+        """Attach the samples recorded since the last attachment, per step, as one JSON attachment."""
+        with self._lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        rounded = {
+            label: [{metric: round(value, 3) for metric, value in sample.items()} for sample in values]
+            for label, values in pending.items()
+        }
+        allure.attach(json.dumps(rounded, indent=2), name=name, attachment_type=allure.attachment_type.JSON)
+
+    def summary(self):
+        """
+        Summarize every step across all recorded samples.
+
+        Returns:
+            dict: Per step, the sample count and p50/p95/p99 of each metric, slowest steps first
+        """
+        with self._lock:
+            samples = {label: list(values) for label, values in self.samples.items()}
+        summary = {}
+        for label, values in samples.items():
+            summary[label] = {"count": len(values), "total_wall": round(sum(v["wall"] for v in values), 3)}
+            for metric in ("wall", "wait", "commands", "screenshots"):
+                series = [v[metric] for v in values]
+                summary[label][metric] = {
+                    name: round(percentile(series, fraction), 3)
+                    for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+                }
+        return dict(sorted(summary.items(), key=lambda item: item[1]["total_wall"], reverse=True))
+
+    @staticmethod
+    def summary_path(worker=None):
+        """Default summary file: step_metrics.json, or step_metrics-<worker>.json for a parallel worker."""
+        return f"step_metrics-{worker}.json" if worker else "step_metrics.json"
+
+    def write_summary(self, path=None, samples=None):
+        """
+        Write the JSON summary; parallel workers get their own file.
+
+        Args:
+            path (str): Where to write; defaults to STEP_METRICS_PATH or summary_path()
+            samples (bool): Keep each step's raw samples in the file, so merge_summaries can
+                compute run-wide percentiles; defaults to True in a parallel worker
+        """
+        if not self.samples:
+            return None
+        worker = os.environ.get("WORKER_ID")
+        if path is None:
+            path = os.environ.get("STEP_METRICS_PATH", self.summary_path(worker))
+        if samples is None:
+            samples = bool(worker)
+        summary = self.summary()
+        if samples:
+            with self._lock:
+                for label, values in self.samples.items():
+                    summary[label]["samples"] = list(values)
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Step metrics written to {path}")
+        return path
+
+    @classmethod
+    def merge_summaries(cls, paths, path=None):
+        """
+        Combine the worker files written by write_summary into one run-wide summary.
+
+        Percentiles cannot be averaged, so they are recomputed from the workers' raw
+        samples. Worker files are removed once merged; missing ones are skipped.
+
+        Returns:
+            str: Path of the merged summary, or None if no worker recorded a step
+        """
+        merged = cls()
+        for worker_path in paths:
+            try:
+                with open(worker_path) as f:
+                    summary = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for label, step in summary.items():
+                merged.samples.setdefault(label, []).extend(step.get("samples", []))
+            os.remove(worker_path)
+        return merged.write_summary(path or cls.summary_path(), samples=False)
+
+
+def instrumented(method, label=None):
+    """
+    Wrap a page-object method so each call is recorded as a step.
+
+    label may be a string or a callable receiving the call's arguments, for
+    generic methods whose step name depends on what they were asked to do.
+
+    Commands are counted through the page's WireCallCounter frame, which
+    includes the commands issued by nested BasePage primitives.
+    """
+    label = label or method.__qualname__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = StepMetrics.shared()
+        step_label = label(self, *args, **kwargs) if callable(label) else label
+        with metrics.step(step_label) as frame, self.wire_calls.action(step_label) as calls:
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                frame["commands"] = calls["commands"]
+
+    wrapper.instrumented = True
+    return wrapper
@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import allure
+from selenium.common.exceptions import NoSuchElementException
+
+
+class LocatorRegistry:
+    """
+    Learns which locator variant resolves for each page step and persists it across runs.
+
+    Page objects hand over an ordered list of candidate locators (primary first,
+    then the _ALT variants). The registry reorders them so the last winner is
+    tried first, and demotes a locator to the back of the list once it has failed
+    demote_after times in a row, recording each demotion for the report.
+    Updates stay in memory; the statistics are saved once at the end of the run,
+    merged into whatever other workers saved meanwhile.
+    """
+
+    DEFAULT_PATH = ".locator_stats.json"
+    DEMOTE_AFTER = 3
+
+    _shared = None
+
+    def __init__(self, path=None, demote_after=DEMOTE_AFTER):
+        self.path = path or os.environ.get("LOCATOR_STATS_PATH", self.DEFAULT_PATH)
+        self.demote_after = demote_after
+        self.demotions = []
+        # This run's successes and failures per step and locator, added to the file on save
+        self.pending = {}
+        self._lock = threading.Lock()
+        self.stats = self._load()
+
+    @classmethod
+    def shared(cls):
+        """Return the process-wide registry used by BasePage."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def save_shared(cls):
+        """Save the statistics of the process-wide registry, if it learned anything."""
+        if cls._shared is not None and cls._shared.pending:
+            cls._shared.save()
+            print(f"Locator statistics written to {cls._shared.path}")
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Add this run's counts to the file, keeping what other workers saved meanwhile."""
+        with self._lock:
+            stats = self._load()
+            for key, locators in self.pending.items():
+                mine = self.stats[key]
+                entry = stats.setdefault(key, {"last_winner": None, "locators": {}})
+                # Counts add up across workers; the streak, demotion and winner are this run's latest word
+                entry["last_winner"] = mine["last_winner"]
+                for locator, counts in locators.items():
+                    merged = self._locator(entry, locator)
+                    merged["successes"] += counts["successes"]
+                    merged["failures"] += counts["failures"]
+                    merged["consecutive_failures"] = mine["locators"][locator]["consecutive_failures"]
+                    merged["demoted"] = mine["locators"][locator]["demoted"]
+            # Write-then-rename so concurrent workers never leave a truncated file behind
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(stats, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+            self.stats = stats
+            self.pending = {}
+
+    def _count(self, page, step, locator, outcome):
+        counts = self.pending.setdefault(f"{page}.{step}", {}).setdefault(locator, {"successes": 0, "failures": 0})
+        counts[outcome] += 1
+
+    def _entry(self, page, step):
+        return self.stats.setdefault(f"{page}.{step}", {"last_winner": None, "locators": {}})
+
+    def _locator(self, entry, locator):
+        return entry["locators"].setdefault(
+            locator, {"successes": 0, "failures": 0, "consecutive_failures": 0, "demoted": False}
+        )
+
+    def order(self, page, step, candidates):
+        """
+        Order candidate locators so the most likely one is tried first.
+
+        Args:
+            page (str): Page object class name
+            step (str): Name of the interaction on that page
+            candidates (list): Locators in their declared order
+
+        Returns:
+            list: The candidates with the last winner first and demoted locators last
+        """
+        with self._lock:
+            entry = self.stats.get(f"{page}.{step}")
+        if not entry:
+            return list(candidates)
+        winner = entry["last_winner"]
+        locators = entry["locators"]
+
+        def rank(indexed):
+            position, locator = indexed
+            demoted = locators.get(locator, {}).get("demoted", False)
+            return (demoted, locator != winner, position)
+
+        return [locator for _, locator in sorted(enumerate(candidates), key=rank)]
+
+    def record_success(self, page, step, locator):
+        with self._lock:
+            entry = self._entry(page, step)
+            stats = self._locator(entry, locator)
+            stats["successes"] += 1
+            stats["consecutive_failures"] = 0
+            stats["demoted"] = False
+            entry["last_winner"] = locator
+            self._count(page, step, locator, "successes")
+
+    def record_failure(self, page, step, locator):
+        with self._lock:
+            entry = self._entry(page, step)
+            stats = self._locator(entry, locator)
+            stats["failures"] += 1
+            stats["consecutive_failures"] += 1
+            if entry["last_winner"] == locator:
+                entry["last_winner"] = None
+            if not stats["demoted"] and stats["consecutive_failures"] >= self.demote_after:
+                stats["demoted"] = True
+                demotion = {
+                    "page": page,
+                    "step": step,
+                    "locator": locator,
+                    "consecutive_failures": stats["consecutive_failures"],
+                }
+                self.demotions.append(demotion)
+                print(f"Demoted locator for {page}.{step} after {stats['consecutive_failures']} failures: {locator}")
+            self._count(page, step, locator, "failures")
+
+    def record_resolution(self, page, step, ordered, winner):
+        """
+        Record the candidates a first-visible resolution passed over.
+
+        Args:
+            page (str): Page object class name
+            step (str): Name of the interaction on that page
+            ordered (list): Candidates in the order they were tried
+            winner (str): The candidate that became visible, or None
+
+        Raises:
+            NoSuchElementException: If no candidate became visible
+        """
+        if winner is None:
+            for missed in ordered:
+                self.record_failure(page, step, missed)
+            raise NoSuchElementException(f"None of the candidate locators for {page}.{step} became visible")
+        # Candidates ranked ahead of the winner were not visible when it was
+        for missed in ordered[:ordered.index(winner)]:
+            self.record_failure(page, step, missed)
+
+    @contextmanager
+    def acting(self, page, step, locator):
+        """Record the action performed inside the with-block as a success of locator, or a failure if it raises."""
+        try:
+            yield
+        except Exception:
+            self.record_failure(page, step, locator)
+            raise
+        self.record_success(page, step, locator)
+
+    def report(self):
+        """Return per-step locator statistics and the demotions made during this run."""
+        with self._lock:
+            return {"steps": json.loads(json.dumps(self.stats)), "demotions": list(self.demotions)}
+
+    def attach_report(self, name="locator_registry"):
+        allure.attach(
+            json.dumps(self.report(), indent=2),
+            name=name,
+            attachment_type=allure.attachment_type.JSON,
+        )
@@ -18,15 +18,16 @@ class LoginPage(BasePage):
     # Locator for the Sign In button (input element)
     SIGN_IN_BUTTON = "//input[@type='submit' and @value='Sign In']"  # Correct XPath according to provided list
     
-    def __init__(self, driver):
+    def __init__(self, driver, base_url=None):
         """
         Initialize the LoginPage object by calling the parent BasePage constructor.
         
         Args:
             driver: The Selenium WebDriver instance to interact with the browser
+            base_url (str): Storefront root URL; defaults to BASE_URL or the Sauce demo store
         """
         # Call the parent class constructor to initialize the base page functionality
-        super().__init__(driver)
+        super().__init__(driver, base_url)
         # Store the driver instance (redundant since BasePage already stores it, but kept for clarity)
         self.driver = driver
 
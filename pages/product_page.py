@@ -1,48 +1,60 @@
 from .base_page import BasePage
+from . import readiness as ready
 import allure
 
 class ProductPage(BasePage):
     ADD_TO_CART_BUTTON = "//input[@id='add']"
     PRODUCT_IMAGE = "//img[@id='feature-image']"
+    PRODUCT_IMAGE_ALT = "(//div[contains(@class, 'product-card')]//img)[1]"
+    ADD_TO_CART_BUTTON_ALT = "//button[contains(text(), 'Add to cart') or contains(text(), 'ADD TO CART')]"
+    CART_COUNT = "//span[@id='cart-target-desktop']//span"
+    # The feature image is clicked and checked for visibility, so product photos stay loaded
+    # even under REQUEST_BLOCKING=aggressive
+    ALLOWED_REQUESTS = (
+        "*://cdn.shopify.com/s/files/*",
+        "*://*/cdn/shop/products/*",
+        "*://*/cdn/shop/files/*",
+    )
 
-    def __init__(self, driver):
-        super().__init__(driver)
+    READY_CONDITIONS = {
+        "product_loaded": (ready.all_of(ready.url_contains("products"), ready.document_ready()), 10),
+        # The condition compares against the count read in add_to_cart, so ready_condition builds it
+        "added_to_cart": (None, 5),
+    }
+
+    def __init__(self, driver, base_url=None):
+        super().__init__(driver, base_url)
         self.driver = driver
+        self.cart_count_before = None
+
+    def ready_condition(self, step):
+        if step == "added_to_cart":
+            # Shopify either bumps the header count in place or redirects to /cart
+            return ready.any_of(
+                ready.count_changed(self.CART_COUNT, self.cart_count_before),
+                ready.url_contains("/cart"),
+            ), super().ready_condition(step)[1]
+        return super().ready_condition(step)
 
     @allure.step("Click on product image")
     def click_product_image(self):
         try:
-            self.click_element(self.PRODUCT_IMAGE)
-            print(f"Clicked on product image")
+            xpath = self.try_locators("product_image", [self.PRODUCT_IMAGE, self.PRODUCT_IMAGE_ALT], self.click_element)
+            print(f"Clicked on product image: {xpath}")
             return True
         except Exception as e:
             self.take_screenshot("click_product_image_failure")
             print(f"Could not click on product image: {str(e)}")
-            try:
-                alt_locator = "(//div[contains(@class, 'product-card')]//img)[1]"
-                self.click_element(alt_locator)
-                print(f"Clicked on alternative product image locator")
-                return True
-            except:
-                self.take_screenshot("click_alt_product_image_failure")
-                print(f"Could not click on alternative product image locator")
-                return False
+            return False
 
     @allure.step("Add product to cart")
     def add_to_cart(self):
+        self.cart_count_before = ready.read_count(self.driver, self.CART_COUNT)
         try:
-            self.click_element(self.ADD_TO_CART_BUTTON)
-            print("Added to cart")
+            xpath = self.try_locators("add_to_cart", [self.ADD_TO_CART_BUTTON, self.ADD_TO_CART_BUTTON_ALT], self.click_element)
+            print(f"Added to cart: {xpath}")
             return True
         except Exception as e:
             self.take_screenshot("add_to_cart_failure")
-            print(f"Could not add to cart using primary locator: {str(e)}")
-            try:
-                alt_locator = "//button[contains(text(), 'Add to cart') or contains(text(), 'ADD TO CART')]"
-                self.click_element(alt_locator)
-                print("Added to cart using alternative locator")
-                return True
-            except:
-                self.take_screenshot("add_to_cart_alt_failure")
-                print("Could not add to cart using alternative locator")
-                return False
\ No newline at end of file
+            print(f"Could not add to cart: {str(e)}")
+            return False
@@ -0,0 +1,336 @@
+import asyncio
+import re
+import time
+
+import allure
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .instrumentation import StepMetrics
+
+
+class Condition:
+    """
+    A named readiness predicate evaluated against the driver.
+
+    Page objects declare conditions describing what "ready" means after a
+    transition; the ReadinessEngine polls them until they hold or the step
+    ceiling is reached. The optional check is the same predicate written as a
+    coroutine, so the AsyncReadinessEngine can poll the same declaration
+    against an AsyncWebDriver.
+    """
+
+    def __init__(self, description, predicate, check=None):
+        self.description = description
+        self.predicate = predicate
+        self.check = check
+
+    def __call__(self, driver):
+        try:
+            return self.predicate(driver)
+        except WebDriverException:
+            # Stale/missing elements mid-navigation simply mean "not ready yet"
+            return False
+
+    async def evaluate(self, driver):
+        """Awaitable twin of calling the condition, for an AsyncWebDriver."""
+        if self.check is None:
+            raise TypeError(f"{self!r} has no asynchronous check")
+        try:
+            return await self.check(driver)
+        except WebDriverException:
+            return False
+
+    def __repr__(self):
+        return f"Condition({self.description})"
+
+
+def document_ready(state="complete"):
+    """Ready once document.readyState reaches the given state."""
+    accepted = ("interactive", "complete") if state == "interactive" else ("complete",)
+
+    async def check(driver):
+        return await driver.execute_script("return document.readyState") in accepted
+
+    return Condition(
+        f"document.readyState in {accepted}",
+        lambda driver: driver.execute_script("return document.readyState") in accepted,
+        check,
+    )
+
+
+def url_contains(fragment):
+    """Ready once the current URL contains the fragment."""
+
+    async def check(driver):
+        return fragment in await driver.get_current_url()
+
+    return Condition(f"url contains '{fragment}'", lambda driver: fragment in driver.current_url, check)
+
+
+def url_not_contains(fragment):
+    """Ready once the current URL no longer contains the fragment."""
+
+    async def check(driver):
+        return fragment not in await driver.get_current_url()
+
+    return Condition(f"url does not contain '{fragment}'", lambda driver: fragment not in driver.current_url, check)
+
+
+def url_matches(pattern):
+    """Ready once the current URL matches the regular expression."""
+    regex = re.compile(pattern)
+
+    async def check(driver):
+        return regex.search(await driver.get_current_url()) is not None
+
+    return Condition(f"url matches /{pattern}/", lambda driver: regex.search(driver.current_url) is not None, check)
+
+
+def element_present(xpath):
+    """Ready once an element matching the xpath is in the DOM."""
+
+    async def check(driver):
+        return len(await driver.find_elements(By.XPATH, xpath)) > 0
+
+    return Condition(
+        f"element present: {xpath}",
+        lambda driver: len(driver.find_elements(By.XPATH, xpath)) > 0,
+        check,
+    )
+
+
+def element_visible(xpath):
+    """Ready once an element matching the xpath is displayed."""
+
+    async def check(driver):
+        for element in await driver.find_elements(By.XPATH, xpath):
+            if await element.is_displayed():
+                return True
+        return False
+
+    return Condition(
+        f"element visible: {xpath}",
+        lambda driver: any(element.is_displayed() for element in driver.find_elements(By.XPATH, xpath)),
+        check,
+    )
+
+
+def read_count(driver, xpath):
+    """
+    Read the first integer from the text of the element at xpath.
+
+    Returns:
+        int or None: The parsed count, or None when the element is missing or has no digits
+    """
+    elements = driver.find_elements(By.XPATH, xpath)
+    if not elements:
+        return None
+    match = re.search(r"\d+", elements[0].text or "")
+    return int(match.group()) if match else None
+
+
+async def read_count_async(driver, xpath):
+    """read_count for an AsyncWebDriver."""
+    elements = await driver.find_elements(By.XPATH, xpath)
+    if not elements:
+        return None
+    match = re.search(r"\d+", await elements[0].text() or "")
+    return int(match.group()) if match else None
+
+
+def count_changed(xpath, baseline):
+    """Ready once the integer shown by the element at xpath differs from baseline."""
+
+    def predicate(driver):
+        current = read_count(driver, xpath)
+        return current is not None and current != baseline
+
+    async def check(driver):
+        current = await read_count_async(driver, xpath)
+        return current is not None and current != baseline
+
+    return Condition(f"count at {xpath} changed from {baseline}", predicate, check)
+
+
+def all_of(*conditions):
+    """Ready once every condition holds."""
+
+    async def check(driver):
+        for condition in conditions:
+            if not await condition.evaluate(driver):
+                return False
+        return True
+
+    return Condition(
+        " and ".join(c.description for c in conditions),
+        lambda driver: all(c(driver) for c in conditions),
+        check,
+    )
+
+
+def any_of(*conditions):
+    """Ready once at least one condition holds."""
+
+    async def check(driver):
+        for condition in conditions:
+            if await condition.evaluate(driver):
+                return True
+        return False
+
+    return Condition(
+        " or ".join(c.description for c in conditions),
+        lambda driver: any(c(driver) for c in conditions),
+        check,
+    )
+
+
+class StepTiming:
+    """Outcome of a single readiness wait, compared against the sleep it replaced."""
+
+    def __init__(self, step, condition, legacy_sleep, waited, ready, ceiling):
+        self.step = step
+        self.condition = condition
+        self.legacy_sleep = legacy_sleep
+        self.waited = waited
+        self.ready = ready
+        self.ceiling = ceiling
+
+    @property
+    def saved(self):
+        return self.legacy_sleep - self.waited
+
+    def as_dict(self):
+        return {
+            "step": self.step,
+            "condition": self.condition,
+            "legacy_sleep": self.legacy_sleep,
+            "waited": round(self.waited, 3),
+            "saved": round(self.saved, 3),
+            "ready": self.ready,
+            "ceiling": self.ceiling,
+        }
+
+
+class ReadinessEngine:
+    """
+    Polls readiness conditions after page transitions instead of sleeping.
+
+    One engine is shared by every page object bound to the same driver, so the
+    report covers the whole flow regardless of which page declared the step.
+    """
+
+    DEFAULT_CEILING = 10
+    POLL_FREQUENCY = 0.1
+
+    _engines = {}
+
+    def __init__(self, driver, poll_frequency=POLL_FREQUENCY):
+        self.driver = driver
+        self.poll_frequency = poll_frequency
+        self.timings = []
+
+    @classmethod
+    def for_driver(cls, driver):
+        """Return the engine shared by all page objects using this driver."""
+        engine = cls._engines.get(id(driver))
+        if engine is None or engine.driver is not driver:
+            engine = cls(driver)
+            cls._engines[id(driver)] = engine
+        return engine
+
+    @classmethod
+    def release(cls, driver):
+        """Forget the engine bound to a driver that is being quit."""
+        cls._engines.pop(id(driver), None)
+
+    def wait(self, step, condition, ceiling=None, legacy_sleep=0):
+        """
+        Block until the condition holds or the ceiling is reached.
+
+        Args:
+            step (str): Name of the transition, used in the report
+            condition (Condition): What "ready" means for this step
+            ceiling (float): Maximum seconds to wait; defaults to DEFAULT_CEILING
+            legacy_sleep (float): Seconds the fixed sleep used to cost, for the report
+
+        Returns:
+            bool: True if the condition held before the ceiling, False otherwise
+        """
+        ceiling = self.DEFAULT_CEILING if ceiling is None else ceiling
+        start = time.monotonic()
+        try:
+            with StepMetrics.shared().waiting():
+                WebDriverWait(self.driver, ceiling, poll_frequency=self.poll_frequency).until(condition)
+            ready = True
+        except TimeoutException:
+            ready = False
+        waited = time.monotonic() - start
+        return self._record(step, condition, legacy_sleep, waited, ready, ceiling)
+
+    def _record(self, step, condition, legacy_sleep, waited, ready, ceiling):
+        timing = StepTiming(step, condition.description, legacy_sleep, waited, ready, ceiling)
+        self.timings.append(timing)
+        status = "ready" if ready else "ceiling reached"
+        print(f"Step '{step}' {status} after {waited:.2f}s (fixed sleep was {legacy_sleep}s)")
+        return ready
+
+    def report(self):
+        """Return the per-step comparison of old sleep time against actual wait time."""
+        return [timing.as_dict() for timing in self.timings]
+
+    def format_report(self):
+        lines = [f"{'step':<28}{'sleep(s)':>10}{'waited(s)':>11}{'saved(s)':>10}  ready"]
+        for timing in self.timings:
+            lines.append(
+                f"{timing.step:<28}{timing.legacy_sleep:>10.2f}{timing.waited:>11.2f}"
+                f"{timing.saved:>10.2f}  {timing.ready}"
+            )
+        total_sleep = sum(t.legacy_sleep for t in self.timings)
+        total_waited = sum(t.waited for t in self.timings)
+        lines.append(
+            f"{'TOTAL':<28}{total_sleep:>10.2f}{total_waited:>11.2f}{total_sleep - total_waited:>10.2f}"
+        )
+        return "\n".join(lines)
+
+    def attach_report(self, name="readiness_report"):
+        allure.attach(self.format_report(), name=name, attachment_type=allure.attachment_type.TEXT)
+
+    def reset(self):
+        self.timings = []
+
+
+class AsyncReadinessEngine(ReadinessEngine):
+    """
+    ReadinessEngine for an AsyncWebDriver.
+
+    Polls with asyncio.sleep, so every other flow on the event loop runs while
+    this one waits. Waits are not added to StepMetrics: its frames are per
+    thread, and concurrent flows share one.
+    """
+
+    _engines = {}
+
+    async def wait(self, step, condition, ceiling=None, legacy_sleep=0):
+        """
+        Await the condition until it holds or the ceiling is reached.
+
+        Args:
+            step (str): Name of the transition, used in the report
+            condition (Condition): What "ready" means for this step; needs an async check
+            ceiling (float): Maximum seconds to wait; defaults to DEFAULT_CEILING
+            legacy_sleep (float): Seconds the fixed sleep used to cost, for the report
+
+        Returns:
+            bool: True if the condition held before the ceiling, False otherwise
+        """
+        ceiling = self.DEFAULT_CEILING if ceiling is None else ceiling
+        start = time.monotonic()
+        while True:
+            ready = await condition.evaluate(self.driver)
+            if ready or time.monotonic() - start >= ceiling:
+                break
+            await asyncio.sleep(self.poll_frequency)
+        waited = time.monotonic() - start
+        return self._record(step, condition, legacy_sleep, waited, ready, ceiling)
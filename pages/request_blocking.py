@@ -0,0 +1,310 @@
+"""
+DevTools request blocking for the third-party resources no assertion reads.
+
+Page objects declare ALLOWED_REQUESTS and BLOCKED_REQUESTS; every page object
+constructed on a driver adds its patterns to that driver's RequestBlocker, which
+hands them to Chrome with Network.setBlockedURLs. Allow patterns win over deny
+patterns. Patterns are full URLs with * wildcards, e.g. "*://*.doubleclick.net/*".
+
+REQUEST_BLOCKING selects the profile:
+
+    default     block analytics, trackers and web fonts (the safe profile)
+    aggressive  also block images; page objects re-allow the ones they assert on
+    observe     block nothing, but learn the size and load time of what would be blocked
+    off         block and record nothing
+
+REQUEST_BLOCKING_DENY and REQUEST_BLOCKING_ALLOW add comma-separated patterns.
+Blocked requests are counted from Chrome's performance log. Bytes and load time
+saved are estimated from what observe runs learned about the same patterns,
+kept in .request_blocking.json. For a measured comparison, benchmark the flow
+with REQUEST_BLOCKING=off and with the profile under test.
+"""
+import json
+import os
+import re
+import threading
+
+import allure
+from selenium.common.exceptions import WebDriverException
+
+TRACKER_PATTERNS = [
+    "*://*.google-analytics.com/*",
+    "*://*.googletagmanager.com/*",
+    "*://*.doubleclick.net/*",
+    "*://*.facebook.net/*",
+    "*://*.hotjar.com/*",
+    "*://monorail-edge.shopifysvc.com/*",
+    "*://*/.well-known/shopify/monorail/*",
+    "*://*/*trekkie*",
+]
+FONT_PATTERNS = [
+    "*://fonts.googleapis.com/*",
+    "*://fonts.gstatic.com/*",
+    "*://fonts.shopifycdn.com/*",
+    "*://*/*.woff2*",
+    "*://*/*.woff*",
+]
+IMAGE_PATTERNS = [
+    "*://*/*.jpg*",
+    "*://*/*.jpeg*",
+    "*://*/*.png*",
+    "*://*/*.gif*",
+    "*://*/*.webp*",
+]
+
+PROFILES = {
+    "off": {"deny": [], "enforce": False},
+    "observe": {"deny": TRACKER_PATTERNS + FONT_PATTERNS + IMAGE_PATTERNS, "enforce": False},
+    "default": {"deny": TRACKER_PATTERNS + FONT_PATTERNS, "enforce": True},
+    "aggressive": {"deny": TRACKER_PATTERNS + FONT_PATTERNS + IMAGE_PATTERNS, "enforce": True},
+}
+DEFAULT_PROFILE = "default"
+
+# Chrome's reason for a request stopped by Network.setBlockedURLs
+INSPECTOR_BLOCKED = "inspector"
+
+_compiled = {}
+
+
+def profile_name(environ=None):
+    environ = os.environ if environ is None else environ
+    name = environ.get("REQUEST_BLOCKING", DEFAULT_PROFILE)
+    if name not in PROFILES:
+        raise ValueError(f"Unknown request blocking profile '{name}', expected one of {', '.join(PROFILES)}")
+    return name
+
+
+def matches(pattern, url):
+    """Match a URL against a pattern whose only special character is the * wildcard."""
+    regex = _compiled.get(pattern)
+    if regex is None:
+        regex = _compiled[pattern] = re.compile(".*".join(re.escape(part) for part in pattern.split("*")))
+    return regex.fullmatch(url) is not None
+
+
+def _patterns(value):
+    return [pattern.strip() for pattern in (value or "").split(",") if pattern.strip()]
+
+
+class RequestBlockingStats:
+    """
+    Run-wide blocking report, plus the per-pattern sizes learned by observe runs.
+
+    Learned sizes are persisted across runs, so a run that blocks a pattern can
+    report the bytes and load time a run that loaded it paid. Saving adds this
+    run's measurements to the file, so parallel workers never erase each other's.
+    """
+
+    DEFAULT_PATH = ".request_blocking.json"
+
+    _shared = None
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("REQUEST_BLOCKING_STATS_PATH", self.DEFAULT_PATH)
+        self.blocked = {}
+        # Measurements taken since the last save, added to the file's totals on save
+        self.pending = {}
+        self._lock = threading.Lock()
+        self.learned = self._load()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Add the measurements taken since the last save to the file, keeping what other workers saved."""
+        with self._lock:
+            if not self.pending:
+                return
+            learned = self._load()
+            for pattern, new in self.pending.items():
+                self._add(learned, pattern, new["samples"], new["bytes"], new["seconds"])
+            # Write-then-rename so concurrent workers never leave a truncated file behind
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(learned, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+            self.learned = learned
+            self.pending = {}
+
+    @staticmethod
+    def _add(totals, pattern, samples, size, seconds):
+        entry = totals.setdefault(pattern, {"samples": 0, "bytes": 0, "seconds": 0.0})
+        entry["samples"] += samples
+        entry["bytes"] += size
+        entry["seconds"] = round(entry["seconds"] + seconds, 4)
+
+    def record_blocked(self, pattern):
+        with self._lock:
+            self.blocked[pattern] = self.blocked.get(pattern, 0) + 1
+
+    def record_observed(self, pattern, size, seconds):
+        with self._lock:
+            self._add(self.learned, pattern, 1, size, seconds)
+            self._add(self.pending, pattern, 1, size, seconds)
+
+    def report(self):
+        """
+        Summarize what was blocked this run.
+
+        Returns:
+            dict: Blocked requests and estimated bytes/seconds saved in total and per pattern;
+                estimates are None for patterns no observe run has measured yet
+        """
+        with self._lock:
+            blocked = dict(self.blocked)
+            learned = {pattern: dict(entry) for pattern, entry in self.learned.items()}
+        patterns = {}
+        for pattern, requests in sorted(blocked.items(), key=lambda item: item[1], reverse=True):
+            entry = learned.get(pattern)
+            estimate = entry and entry["samples"]
+            patterns[pattern] = {
+                "requests": requests,
+                "estimated_bytes": round(requests * entry["bytes"] / entry["samples"]) if estimate else None,
+                "estimated_seconds": round(requests * entry["seconds"] / entry["samples"], 3) if estimate else None,
+            }
+        return {
+            "requests_blocked": sum(blocked.values()),
+            "estimated_bytes_saved": sum(p["estimated_bytes"] or 0 for p in patterns.values()),
+            # Requests load in parallel, so summed load times are an upper bound on the wall time saved
+            "estimated_seconds_saved": round(sum(p["estimated_seconds"] or 0 for p in patterns.values()), 3),
+            "patterns": patterns,
+        }
+
+    def format_report(self):
+        report = self.report()
+        return (
+            f"Request blocking: {report['requests_blocked']} requests blocked, "
+            f"~{report['estimated_bytes_saved'] / 1024:.0f} KB and "
+            f"up to {report['estimated_seconds_saved']:.2f}s of load time saved"
+        )
+
+
+class RequestBlocker:
+    """
+    Applies the blocking rules of every page object on one driver and accounts for them.
+
+    Rules are browser-wide: once a page object adds a pattern it applies to
+    every page the driver loads, and they are only re-sent to Chrome when the
+    set changes.
+    """
+
+    _blockers = {}
+
+    def __init__(self, driver, environ=None, stats=None):
+        environ = os.environ if environ is None else environ
+        self.driver = driver
+        self.profile = profile_name(environ)
+        profile = PROFILES[self.profile]
+        self.enforce = profile["enforce"]
+        self.enabled = self.profile != "off"
+        self.logging = self.enabled
+        self.allow = _patterns(environ.get("REQUEST_BLOCKING_ALLOW"))
+        self.deny = profile["deny"] + _patterns(environ.get("REQUEST_BLOCKING_DENY"))
+        self.stats = stats if stats is not None else RequestBlockingStats.shared()
+        self.applied = None
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_driver(cls, driver):
+        """Return the blocker shared by all page objects using this driver."""
+        blocker = cls._blockers.get(id(driver))
+        if blocker is None or blocker.driver is not driver:
+            blocker = cls(driver)
+            cls._blockers[id(driver)] = blocker
+        return blocker
+
+    @classmethod
+    def release(cls, driver):
+        cls._blockers.pop(id(driver), None)
+
+    def add_rules(self, allow=(), deny=()):
+        """Add a page object's patterns and re-apply the rules if they changed."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.allow += [pattern for pattern in allow if pattern not in self.allow]
+            self.deny += [pattern for pattern in deny if pattern not in self.deny]
+        self.apply()
+
+    def apply(self):
+        """Send the current rules to Chrome; drivers without DevTools are left alone."""
+        rules = (tuple(self.allow), tuple(self.deny))
+        if not self.enforce or rules == self.applied or not hasattr(self.driver, "execute_cdp_cmd"):
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            # Ordered patterns where the first match decides, so allow patterns can carve out exceptions
+            url_patterns = [{"urlPattern": pattern, "block": False} for pattern in self.allow]
+            url_patterns += [{"urlPattern": pattern, "block": True} for pattern in self.deny]
+            try:
+                self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urlPatterns": url_patterns})
+            except WebDriverException:
+                # Older Chrome only knows plain deny wildcards; drop the deny patterns an allow rule overlaps
+                print("Chrome does not support ordered block patterns, dropping deny patterns that overlap allow rules")
+                urls = [pattern for pattern in self.deny if not any(matches(pattern, allow) for allow in self.allow)]
+                self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+        except WebDriverException as e:
+            print(f"Failed to apply request blocking: {e}")
+            return
+        self.applied = rules
+
+    def decision(self, url):
+        """
+        Return the deny pattern that blocks url, or None if it is allowed.
+
+        Mirrors the rules given to Chrome, to attribute blocked requests to a pattern.
+        """
+        if any(matches(pattern, url) for pattern in self.allow):
+            return None
+        return next((pattern for pattern in self.deny if matches(pattern, url)), None)
+
+    def collect(self):
+        """Account for the network events Chrome logged since the last call."""
+        if not self.logging or not hasattr(self.driver, "get_log"):
+            return
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException:
+            # The session was started without performance logging; nothing to account for
+            self.logging = False
+            return
+        observed = False
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                self._requests[params["requestId"]] = (params["request"]["url"], params.get("timestamp", 0))
+            elif method == "Network.loadingFailed":
+                url, _ = self._requests.pop(params["requestId"], (None, 0))
+                if url and params.get("blockedReason") == INSPECTOR_BLOCKED:
+                    self.stats.record_blocked(self.decision(url) or "(unattributed)")
+            elif method == "Network.loadingFinished":
+                url, started = self._requests.pop(params["requestId"], (None, 0))
+                pattern = self.decision(url) if url else None
+                if pattern:
+                    size = int(params.get("encodedDataLength", 0))
+                    self.stats.record_observed(pattern, size, max(params.get("timestamp", started) - started, 0))
+                    observed = True
+        if observed:
+            self.stats.save()
+
+    def report(self):
+        self.collect()
+        return dict(self.stats.report(), profile=self.profile)
+
+    def attach_report(self, name="request_blocking"):
+        allure.attach(json.dumps(self.report(), indent=2), name=name, attachment_type=allure.attachment_type.JSON)
@@ -0,0 +1,176 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+try:
+    from PIL import Image
+except ImportError:  # Without Pillow only exact content hashing is available
+    Image = None
+
+
+def content_key(data):
+    """SHA-256 of the encoded bytes; identical files share a blob."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_key(png_bytes, hash_size=16):
+    """
+    Difference hash of the screenshot, so visually identical pages share a blob
+    even when encoder noise or a blinking caret changes a few bytes.
+    """
+    image = Image.open(io.BytesIO(png_bytes)).convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = image.tobytes()
+    bits = 0
+    for row in range(hash_size):
+        for column in range(hash_size):
+            left = pixels[row * (hash_size + 1) + column]
+            right = pixels[row * (hash_size + 1) + column + 1]
+            bits = (bits << 1) | (left > right)
+    return f"p{bits:0{hash_size * hash_size // 4}x}"
+
+
+class ScreenshotStore:
+    """
+    Content-addressed screenshot storage with deduplication and a disk budget.
+
+    Blobs live under <root>/blobs/<key[:2]>/<key>.<ext>; index.json maps every
+    capture (test, step, timestamp) to its blob. A repeated failure that produces
+    the same image only adds an index entry. When the blobs exceed the budget the
+    least recently referenced ones are evicted together with their entries. When
+    the index exceeds max_entries the oldest entries are dropped and release their
+    blob, which is deleted once no entry references it.
+    """
+
+    INDEX_NAME = "index.json"
+    DEFAULT_BUDGET_MB = 200
+    MAX_ENTRIES = 10000
+
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, root, budget_bytes=None, key_mode=None, max_entries=MAX_ENTRIES):
+        self.root = root
+        if budget_bytes is None:
+            budget_bytes = int(float(os.environ.get("SCREENSHOT_BUDGET_MB", self.DEFAULT_BUDGET_MB)) * 1024 * 1024)
+        self.budget_bytes = budget_bytes
+        key_mode = key_mode or os.environ.get("SCREENSHOT_KEY", "perceptual")
+        self.key_mode = key_mode if Image is not None else "content"
+        self.max_entries = max_entries
+        self.index_path = os.path.join(root, self.INDEX_NAME)
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self.index = self._load()
+
+    @classmethod
+    def for_directory(cls, root):
+        """Return the store shared by every writer in this process for a directory."""
+        key = os.path.abspath(root)
+        with cls._stores_lock:
+            if key not in cls._stores:
+                cls._stores[key] = cls(root)
+            return cls._stores[key]
+
+    def _load(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"entries": [], "blobs": {}}
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(temp_path, self.index_path)
+
+    def key_for(self, data, png_bytes=None):
+        if self.key_mode == "perceptual" and png_bytes is not None:
+            return perceptual_key(png_bytes)
+        return content_key(data)
+
+    def put(self, data, extension, test, step, timestamp=None, png_bytes=None):
+        """
+        Store an encoded screenshot, reusing an existing blob when the key matches.
+
+        Args:
+            data (bytes): Encoded image to store
+            extension (str): File extension of the encoded image
+            test (str): Test that captured it
+            step (str): Screenshot name, usually the failing step
+            timestamp (float): Capture time; defaults to now
+            png_bytes (bytes): Original capture, used for perceptual keys
+
+        Returns:
+            str: Path of the blob the entry points to
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        key = self.key_for(data, png_bytes)
+        with self._lock:
+            blobs = self.index["blobs"]
+            blob = blobs.get(key)
+            if blob is None or not os.path.exists(blob["path"]):
+                path = os.path.join(self.root, "blobs", key[:2], f"{key}.{extension}")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+                blob = {"path": path, "size": len(data), "refs": 0}
+                blobs[key] = blob
+            blob["refs"] += 1
+            blob["last_used"] = timestamp
+            self.index["entries"].append({"test": test, "step": step, "timestamp": timestamp, "blob": key})
+            self._trim()
+            self._evict()
+            self._save()
+            return blob["path"]
+
+    def disk_usage(self):
+        return sum(blob["size"] for blob in self.index["blobs"].values())
+
+    def _remove_blob(self, key):
+        try:
+            os.remove(self.index["blobs"][key]["path"])
+        except OSError:
+            pass
+        del self.index["blobs"][key]
+
+    def _trim(self):
+        excess = len(self.index["entries"]) - self.max_entries
+        if excess <= 0:
+            return
+        dropped, self.index["entries"] = self.index["entries"][:excess], self.index["entries"][excess:]
+        for entry in dropped:
+            blob = self.index["blobs"].get(entry["blob"])
+            if blob is None:
+                continue
+            blob["refs"] -= 1
+            if blob["refs"] <= 0:
+                self._remove_blob(entry["blob"])
+
+    def _evict(self):
+        usage = self.disk_usage()
+        if usage <= self.budget_bytes:
+            return
+        evicted = set()
+        for key, blob in sorted(self.index["blobs"].items(), key=lambda item: item[1]["last_used"]):
+            if usage <= self.budget_bytes:
+                break
+            usage -= blob["size"]
+            evicted.add(key)
+        for key in evicted:
+            self._remove_blob(key)
+        self.index["entries"] = [entry for entry in self.index["entries"] if entry["blob"] not in evicted]
+        self.evicted += len(evicted)
+        print(f"Evicted {len(evicted)} screenshot blobs to stay within {self.budget_bytes / 1024 / 1024:.0f} MB")
+
+    def entries(self, test=None, step=None):
+        """Return index entries, optionally filtered by test and step."""
+        with self._lock:
+            return [
+                dict(entry, path=self.index["blobs"][entry["blob"]]["path"])
+                for entry in self.index["entries"]
+                if (test is None or entry["test"] == test) and (step is None or entry["step"] == step)
+            ]
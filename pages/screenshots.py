@@ -0,0 +1,148 @@
+import atexit
+import io
+import os
+import queue
+import threading
+import time
+
+from .screenshot_store import ScreenshotStore
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it screenshots are written as captured PNGs
+    Image = None
+
+
+class ScreenshotJob:
+    """Captured screenshot bytes waiting to be encoded and written."""
+
+    def __init__(self, png_bytes, directory, name, test, timestamp, image_format):
+        self.png_bytes = png_bytes
+        self.directory = directory
+        self.name = name
+        self.test = test
+        self.timestamp = timestamp
+        self.image_format = image_format
+        self.path = os.path.join(directory, name)
+
+
+class ScreenshotPipeline:
+    """
+    Encodes and writes screenshots on a background thread.
+
+    The test thread only grabs the PNG bytes from the driver and queues them;
+    downscaling, JPEG/WebP conversion and the write into the directory's
+    content-addressed ScreenshotStore happen on the worker.
+    The queue is bounded, so a burst of failures applies backpressure instead
+    of dropping artifacts, and flush() is a barrier that waits for every
+    queued screenshot to be on disk.
+    """
+
+    EXTENSIONS = {"jpeg": "jpg", "webp": "webp", "png": "png"}
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, image_format=None, max_width=None, quality=None, queue_size=None):
+        image_format = (image_format or os.environ.get("SCREENSHOT_FORMAT", "jpeg")).lower()
+        # Without Pillow there is nothing to convert with, so keep the captured PNG
+        self.image_format = image_format if Image is not None else "png"
+        self.max_width = max_width or int(os.environ.get("SCREENSHOT_MAX_WIDTH", "1280"))
+        self.quality = quality or int(os.environ.get("SCREENSHOT_QUALITY", "70"))
+        self.queue = queue.Queue(maxsize=queue_size or int(os.environ.get("SCREENSHOT_QUEUE_SIZE", "16")))
+        self.written = 0
+        self.bytes_captured = 0
+        self.bytes_written = 0
+        self.errors = []
+        self._worker = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def shared(cls):
+        """Return the process-wide pipeline, flushed automatically at interpreter exit."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+                atexit.register(cls._shared.flush)
+            return cls._shared
+
+    @classmethod
+    def flush_shared(cls):
+        """Flush the shared pipeline if any screenshot was taken in this process."""
+        if cls._shared is not None:
+            cls._shared.flush()
+
+    def submit(self, png_bytes, directory, name, test=None, timestamp=None):
+        """
+        Queue captured PNG bytes for encoding and storing.
+
+        Blocks only when the queue is full, so no screenshot is ever dropped.
+
+        Args:
+            png_bytes (bytes): Screenshot as returned by get_screenshot_as_png()
+            directory (str): Screenshot store directory
+            name (str): Step name recorded in the store index
+            test (str): Test that captured it; defaults to the running pytest test
+            timestamp (float): Capture time; defaults to now
+
+        Returns:
+            ScreenshotJob: The queued job
+        """
+        if test is None:
+            test = os.environ.get("PYTEST_CURRENT_TEST", "").split(" ")[0] or "unknown"
+        timestamp = time.time() if timestamp is None else timestamp
+        job = ScreenshotJob(png_bytes, directory, name, test, timestamp, self.image_format)
+        self.bytes_captured += len(png_bytes)
+        self.queue.put(job)
+        return job
+
+    def encode(self, png_bytes, image_format):
+        """Downscale and convert PNG bytes to the configured format."""
+        if Image is None:
+            return png_bytes
+        image = Image.open(io.BytesIO(png_bytes))
+        if self.max_width and image.width > self.max_width:
+            height = round(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        if image_format == "png":
+            image.save(output, format="PNG", optimize=True)
+        else:
+            image.convert("RGB").save(output, format=image_format.upper(), quality=self.quality)
+        return output.getvalue()
+
+    def write(self, job):
+        data = self.encode(job.png_bytes, job.image_format)
+        store = ScreenshotStore.for_directory(job.directory)
+        blobs_before = len(store.index["blobs"])
+        job.path = store.put(
+            data,
+            self.EXTENSIONS.get(job.image_format, "png"),
+            job.test,
+            job.name,
+            timestamp=job.timestamp,
+            png_bytes=job.png_bytes,
+        )
+        self.written += 1
+        if len(store.index["blobs"]) > blobs_before:
+            self.bytes_written += len(data)
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                self.write(job)
+            except Exception as e:
+                self.errors.append((job.path, repr(e)))
+                print(f"Failed to write screenshot {job.path}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """Block until every queued screenshot has been written."""
+        self.queue.join()
+        if self.written:
+            print(
+                f"Screenshot pipeline flushed: {self.written} files, "
+                f"{self.bytes_captured / 1024:.0f} KB captured, {self.bytes_written / 1024:.0f} KB written"
+            )
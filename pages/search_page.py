@@ -1,21 +1,25 @@
 from .base_page import BasePage
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from . import readiness as ready
 import allure
 
 class HomePage(BasePage):
     SIGN_UP_LINK = "//a[contains(text(),'Sign up')]"
     SEARCH_INPUT = "//input[@id='search-field']"
     SEARCH_BUTTON = "//button[@type='submit' and contains(@class, 'icon-search') or contains(@class, 'search-button') or contains(@aria-label, 'Search') or contains(@class, 'search-submit')]"
+    SEARCH_RESULT = "//a[starts-with(@id, 'product-')]"
 
-    def __init__(self, driver):
-        super().__init__(driver)
+    READY_CONDITIONS = {
+        "home_loaded": (ready.document_ready(), 10),
+        "search_results": (ready.all_of(ready.url_contains("search"), ready.element_present(SEARCH_RESULT)), 10),
+        "sign_up_loaded": (ready.all_of(ready.url_contains("register"), ready.document_ready()), 10),
+    }
+
+    def __init__(self, driver, base_url=None):
+        super().__init__(driver, base_url)
 
     @allure.step("Navigate to homepage")
     def navigate_to_home(self):
-        self.driver.get('https://sauce-demo.myshopify.com')
+        self.driver.get(self.base_url)
 
     @allure.step("Click on Sign Up link")
     def click_sign_up(self):
@@ -23,9 +27,8 @@ class HomePage(BasePage):
 
     @allure.step("Search for product: {search_term}")
     def search_product(self, search_term):
-        self.send_keys_to_element(self.SEARCH_INPUT, search_term)
-        element = self.wait.until(EC.element_to_be_clickable((By.XPATH, self.SEARCH_INPUT)))
-        element.send_keys(Keys.RETURN)
+        # Typing and submitting the search form happen in the same round trip
+        self.send_keys_to_element(self.SEARCH_INPUT, search_term, submit=True)
         print(f"Product searched: {search_term}")
 
     @allure.step("Click search button")
@@ -39,10 +42,7 @@ class HomePage(BasePage):
     @allure.step("Click first product in search results")
     def click_first_product_in_search_results(self):
         try:
-            first_product = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "a[id^='product-']"))
-            )
-            first_product.click()
+            self.perform_action(self.SEARCH_RESULT, "click")
             print("Clicked on the first product successfully")
             return True
         except Exception as e:
@@ -1,9 +1,9 @@
 # Import the BasePage class which contains common methods for all pages
 from .base_page import BasePage
+# Import readiness conditions used to declare when registration has been processed
+from . import readiness as ready
 # Import Allure for test reporting and step tracking
 import allure
-# Import time module for adding delays in the automation
-import time
 
 class RegistrationPage(BasePage):
     """
@@ -23,16 +23,21 @@ class RegistrationPage(BasePage):
     CREATE_ACCOUNT_BUTTON = "//input[@type='submit' and @value='Create']"  # Correct XPath according to provided list
     # Locator for the Logout element (used to verify successful registration)
     LOGOUT_ELEMENT = "//a[text()='Log Out']"  # Correct XPath according to provided list
+    # Registration is processed once the Log Out link shows up or the store leaves the register form
+    READY_CONDITIONS = {
+        "account_created": (ready.any_of(ready.element_present(LOGOUT_ELEMENT), ready.url_not_contains("register")), 10),
+    }
 
-    def __init__(self, driver):
+    def __init__(self, driver, base_url=None):
         """
         Initialize the RegistrationPage object by calling the parent BasePage constructor.
         
         Args:
             driver: The Selenium WebDriver instance to interact with the browser
+            base_url (str): Storefront root URL; defaults to BASE_URL or the Sauce demo store
         """
         # Call the parent class constructor to initialize the base page functionality
-        super().__init__(driver)
+        super().__init__(driver, base_url)
         # Store the driver instance (redundant since BasePage already stores it, but kept for clarity)
         self.driver = driver
 
@@ -76,8 +81,8 @@ class RegistrationPage(BasePage):
         self.click_element(self.CREATE_ACCOUNT_BUTTON)
         # Print confirmation message
         print("Clicked on Create button")
-        # Wait 2 seconds for registration to process (allow time for server-side operations)
-        time.sleep(2)  # Wait for registration to process
+        # Wait for the server-side registration to finish instead of a fixed 2 second sleep
+        self.wait_until_ready("account_created", legacy_sleep=2)
 
     @allure.step("Verify registration success")
     def verify_registration_success(self):
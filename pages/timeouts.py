@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+
+import allure
+
+from .instrumentation import percentile
+
+
+def enabled(environ=None):
+    environ = os.environ if environ is None else environ
+    return environ.get("ADAPTIVE_TIMEOUTS", "1").lower() in ("1", "true", "yes")
+
+
+class TimeoutModel:
+    """
+    Sets wait ceilings from the latency each step and locator has shown in earlier runs.
+
+    Every successful wait adds its duration to a bounded window of samples per
+    key ("Page.step|locator"), persisted across runs. Once a key has min_samples,
+    its ceiling is the p99 latency times safety_factor, kept between floor and
+    cap; until then it runs in cold-start mode with the legacy fixed timeout.
+    A wait that runs into its ceiling adds the ceiling as a sample: its real
+    latency was at least that long, so repeated timeouts raise the p99 and the
+    ceiling widens instead of cutting off every slower run for good.
+    Every decision keeps the reason it was made, for the report.
+
+    ADAPTIVE_TIMEOUTS=0 keeps the legacy timeouts while still recording latency.
+    """
+
+    DEFAULT_PATH = ".timeout_stats.json"
+    LEGACY_TIMEOUT = 10
+    SAFETY_FACTOR = 3.0
+    FLOOR = 2.0
+    CAP = 30.0
+    MIN_SAMPLES = 20
+    WINDOW = 200
+
+    _shared = None
+
+    def __init__(self, path=None, safety_factor=SAFETY_FACTOR, floor=FLOOR, cap=CAP,
+                 min_samples=MIN_SAMPLES, window=WINDOW, adaptive=None):
+        self.path = path or os.environ.get("TIMEOUT_STATS_PATH", self.DEFAULT_PATH)
+        self.safety_factor = safety_factor
+        self.floor = floor
+        self.cap = cap
+        self.min_samples = min_samples
+        self.window = window
+        self.adaptive = enabled() if adaptive is None else adaptive
+        self.decisions = {}
+        self.pending = {}
+        self._lock = threading.Lock()
+        self.stats = self._load()
+
+    @classmethod
+    def shared(cls):
+        """Return the process-wide model used by BasePage."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def save_shared(cls):
+        """Save the latency of the process-wide model, if one recorded anything."""
+        if cls._shared is not None and cls._shared.pending:
+            cls._shared.save()
+            print(f"Timeout statistics written to {cls._shared.path}")
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Add this run's samples to the store, keeping what other workers saved meanwhile."""
+        with self._lock:
+            stats = self._load()
+            for key, new in self.pending.items():
+                entry = stats.setdefault(key, {"samples": [], "timeouts": 0})
+                entry["samples"] = (entry["samples"] + new["samples"])[-self.window:]
+                entry["timeouts"] += new["timeouts"]
+            # Write-then-rename so concurrent workers never leave a truncated file behind
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(stats, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+            self.stats = stats
+            self.pending = {}
+
+    def _pending(self, key):
+        return self.pending.setdefault(key, {"samples": [], "timeouts": 0})
+
+    def samples(self, key):
+        """Stored and this run's latencies for a key, newest last, within the window."""
+        with self._lock:
+            stored = self.stats.get(key, {}).get("samples", [])
+            return (stored + self.pending.get(key, {}).get("samples", []))[-self.window:]
+
+    def record(self, key, seconds):
+        """Record how long a successful wait took."""
+        with self._lock:
+            self._pending(key)["samples"].append(round(seconds, 3))
+
+    def record_timeout(self, key):
+        """Record that a wait ran into the ceiling this model chose, as a sample at that ceiling."""
+        with self._lock:
+            decision = self.decisions.get(key)
+            pending = self._pending(key)
+            pending["timeouts"] += 1
+            if decision is not None:
+                pending["samples"].append(decision["timeout"])
+
+    def _decide(self, key, legacy):
+        samples = self.samples(key)
+        decision = {"key": key, "samples": len(samples), "legacy": legacy, "p99": None}
+        if not self.adaptive:
+            decision.update(timeout=legacy, mode="fixed", reason=f"adaptive timeouts are off; legacy {legacy}s")
+            return decision
+        if len(samples) < self.min_samples:
+            decision.update(
+                timeout=legacy, mode="cold_start",
+                reason=f"cold start: {len(samples)} of {self.min_samples} samples, legacy {legacy}s",
+            )
+            return decision
+        p99 = percentile(samples, 0.99)
+        raw = p99 * self.safety_factor
+        timeout = round(min(max(raw, self.floor), self.cap), 2)
+        reason = f"p99 {p99:.2f}s over {len(samples)} samples x {self.safety_factor:g} = {raw:.2f}s"
+        if raw < self.floor:
+            mode, reason = "floor", f"{reason}, raised to the {self.floor:g}s floor"
+        elif raw > self.cap:
+            mode, reason = "cap", f"{reason}, capped at {self.cap:g}s"
+        else:
+            mode = "learned"
+        decision.update(timeout=timeout, mode=mode, p99=p99, reason=reason)
+        return decision
+
+    def timeout(self, key, legacy=LEGACY_TIMEOUT):
+        """
+        Choose the ceiling for a wait.
+
+        Args:
+            key (str): "Page.step|locator" the wait's latency is recorded under
+            legacy (float): The fixed timeout this wait used to have, used until the key has enough samples
+
+        Returns:
+            float: Seconds to wait
+        """
+        decision = self._decide(key, legacy)
+        with self._lock:
+            self.decisions[key] = decision
+        return decision["timeout"]
+
+    def explain(self, key, legacy=LEGACY_TIMEOUT):
+        """Return why the key got its last timeout, or would get one now if it has not waited yet."""
+        with self._lock:
+            decision = self.decisions.get(key)
+        return (decision or self._decide(key, legacy))["reason"]
+
+    def report(self):
+        """
+        Summarize the timeouts chosen in this run.
+
+        Returns:
+            dict: The model settings and, per key waited on, the chosen timeout, its mode and reason,
+                the sample count, p50/p99 latency and ceilings reached
+        """
+        with self._lock:
+            decisions = dict(self.decisions)
+        steps = {}
+        for key, decision in sorted(decisions.items()):
+            samples = self.samples(key)
+            with self._lock:
+                timeouts = self.stats.get(key, {}).get("timeouts", 0) + self.pending.get(key, {}).get("timeouts", 0)
+            steps[key] = {
+                "timeout": decision["timeout"],
+                "mode": decision["mode"],
+                "reason": decision["reason"],
+                "samples": len(samples),
+                "p50": round(percentile(samples, 0.5), 3) if samples else None,
+                "p99": round(percentile(samples, 0.99), 3) if samples else None,
+                "timeouts": timeouts,
+            }
+        settings = {"safety_factor": self.safety_factor, "floor": self.floor, "cap": self.cap,
+                    "min_samples": self.min_samples, "window": self.window, "adaptive": self.adaptive}
+        return {"settings": settings, "steps": steps}
+
+    def format_report(self):
+        lines = [f"{'wait':<60}{'timeout(s)':>11}  reason"]
+        for key, step in self.report()["steps"].items():
+            lines.append(f"{key[:59]:<60}{step['timeout']:>11.2f}  {step['reason']}")
+        return "\n".join(lines)
+
+    def attach_report(self, name="adaptive_timeouts"):
+        allure.attach(json.dumps(self.report(), indent=2), name=name, attachment_type=allure.attachment_type.JSON)
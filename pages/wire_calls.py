@@ -0,0 +1,117 @@
+import functools
+import json
+import threading
+from contextlib import contextmanager
+
+import allure
+
+
+class WireCallCounter:
+    """
+    Counts WebDriver protocol commands issued by each page-object action.
+
+    Every Selenium command, including WebElement calls, goes through
+    WebDriver.execute, so wrapping that one method on the driver instance is
+    enough to see each HTTP round trip. Commands are attributed to the
+    innermost action currently running on the calling thread.
+    """
+
+    _counters = {}
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.actions = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._install()
+
+    @classmethod
+    def for_driver(cls, driver):
+        """Return the counter shared by all page objects using this driver."""
+        counter = cls._counters.get(id(driver))
+        if counter is None or counter.driver is not driver:
+            counter = cls(driver)
+            cls._counters[id(driver)] = counter
+        return counter
+
+    @classmethod
+    def release(cls, driver):
+        cls._counters.pop(id(driver), None)
+
+    def _install(self):
+        # A pooled driver may already carry a previous counter's wrapper; always wrap the original
+        execute = getattr(self.driver, "_uncounted_execute", None) or getattr(self.driver, "execute", None)
+        if execute is None:
+            # Simulated drivers without a command layer have nothing to count
+            return
+        self.driver._uncounted_execute = execute
+
+        def counting_execute(driver_command, params=None):
+            self._count(driver_command)
+            return execute(driver_command, params)
+
+        self.driver.execute = counting_execute
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _count(self, command):
+        stack = self._stack()
+        label = stack[-1]["label"] if stack else "(outside actions)"
+        with self._lock:
+            stats = self.actions.setdefault(label, {"calls": 0, "commands": 0, "by_command": {}})
+            stats["commands"] += 1
+            stats["by_command"][command] = stats["by_command"].get(command, 0) + 1
+        # Frames count inclusively so an outer step sees the commands of the actions it called
+        for frame in stack:
+            frame["commands"] += 1
+
+    @contextmanager
+    def action(self, label):
+        """
+        Attribute commands issued inside the with-block to label.
+
+        Yields:
+            dict: Frame whose "commands" key holds the commands issued so far, nested actions included
+        """
+        frame = {"label": label, "commands": 0}
+        stack = self._stack()
+        stack.append(frame)
+        with self._lock:
+            self.actions.setdefault(label, {"calls": 0, "commands": 0, "by_command": {}})["calls"] += 1
+        try:
+            yield frame
+        finally:
+            stack.pop()
+
+    def report(self):
+        """Return commands per action, including the average round trips per call."""
+        with self._lock:
+            report = {}
+            for label, stats in sorted(self.actions.items()):
+                report[label] = dict(stats, per_call=round(stats["commands"] / stats["calls"], 2) if stats["calls"] else None)
+            return report
+
+    def attach_report(self, name="wire_calls"):
+        allure.attach(json.dumps(self.report(), indent=2), name=name, attachment_type=allure.attachment_type.JSON)
+
+    def reset(self):
+        with self._lock:
+            self.actions = {}
+
+
+def counted(method):
+    """
+    Attribute the WebDriver commands a page-object method issues to "<PageClass>.<method>".
+
+    Apply above @allure.step so allure still sees the original signature.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.wire_calls.action(f"{type(self).__name__}.{method.__name__}"):
+            return method(self, *args, **kwargs)
+
+    return wrapper
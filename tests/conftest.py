@@ -0,0 +1,152 @@
+import os
+
+import allure_commons
+import pytest
+from allure_commons.logger import AllureFileLogger
+from pages.capture_policy import CapturePolicy
+from pages.instrumentation import StepMetrics
+from pages.locator_registry import LocatorRegistry
+from pages.request_blocking import RequestBlockingStats
+from pages.screenshots import ScreenshotPipeline
+from pages.timeouts import TimeoutModel
+from tests.test_data import login_search_data
+from tests.test_saucelabs import create_driver
+from utils import allure_stream, browser_contexts, execution_tree, impact
+from utils.browser_contexts import BrowserContextHost
+from utils.data_provider import DataProvider
+from utils.driver_factory import DriverFactory
+from utils.parallel_runner import shard
+from utils.session_pool import SessionPool
+from utils.simulated_driver import SimulatedDriver, virtual_waits
+from utils.storage_state import StorageStateCache
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    # ALLURE_STREAM=1: results go to one compact gzip stream per process instead of a file per event
+    report_dir = config.getoption("allure_report_dir", None)
+    if not report_dir or not allure_stream.enabled():
+        return
+    file_loggers = [plugin for plugin in allure_commons.plugin_manager.get_plugins()
+                    if isinstance(plugin, AllureFileLogger)]
+    for file_logger in file_loggers:
+        allure_commons.plugin_manager.unregister(file_logger)
+    stream_logger = allure_stream.StreamingAllureLogger(report_dir)
+    allure_commons.plugin_manager.register(stream_logger)
+
+    def close_stream():
+        stream_logger.close()
+        allure_commons.plugin_manager.unregister(stream_logger)
+        # allure-pytest unregisters its file logger on cleanup and expects it to still be there
+        for file_logger in file_loggers:
+            allure_commons.plugin_manager.register(file_logger)
+
+    config.add_cleanup(close_stream)
+
+
+def pytest_generate_tests(metafunc):
+    # Tests taking data_batch get a lazily evaluated shard of the configured dataset per item, so
+    # collection never reads the rows: an in-memory list gets one row per item as before, a streamed
+    # source is split into DATA_BATCHES items (default 16) that each read their rows when they run
+    if "data_batch" not in metafunc.fixturenames:
+        return
+    provider = DataProvider.from_environment(login_search_data)
+    if execution_tree.enabled():
+        # FLOW_TREE=1 shares steps between the rows of a batch, so rows stay together
+        count = int(os.environ.get("DATA_BATCHES", "1"))
+    else:
+        count = provider.length if provider.length else int(os.environ.get("DATA_BATCHES", "16"))
+    batches = provider.split(count)
+    if provider.length and not execution_tree.enabled():
+        ids = [next(iter(batch), {}).get("search_term", f"batch-{index}") for index, batch in enumerate(batches)]
+    else:
+        ids = [f"batch-{index}" for index in range(count)]
+    metafunc.parametrize("data_batch", batches, ids=ids)
+
+
+def pytest_collection_modifyitems(config, items):
+    # IMPACT_SELECT=1 keeps only the tests the diff since the recorded impact map can affect
+    if impact.selection_enabled():
+        selected, report = impact.select([item.nodeid for item in items], impact.ImpactMap.shared(),
+                                         os.environ.get("IMPACT_BASE"))
+        print(impact.format_report(selected, report))
+        selected = set(selected)
+        deselected = [item for item in items if item.nodeid not in selected]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if item.nodeid in selected]
+    # utils.parallel_runner sets SHARD_INDEX/SHARD_COUNT so each worker runs its own slice
+    count = int(os.environ.get("SHARD_COUNT", "1"))
+    if count <= 1:
+        return
+    index = int(os.environ["SHARD_INDEX"])
+    selected = shard(items, index, count)
+    deselected = [item for item in items if item not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    # IMPACT_RECORD=1 notes the page objects, methods and locators each test exercises
+    if not impact.recording_enabled():
+        yield
+        return
+    with impact.ImpactRecorder.shared().recording(item.nodeid):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    # Step timings go into one attachment per test; as parameters they would change its history id
+    yield
+    StepMetrics.shared().attach_pending()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # Barrier: every queued failure screenshot must be on disk before the run ends
+    ScreenshotPipeline.flush_shared()
+    StepMetrics.shared().write_summary()
+    print(RequestBlockingStats.shared().format_report())
+    impact.ImpactRecorder.save_shared()
+    TimeoutModel.save_shared()
+    LocatorRegistry.save_shared()
+
+
+@pytest.fixture(scope="session")
+def session_pool():
+    if browser_contexts.enabled():
+        # BROWSER_CONTEXTS=1: one browser for the run, a fresh isolated context per lease
+        host = BrowserContextHost.shared()
+        pool = host.session_pool()
+        yield pool
+        pool.close()
+        host.close()
+        return
+    # Browsers are launched lazily on first lease so suites that never need one stay cheap;
+    # with PROFILE_TEMPLATE=1 the warmed HTTP cache is kept across leases instead of wiped
+    warmed = DriverFactory.shared().profile_template is not None
+    pool = SessionPool(create_driver, size=1, max_uses=10, prelaunch=False, clear_cache=not warmed)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def isolated_state(tmp_path, monkeypatch):
+    # Run-wide singletons for one test, so fake drivers never reach the stores real runs learn from
+    monkeypatch.setenv("SCREENSHOTS_DIR", str(tmp_path / "screenshots"))
+    monkeypatch.setattr(LocatorRegistry, "_shared", LocatorRegistry(path=str(tmp_path / "locator_stats.json")))
+    monkeypatch.setattr(CapturePolicy, "_shared", CapturePolicy())
+    monkeypatch.setattr(StepMetrics, "_shared", StepMetrics())
+    monkeypatch.setattr(StorageStateCache, "_shared", StorageStateCache(path=str(tmp_path / "storage_state.json")))
+    monkeypatch.setattr(RequestBlockingStats, "_shared", RequestBlockingStats(path=str(tmp_path / "request_blocking.json")))
+    monkeypatch.setattr(TimeoutModel, "_shared", TimeoutModel(path=str(tmp_path / "timeout_stats.json")))
+
+
+@pytest.fixture
+def simulated_driver(isolated_state):
+    # Page-object tests without a browser: unsatisfied waits time out on a virtual clock instead of sleeping
+    with virtual_waits():
+        yield SimulatedDriver()
+    ScreenshotPipeline.flush_shared()
@@ -0,0 +1,142 @@
+import json
+import os
+
+from allure_commons import model2
+
+from utils.allure_stream import StreamingAllureLogger, merge_results, read_stream, truncate_trace
+from utils.parallel_runner import merge_allure_results
+
+PYTEST_TRACE = """self = <tests.test_saucelabs.TestSauceLabs object at 0x7f3a>
+
+    def test_registration(self):
+        \"\"\"Register a new account\"\"\"
+        home = HomePage(self.driver)
+        home.open()
+        home.click_account()
+        form = home.registration_form()
+        form.fill("a@b.c", "pw")
+>       form.submit()
+
+tests/test_saucelabs.py:40:
+_ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _
+
+self = <pages.home_page.RegistrationForm object at 0x7f3b>
+
+    def submit(self):
+        button = self.find(self.SUBMIT)
+        button.click()
+        self.wait_for_confirmation()
+>       assert self.confirmed(), "no confirmation"
+E       AssertionError: no confirmation
+E       assert False
+
+pages/home_page.py:88: AssertionError"""
+
+
+def test_traces_keep_only_the_failing_lines_of_each_frame():
+    trace = truncate_trace(PYTEST_TRACE)
+
+    assert "self = <" not in trace
+    assert "home.open()" not in trace
+    assert "    def test_registration(self):" in trace
+    assert ">       form.submit()" in trace
+    assert "tests/test_saucelabs.py:40:" in trace
+    assert "E       AssertionError: no confirmation" in trace
+    assert trace.endswith("pages/home_page.py:88: AssertionError")
+    assert len(trace) < len(PYTEST_TRACE) * 0.7
+
+    frames = "\n_ _ _ _ _ _ _ _ _ _\n\n".join(
+        PYTEST_TRACE.split("\n_ _")[0].replace("test_registration", f"frame_{index}") for index in range(8))
+    trace = truncate_trace(frames, max_frames=3)
+    assert "frame_0" in trace and "frame_6" in trace and "frame_7" in trace
+    assert "frame_3" not in trace
+    assert "... 5 frames omitted ..." in trace
+
+    step_trace = "".join(f'  File "pages/base_page.py", line {line}, in step\n    call()\n' for line in range(10))
+    assert truncate_trace(step_trace, max_frames=2).splitlines() == [
+        '  File "pages/base_page.py", line 0, in step', "    call()",
+        "... 8 frames omitted ...",
+        '  File "pages/base_page.py", line 9, in step', "    call()",
+    ]
+
+
+def _failed_result(name):
+    result = model2.TestResult(uuid=name, name=name, status=model2.Status.FAILED,
+                        statusDetails=model2.StatusDetails(message="AssertionError", trace=PYTEST_TRACE))
+    result.steps.append(model2.TestStepResult(name="Submit", status=model2.Status.BROKEN,
+                                              statusDetails=model2.StatusDetails(trace=PYTEST_TRACE)))
+    return result
+
+
+def test_stream_compresses_text_and_survives_a_crash(tmp_path):
+    logger = StreamingAllureLogger(str(tmp_path), stream_name="worker-0")
+    log = "waited 0.12s for //a[@id='product-1']\n" * 200
+    logger.report_attached_data(log, "log-attachment.txt")
+    logger.report_attached_data(b"\x89PNG", "shot-attachment.png")
+    logger.report_result(_failed_result("first"))
+
+    # Never closed, like a worker killed mid-run: every flushed record is still readable
+    records = list(read_stream(logger.path))
+    assert [record["kind"] for record in records] == ["attachment", "result"]
+    assert records[0]["text"] == log
+    assert ">       form.submit()" in records[1]["data"]["statusDetails"]["trace"]
+    assert "home.open()" not in records[1]["data"]["steps"][0]["statusDetails"]["trace"]
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(logger.path), "shot-attachment.png"])
+    assert os.path.getsize(logger.path) < len(log) / 5
+
+    logger.close()
+
+
+def test_a_crashed_worker_does_not_hide_the_streams_merged_after_it(tmp_path):
+    crashed = StreamingAllureLogger(str(tmp_path / "worker-0"))
+    crashed.report_attached_data("before the crash", "0-attachment.txt")
+    finished = StreamingAllureLogger(str(tmp_path / "worker-1"))
+    finished.report_attached_data("other worker", "1-attachment.txt")
+    finished.close()
+
+    stats = merge_results([crashed.report_dir, finished.report_dir], str(tmp_path / "merged"), expand_streams=False)
+
+    assert stats["streams"] == 2
+    (stream,) = os.listdir(tmp_path / "merged")
+    assert [record["text"] for record in read_stream(str(tmp_path / "merged" / stream))] == [
+        "before the crash", "other worker"]
+
+
+def test_merge_expands_streams_and_moves_files_in_one_pass(tmp_path):
+    worker_dirs = []
+    for index in range(2):
+        worker_dir = tmp_path / f"worker-{index}"
+        logger = StreamingAllureLogger(str(worker_dir), stream_name=f"worker-{index}")
+        logger.report_result(_failed_result(f"result-{index}"))
+        logger.report_attached_data(f"row {index}", f"{index}-attachment.txt")
+        logger.close()
+        (worker_dir / "environment.properties").write_text(f"worker={index}")
+        worker_dirs.append(str(worker_dir))
+
+    target = tmp_path / "allure-results"
+    assert merge_allure_results(worker_dirs, str(target)) == 5
+
+    names = sorted(os.listdir(target))
+    assert len([name for name in names if name.endswith("-result.json")]) == 2
+    assert "0-attachment.txt" in names and "1-attachment.txt" in names
+    assert not any(name.endswith(".gz") for name in names)
+    assert (target / "environment.properties").read_text() == "worker=0"
+    result = json.loads(next(target.glob("*-result.json")).read_text())
+    assert result["status"] == "failed"
+    assert "self = <" not in result["statusDetails"]["trace"]
+    assert not any(os.path.exists(d) for d in worker_dirs)
+
+
+def test_merge_can_keep_streams_as_one_concatenated_stream(tmp_path):
+    worker_dirs = []
+    for index in range(3):
+        logger = StreamingAllureLogger(str(tmp_path / f"worker-{index}"))
+        logger.report_attached_data(f"row {index}", f"{index}-attachment.txt")
+        logger.close()
+        worker_dirs.append(logger.report_dir)
+
+    stats = merge_results(worker_dirs, str(tmp_path / "merged"), expand_streams=False)
+
+    assert stats["streams"] == 3
+    (stream,) = os.listdir(tmp_path / "merged")
+    assert [record["text"] for record in read_stream(str(tmp_path / "merged" / stream))] == ["row 0", "row 1", "row 2"]
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from pages import readiness as ready
+from pages.async_pages import AsyncCheckoutPage
+from pages.cart_page import CartPage
+from pages.locator_registry import LocatorRegistry
+from pages.readiness import AsyncReadinessEngine
+from utils.async_benchmark import run_flows_concurrently
+from utils.async_webdriver import (
+    ELEMENT_KEY, AsyncElement, AsyncWebDriver, ChromeDriverService, HttpTransport, SimulatedTransport,
+)
+from tests.test_saucelabs import AsyncSauceLabsTest
+from utils.simulated_driver import SIMULATED_ORIGIN, SimulatedDriver
+
+
+class CountingTransport(SimulatedTransport):
+    """Records how many commands were in flight at once across every session."""
+
+    in_flight = 0
+    peak = 0
+
+    async def execute(self, command, params):
+        CountingTransport.in_flight += 1
+        CountingTransport.peak = max(CountingTransport.peak, CountingTransport.in_flight)
+        try:
+            return await super().execute(command, params)
+        finally:
+            CountingTransport.in_flight -= 1
+
+
+def test_flows_run_concurrently_on_one_thread(simulated_driver, monkeypatch):
+    monkeypatch.setattr(CountingTransport, "peak", 0)
+    threads = threading.active_count()
+    rows = [{"email": f"user{i}@example.com", "password": "pw", "search_term": term}
+            for i, term in enumerate(["grey jacket", "noir jacket", "striped top", "grey jacket", "noir jacket", "striped top"])]
+
+    async def new_session():
+        return AsyncWebDriver(CountingTransport(SimulatedDriver(simulated_driver.app), 0.005))
+
+    results = asyncio.run(run_flows_concurrently(rows, 3, new_session, SIMULATED_ORIGIN))
+
+    assert sorted(results) == sorted((row["search_term"], True) for row in rows)
+    assert CountingTransport.peak == 3
+    assert threading.active_count() == threads
+
+
+def test_async_locator_fallback_is_shared_with_the_sync_page(simulated_driver):
+    simulated_driver.rewrite("/checkout", 'id="customer_login_link"', 'id="login-link"')
+    simulated_driver.get(f"{SIMULATED_ORIGIN}/checkout")
+    page = AsyncCheckoutPage(AsyncWebDriver(SimulatedTransport(simulated_driver)), SIMULATED_ORIGIN)
+
+    assert asyncio.run(page.click_login_option()) is True
+    assert "/account/login" in simulated_driver.current_url
+    # The winning ALT locator is recorded under the synchronous page object's name
+    registry = LocatorRegistry.shared()
+    assert registry.order("CheckoutPage", "login_option", [page.PAGE.LOGIN_OPTION, page.PAGE.LOGIN_OPTION_ALT])[0] \
+        == page.PAGE.LOGIN_OPTION_ALT
+
+
+def test_conditions_have_async_twins_and_the_engine_yields_while_waiting(simulated_driver):
+    simulated_driver.get(f"{SIMULATED_ORIGIN}/search?q=jacket")
+    driver = AsyncWebDriver(SimulatedTransport(simulated_driver))
+    search_results = ready.all_of(ready.url_contains("search"), ready.element_present("//a[starts-with(@id, 'product-')]"))
+
+    assert asyncio.run(search_results.evaluate(driver)) is True
+    assert asyncio.run(ready.any_of(ready.url_contains("cart"), ready.url_matches(r"q=\w+")).evaluate(driver)) is True
+    assert asyncio.run(ready.element_visible("//missing").evaluate(driver)) is False
+
+    engine = AsyncReadinessEngine(driver, poll_frequency=0.01)
+    ticks = []
+
+    async def ticker():
+        while len(ticks) < 5:
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def both():
+        waited, _ = await asyncio.gather(engine.wait("cart", ready.url_contains("/cart"), ceiling=0.1), ticker())
+        return waited
+
+    assert asyncio.run(both()) is False
+    assert len(ticks) == 5
+    assert engine.report()[0]["ready"] is False
+
+
+class WebDriverHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.reply()
+
+    def do_POST(self):
+        self.reply(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+
+    def reply(self, body=None):
+        self.server.requests.append((self.command, self.path, body))
+        self.server.connections.add(self.client_address)
+        status, value = 200, None
+        if self.path == "/session/s1/element":
+            if body["value"] == "//missing":
+                status, value = 404, {"error": "no such element", "message": "Unable to locate //missing"}
+            else:
+                value = {ELEMENT_KEY: "e1"}
+        elif self.path == "/session/s1/element/e1/text":
+            value = "3 items"
+        elif self.path == "/session/s1/execute/sync":
+            value = [body["args"][0], "done"]
+        payload = json.dumps({"value": value}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def webdriver_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WebDriverHandler)
+    server.requests = []
+    server.connections = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_transport_speaks_w3c_over_one_keep_alive_connection(webdriver_server):
+    host, port = webdriver_server.server_address[:2]
+    driver = AsyncWebDriver(HttpTransport(f"http://{host}:{port}", session_id="s1"))
+
+    async def scenario():
+        element = await driver.find_element(value="//span[@id='cart-count']")
+        text = await element.text()
+        echoed = await driver.execute_script("return arguments", element)
+        with pytest.raises(NoSuchElementException):
+            await driver.find_element(value="//missing")
+        await driver.transport.close()
+        return element, text, echoed
+
+    element, text, echoed = asyncio.run(scenario())
+
+    assert isinstance(element, AsyncElement) and element.id == "e1"
+    assert text == "3 items"
+    assert echoed == [element, "done"]
+    assert [(method, path) for method, path, _ in webdriver_server.requests] == [
+        ("POST", "/session/s1/element"),
+        ("GET", "/session/s1/element/e1/text"),
+        ("POST", "/session/s1/execute/sync"),
+        ("POST", "/session/s1/element"),
+    ]
+    assert webdriver_server.requests[2][2]["args"] == [{ELEMENT_KEY: "e1"}]
+    assert len(webdriver_server.connections) == 1
+
+
+def test_a_failed_cart_click_fails_the_async_flow_like_the_sync_one(simulated_driver):
+    simulated_driver.rewrite("/cart", 'class="checkout"', 'class="proceed"')
+    test = AsyncSauceLabsTest(AsyncWebDriver(SimulatedTransport(simulated_driver)), SIMULATED_ORIGIN)
+    screenshots = []
+
+    async def take_screenshot(name="screenshot", locator=None):
+        screenshots.append(name)
+
+    test.cart_page.take_screenshot = take_screenshot
+
+    assert asyncio.run(test.search_add_cart_checkout_login_flow("a@b.c", "pw", "grey jacket")) is False
+    assert screenshots[-1] == "click_checkout_failure"
+    assert CartPage(simulated_driver, SIMULATED_ORIGIN).click_checkout() is False
+
+
+def test_service_sessions_default_to_the_configured_preset():
+    opened = []
+
+    async def record(capabilities, track=True):
+        opened.append(capabilities["pageLoadStrategy"])
+
+    service = ChromeDriverService(driver_path="chromedriver", environ={}, port=1)
+    service._open = record
+    asyncio.run(service.new_session())
+    service.environ = {"DRIVER_PRESET": "fast"}
+    asyncio.run(service.new_session())
+
+    assert opened == ["normal", "eager"]
@@ -0,0 +1,142 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from pages.product_page import ProductPage
+from pages.readiness import read_count
+from tests.test_saucelabs import SauceLabsTest
+from utils.browser_contexts import BrowserContextHost, attach_options, process_tree_memory, target_window
+from utils.driver_factory import build_options, resolve_driver_path
+from utils.simulated_driver import SIMULATED_ORIGIN, SimulatedDriver
+from utils.storage_state import StorageStateCache
+from utils.storefront import StorefrontApp, StorefrontServer
+
+
+class FakeBrowser:
+    """Chrome's Target domain in miniature: every context owns a cookie jar and a local storage."""
+
+    def __init__(self, app):
+        self.app = app
+        self.capabilities = {"goog:chromeOptions": {"debuggerAddress": "localhost:9222"}}
+        self.service = SimpleNamespace(service_url="http://localhost:9515", process=None)
+        self.contexts = {}
+        self.targets = {}
+        self.disposed = []
+        self.created = 0
+        self.quit_called = False
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        if cmd == "Target.createBrowserContext":
+            self.created += 1
+            context_id = f"context-{self.created}"
+            self.contexts[context_id] = ({}, {})
+            return {"browserContextId": context_id}
+        if cmd == "Target.createTarget":
+            target_id = f"TARGET{len(self.targets) + 1}"
+            self.targets[target_id] = cmd_args["browserContextId"]
+            return {"targetId": target_id}
+        if cmd == "Target.disposeBrowserContext":
+            self.disposed.append(cmd_args["browserContextId"])
+            del self.contexts[cmd_args["browserContextId"]]
+            return {}
+        raise AssertionError(f"unexpected {cmd}")
+
+    def attach(self, server_url, options):
+        assert server_url == self.service.service_url
+        assert options.debugger_address == "localhost:9222"
+        browser = self
+
+        class AttachedDriver(SimulatedDriver):
+            def _command_switchToWindow(self, params):
+                # Commands now go to the tab, so cookies and storage are its context's
+                self.cookies, storage = browser.contexts[browser.targets[params["handle"]]]
+                self.local_storage = storage
+
+        return AttachedDriver(self.app)
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def browser(simulated_driver):
+    return FakeBrowser(simulated_driver.app)
+
+
+@pytest.fixture
+def host(browser):
+    return BrowserContextHost(launch=lambda preset, base_url: browser, attach=browser.attach, preset="fast", environ={})
+
+
+def test_contexts_keep_logins_and_carts_apart(browser, host, tmp_path):
+    first, second = host.new_context(), host.new_context()
+    state = StorageStateCache(path=str(tmp_path / "state.json"), ttl=0)
+
+    assert SauceLabsTest(first, SIMULATED_ORIGIN, state).search_add_cart_checkout_login_flow(
+        "a@b.c", "pw", "grey jacket") is True
+
+    assert first.get_cookies()
+    assert second.get_cookies() == []
+    first.get(f"{SIMULATED_ORIGIN}/cart")
+    second.get(f"{SIMULATED_ORIGIN}/cart")
+    assert read_count(first, ProductPage.CART_COUNT) == 1
+    assert read_count(second, ProductPage.CART_COUNT) == 0
+    assert host.report()["peak_open"] == 2
+
+
+def test_closing_a_context_disposes_it_and_only_it(browser, host):
+    first, second = host.new_context(), host.new_context()
+    first.add_cookie({"name": "session", "value": "first"})
+
+    host.close_context(first)
+
+    assert browser.disposed == ["context-1"]
+    assert second.get_cookies() == []
+    assert list(browser.contexts) == ["context-2"]
+    assert host.report()["open"] == 1
+
+    host.close()
+    assert browser.disposed == ["context-1", "context-2"]
+    assert browser.quit_called
+
+
+def test_session_pool_leases_a_fresh_context_every_time(browser, host):
+    pool = host.session_pool()
+    with pool.session() as driver:
+        driver.add_cookie({"name": "session", "value": "first"})
+    with pool.session() as driver:
+        assert driver.get_cookies() == []
+
+    assert browser.disposed == ["context-1", "context-2"]
+    assert pool.stats()["launches"] == 2
+    assert host.report()["contexts_opened"] == 2
+
+
+def test_attached_sessions_reuse_the_host_instead_of_launching(host):
+    options = attach_options("fast", "localhost:9222", environ={})
+    capabilities = options.to_capabilities()
+
+    assert capabilities["goog:chromeOptions"]["debuggerAddress"] == "localhost:9222"
+    assert not capabilities["goog:chromeOptions"]["args"]
+    assert capabilities["pageLoadStrategy"] == "eager"
+    assert "goog:loggingPrefs" in capabilities
+    assert target_window(build_options("fast", environ={})) == {"width": 1280, "height": 800}
+    assert target_window(build_options("debug", environ={})) == {}
+    if os.path.isdir("/proc"):
+        assert process_tree_memory(os.getpid()) > 0
+
+
+@pytest.mark.skipif(resolve_driver_path() is None, reason="needs chromedriver and Chrome")
+def test_real_contexts_do_not_share_cookies():
+    with StorefrontServer(app=StorefrontApp()) as server:
+        host = BrowserContextHost(preset="fast", base_url=server.base_url)
+        try:
+            first, second = host.new_context(), host.new_context()
+            first.get(server.base_url)
+            first.add_cookie({"name": "isolation", "value": "first"})
+            second.get(server.base_url)
+            assert first.get_cookie("isolation") is not None
+            assert second.get_cookie("isolation") is None
+        finally:
+            host.close()
@@ -0,0 +1,54 @@
+import pytest
+
+from pages.base_page import BasePage
+from pages.capture_policy import CapturePolicy
+
+
+class ShotCountingDriver:
+    def __init__(self):
+        self.shots = 0
+
+    def get_screenshot_as_png(self):
+        self.shots += 1
+        return b"png"
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_async_script(self, script, *args):
+        return [-1, None]
+
+
+@pytest.fixture
+def policy(isolated_state, monkeypatch):
+    policy = CapturePolicy(max_per_signature=1)
+    monkeypatch.setattr(CapturePolicy, "_shared", policy)
+    return policy
+
+
+def test_repeated_signature_is_captured_once(policy):
+    assert policy.should_capture("click_failure_add", "//input[@id='add']")
+    assert not policy.should_capture("click_failure_add", "//input[@id='add']")
+    assert policy.should_capture("click_failure_add", "//button")
+
+    assert policy.report()["click_failure_add|//input[@id='add']"] == {
+        "occurrences": 2,
+        "captured": 1,
+        "suppressed": 1,
+    }
+
+
+def test_suppressed_screenshot_never_touches_the_driver(policy):
+    driver = ShotCountingDriver()
+    page = BasePage(driver)
+    policy.should_capture("checkout_navigation_failure")
+
+    assert page.take_screenshot("checkout_navigation_failure") is None
+    assert driver.shots == 0
+
+
+def test_probe_returns_false_without_capturing(policy):
+    driver = ShotCountingDriver()
+    assert BasePage(driver).probe_element("//span[@id='cart-target-desktop']") is False
+    assert driver.shots == 0
+    assert policy.report() == {}
@@ -0,0 +1,64 @@
+import pytest
+
+from tests.test_saucelabs import SauceLabsTest
+from utils.cart_seeding import CartSeeder, CartSeedingError
+from utils.storefront import CART_COOKIE, StorefrontServer
+
+
+@pytest.fixture
+def storefront():
+    with StorefrontServer() as server:
+        yield server
+
+
+@pytest.fixture
+def seeded_driver(simulated_driver, storefront):
+    # The browser and the HTTP seeder must share one store for the cart cookie to mean anything
+    simulated_driver.app = storefront.app
+    return simulated_driver
+
+
+def test_search_result_is_added_through_the_cart_endpoints(storefront):
+    seeder = CartSeeder(storefront.base_url)
+    line_item = seeder.add_search_result("noir jacket", quantity=2)
+
+    assert line_item["handle"] == "noir-jacket"
+    assert seeder.cart()["item_count"] == 2
+    assert CART_COOKIE in seeder.cookies
+    # A second seeder is a second visitor with its own cart
+    assert CartSeeder(storefront.base_url).cart()["item_count"] == 0
+
+
+def test_requests_reuse_pooled_connections(storefront):
+    for term in ("grey jacket", "striped top"):
+        CartSeeder(storefront.base_url).add_search_result(term)
+
+    pool = CartSeeder.shared_pool().connection_from_url(storefront.base_url)
+    assert pool.num_connections == 1
+    assert pool.num_requests == 6
+
+
+def test_unknown_products_are_reported(storefront):
+    seeder = CartSeeder(storefront.base_url)
+    with pytest.raises(CartSeedingError):
+        seeder.add_search_result("no such thing")
+    with pytest.raises(CartSeedingError):
+        seeder.add("no-such-handle")
+
+
+def test_transfer_opens_the_seeded_cart_in_the_browser(seeded_driver, storefront):
+    seeder = CartSeeder(storefront.base_url)
+    seeder.add_search_result("striped top")
+    seeder.transfer(seeded_driver)
+
+    assert seeded_driver.current_url == f"{storefront.base_url}/cart"
+    assert "Striped top" in seeded_driver.page_source
+
+
+def test_seeded_flow_skips_the_search_and_product_prefix(seeded_driver, storefront):
+    test = SauceLabsTest(seeded_driver, base_url=storefront.base_url)
+    assert test.seeded_checkout_login_flow("a@b.c", "pw", "grey jacket") is True
+
+    steps = [timing["step"] for timing in test.readiness_report()]
+    assert steps == ["cart_opened", "checkout_loaded", "login_submitted"]
+    assert seeded_driver.current_url == f"{storefront.base_url}/checkout"
@@ -0,0 +1,96 @@
+from pages.product_page import ProductPage
+from pages.readiness import read_count
+from tests.test_saucelabs import SauceLabsTest
+from utils.checkpoints import StagedFlow
+from utils.simulated_driver import SIMULATED_ORIGIN
+
+
+def fail_once(method):
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            return False
+        return method(*args, **kwargs)
+
+    return flaky
+
+
+def test_a_late_failure_resumes_from_the_last_checkpoint(simulated_driver):
+    test = SauceLabsTest(simulated_driver, SIMULATED_ORIGIN, retries=1)
+    test.cart_page.click_checkout = fail_once(test.cart_page.click_checkout)
+    homes = []
+    navigate_to_home = test.home_page.navigate_to_home
+    test.home_page.navigate_to_home = lambda: homes.append(1) or navigate_to_home()
+
+    assert test.search_add_cart_checkout_login_flow("a@b.c", "pw", "grey jacket") is True
+
+    first, retry = test.flow.attempts
+    assert first["failed_stage"] == "checkout"
+    assert retry["resumed_from"] == "cart" and retry["retried_stage"] == "checkout" and retry["failed_stage"] is None
+    # The search, product and cart stages were not repeated: one trip to the home page, one item in the cart
+    assert len(homes) == 1
+    simulated_driver.get(f"{SIMULATED_ORIGIN}/cart")
+    assert read_count(simulated_driver, ProductPage.CART_COUNT) == 1
+    assert "saved" in test.flow.format_report()
+
+
+def test_resuming_at_login_keeps_the_checkout_and_logs_in(simulated_driver):
+    test = SauceLabsTest(simulated_driver, SIMULATED_ORIGIN, retries=1)
+    test.checkout_page.click_sign_in = fail_once(test.checkout_page.click_sign_in)
+
+    assert test.search_add_cart_checkout_login_flow("a@b.c", "pw", "noir jacket") is True
+    assert test.flow.attempts[1]["resumed_from"] == "checkout"
+    assert test.checkout_page.is_logged_in()
+
+
+def test_a_lost_cart_falls_back_to_a_full_rerun(simulated_driver):
+    test = SauceLabsTest(simulated_driver, SIMULATED_ORIGIN, retries=1)
+    click_checkout = test.cart_page.click_checkout
+    calls = []
+
+    def checkout_after_the_store_dropped_the_cart():
+        calls.append(1)
+        if len(calls) == 1:
+            simulated_driver.app.state.carts.clear()
+            return False
+        return click_checkout()
+
+    test.cart_page.click_checkout = checkout_after_the_store_dropped_the_cart
+
+    assert test.search_add_cart_checkout_login_flow("a@b.c", "pw", "grey jacket") is True
+    assert test.flow.attempts[1]["resumed_from"] is None
+    assert test.flow.attempts[1]["saved_seconds"] == 0.0
+
+
+class TickingClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_report_compares_the_resumed_retry_with_a_full_rerun(simulated_driver):
+    clock = TickingClock()
+    simulated_driver.get(f"{SIMULATED_ORIGIN}/")
+    outcomes = {"checkout": [False, True]}
+
+    def stage(name, seconds):
+        def run(context):
+            clock.now += seconds
+            return outcomes[name].pop(0) if name in outcomes else True
+        return name, run
+
+    flow = StagedFlow(simulated_driver, SIMULATED_ORIGIN,
+                      [stage("home", 2.0), stage("search", 3.0), stage("checkout", 1.0)], retries=1, clock=clock)
+
+    assert flow.run() is True
+    retry = flow.report()["attempts"][1]
+    assert retry["resumed_from"] == "search"
+    assert retry["seconds"] == 1.0
+    assert retry["full_rerun_estimate"] == 6.0
+    assert retry["saved_seconds"] == 5.0
+    assert flow.report()["stage_seconds"] == {"home": 2.0, "search": 3.0, "checkout": 1.0}
+    assert "would take ~6.00s (saved 5.00s)" in flow.format_report()
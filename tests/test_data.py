@@ -1,3 +1,5 @@
+import itertools
+
 login_search_data = [
     {
         "email": "sumanaghimire45@gmail.com",
@@ -14,4 +16,17 @@ login_search_data = [
         "password": "Sumana@123",
         "search_term": "Striped top"
     }
-]
\ No newline at end of file
+]
+
+def search_combinations(repeat=1):
+    """
+    Lazily yield every account and search term combination, repeat times over.
+
+    Used as DATA_SOURCE=tests.test_data:search_combinations for soak runs; rows are
+    generated one at a time, so repeat can be large without holding them in memory.
+    """
+    accounts = dict.fromkeys((row["email"], row["password"]) for row in login_search_data)
+    terms = dict.fromkeys(row["search_term"] for row in login_search_data)
+    for _ in range(repeat):
+        for (email, password), search_term in itertools.product(accounts, terms):
+            yield {"email": email, "password": password, "search_term": search_term}
@@ -0,0 +1,99 @@
+import itertools
+import json
+import pickle
+
+import pytest
+
+from tests.test_data import login_search_data, search_combinations
+from utils.data_provider import DataProvider
+
+
+def numbers():
+    # An endless source: anything that reads it to the end never returns
+    for number in itertools.count():
+        yield {"n": number}
+
+
+def positions(provider):
+    return [position for position, _ in provider.iter_indexed()]
+
+
+def test_csv_and_jsonl_sources_stream_rows(tmp_path):
+    csv_path = tmp_path / "rows.csv"
+    csv_path.write_text("email,password,search_term\na@b.c,pw,grey jacket\nd@e.f,pw,noir jacket\n")
+    jsonl_path = tmp_path / "rows.jsonl"
+    jsonl_path.write_text("\n".join(json.dumps(row) for row in login_search_data) + "\n\n")
+
+    assert [row["search_term"] for row in DataProvider.from_source(str(csv_path))] == ["grey jacket", "noir jacket"]
+    assert list(DataProvider.from_source(str(jsonl_path))) == login_search_data
+    with pytest.raises(ValueError):
+        DataProvider.from_source("rows.xlsx")
+
+
+def test_generator_source_is_re_iterable():
+    provider = DataProvider.from_source("tests.test_data:search_combinations")
+    assert list(provider) == list(search_combinations())
+    assert list(provider) == list(provider)
+    assert len(list(DataProvider.from_generator("tests.test_data:search_combinations", repeat=4))) == 12
+
+
+def test_shards_cover_every_row_exactly_once_and_nest():
+    provider = DataProvider.from_rows(list(range(20)))
+    shards = provider.split(3)
+    assert sorted(position for part in shards for position in positions(part)) == list(range(20))
+
+    # A worker's shard split again into test items still partitions the worker's rows
+    worker = shards[1]
+    items = worker.split(2)
+    assert sorted(position for part in items for position in positions(part)) == positions(worker)
+    assert all(positions(part) for part in items)
+    with pytest.raises(ValueError):
+        provider.shard(3, 3)
+
+
+def test_sampling_is_deterministic_and_independent_of_sharding():
+    provider = DataProvider.from_rows(list(range(2000)))
+    sampled = positions(provider.sample(0.1, seed=7))
+
+    assert 120 < len(sampled) < 280
+    assert sampled == positions(provider.sample(0.1, seed=7))
+    assert sampled != positions(provider.sample(0.1, seed=8))
+    sharded = provider.sample(0.1, seed=7).split(4)
+    assert sorted(position for part in sharded for position in positions(part)) == sampled
+
+
+def test_skip_resumes_from_a_source_position_and_limit_applies_to_the_dataset():
+    provider = DataProvider.from_generator("tests.test_data_provider:numbers")
+    assert positions(provider.skip(100).limit(3)) == [100, 101, 102]
+    # Shards share one limit, so four workers with DATA_LIMIT=10 still run ten rows in total
+    assert sorted(position for part in provider.limit(10).split(4) for position in positions(part)) == list(range(10))
+
+
+def test_rows_are_read_lazily():
+    provider = DataProvider.from_generator("tests.test_data_provider:numbers").shard(2, 5).sample(0.5, seed=1)
+    first = next(iter(provider))
+    assert first["n"] % 5 == 2
+
+
+def test_providers_pickle_for_spawned_workers(tmp_path):
+    jsonl_path = tmp_path / "rows.jsonl"
+    jsonl_path.write_text("\n".join(json.dumps(row) for row in login_search_data))
+    for provider in (
+        DataProvider.from_rows(login_search_data),
+        DataProvider.from_jsonl(str(jsonl_path)).shard(0, 2),
+        DataProvider.from_generator("tests.test_data:search_combinations", repeat=2).sample(0.5),
+    ):
+        assert list(pickle.loads(pickle.dumps(provider))) == list(provider)
+
+
+def test_environment_selects_source_sample_offset_and_limit():
+    default = DataProvider.from_environment(login_search_data, environ={})
+    assert list(default) == login_search_data and default.length == 3
+
+    provider = DataProvider.from_environment(login_search_data, environ={
+        "DATA_SOURCE": "tests.test_data:search_combinations",
+        "DATA_OFFSET": "1",
+        "DATA_LIMIT": "1",
+    })
+    assert [row["search_term"] for row in provider] == ["noir jacket"]
+    assert provider.describe() == "tests.test_data:search_combinations, from 1, limit 1"
@@ -0,0 +1,59 @@
+import pytest
+
+from pages.instrumentation import StepMetrics
+from utils.driver_factory import DriverFactory, build_options, resolve_driver_path
+
+
+class Launcher:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, options, driver_path):
+        self.calls.append((options, driver_path))
+        return object()
+
+
+def test_fast_preset_trades_fidelity_for_speed():
+    options = build_options("fast", environ={})
+    assert options.page_load_strategy == "eager"
+    assert "--headless=new" in options.arguments
+    assert "--window-size=1280,800" in options.arguments
+    assert "--disable-extensions" in options.arguments
+    assert "--disable-background-networking" in options.arguments
+    assert options.experimental_options["prefs"]["profile.managed_default_content_settings.images"] == 2
+
+
+def test_faithful_and_debug_presets_load_pages_fully():
+    faithful = build_options("faithful", environ={})
+    debug = build_options("debug", environ={"CHROME_BINARY": "/opt/chrome/chrome"})
+    assert faithful.page_load_strategy == debug.page_load_strategy == "normal"
+    assert "prefs" not in faithful.experimental_options
+    assert "--headless=new" not in debug.arguments
+    assert debug.binary_location == "/opt/chrome/chrome"
+    with pytest.raises(ValueError):
+        build_options("turbo", environ={})
+
+
+def test_driver_binary_is_resolved_from_the_environment(tmp_path):
+    binary = tmp_path / "chromedriver"
+    binary.write_text("")
+    binary.chmod(0o755)
+    assert resolve_driver_path({"CHROMEDRIVER_PATH": "/custom/chromedriver"}) == "/custom/chromedriver"
+    assert resolve_driver_path({"PATH": str(tmp_path)}) == str(binary)
+    assert resolve_driver_path({"PATH": str(tmp_path / "empty")}) is None
+
+
+def test_launch_time_is_recorded_per_preset(monkeypatch):
+    monkeypatch.setattr(StepMetrics, "_shared", StepMetrics())
+    launcher = Launcher()
+    factory = DriverFactory(launcher, environ={"DRIVER_PRESET": "fast", "CHROMEDRIVER_PATH": "/bin/cd"})
+
+    factory.create()
+    factory.create()
+    factory.create("debug")
+
+    assert [options.page_load_strategy for options, _ in launcher.calls] == ["eager", "eager", "normal"]
+    assert {driver_path for _, driver_path in launcher.calls} == {"/bin/cd"}
+    report = factory.report()
+    assert report["fast"]["launches"] == 2 and report["debug"]["launches"] == 1
+    assert len(StepMetrics.shared().samples["driver_launch[fast]"]) == 2
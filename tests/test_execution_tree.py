@@ -0,0 +1,72 @@
+import pytest
+
+from pages.product_page import ProductPage
+from pages.readiness import read_count
+from tests.test_data import login_search_data
+from tests.test_saucelabs import SauceLabsTest
+from utils.execution_tree import ExecutionTree, FlowGraph, Step, plan
+from utils.simulated_driver import SIMULATED_ORIGIN
+
+
+def test_planner_puts_shared_steps_first_and_merges_prefixes(simulated_driver):
+    graph = SauceLabsTest(simulated_driver, SIMULATED_ORIGIN).flow_graph()
+
+    assert [step.name for step in graph.order(login_search_data)] == [
+        "home", "login", "search", "product", "add_to_cart", "cart", "checkout"]
+    root = plan(graph, login_search_data)
+    assert root.size() == 2 + 3 * 5
+    (home,) = root.children
+    (login,) = home.children
+    assert [child.values for child in login.children] == [{"search_term": row["search_term"]} for row in login_search_data]
+
+    # A second account gets its own login but still shares nothing it should not
+    rows = login_search_data + [{"email": "other@example.com", "password": "pw", "search_term": "grey jacket"}]
+    assert plan(graph, rows).size() == 2 + 3 * 5 + 2 + 5
+
+    with pytest.raises(ValueError):
+        FlowGraph([Step("a", None, after=("b",)), Step("b", None, after=("a",))]).order(rows)
+
+
+def test_rows_share_one_login_and_keep_their_own_carts(simulated_driver):
+    test = SauceLabsTest(simulated_driver, SIMULATED_ORIGIN)
+    sign_ins = []
+    click_sign_in = test.login_page.click_sign_in
+    test.login_page.click_sign_in = lambda: sign_ins.append(1) or click_sign_in()
+
+    assert test.search_add_cart_checkout_login_tree(login_search_data) == [True, True, True]
+
+    assert len(sign_ins) == 1
+    report = test.tree.report()
+    assert report["executed_steps"] == 17 and report["naive_steps"] == 21 and report["saved_steps"] == 4
+    assert report["snapshots"] == 1 and report["restores"] == 2
+    # Every branch started from the snapshot's empty cart, so each cart holds only its own product
+    carts = simulated_driver.app.state.carts.values()
+    assert sorted(tuple(cart) for cart in carts if cart) == [("grey-jacket",), ("noir-jacket",), ("striped-top",)]
+    assert "17 steps executed for 3 rows instead of 21" in test.tree.format_report()
+
+
+def test_a_snapshot_the_store_no_longer_honours_is_replayed(simulated_driver):
+    test = SauceLabsTest(simulated_driver, SIMULATED_ORIGIN)
+    lost = []
+
+    def check_cart(context, search_term):
+        simulated_driver.get(f"{SIMULATED_ORIGIN}/cart")
+        count = read_count(simulated_driver, ProductPage.CART_COUNT)
+        if not lost:
+            lost.append(1)
+            simulated_driver.app.state.carts.clear()
+        return count == 1
+
+    graph = FlowGraph([
+        Step("home", lambda context: test.open_home(context, "a@b.c")),
+        Step("search", lambda context: test.search("grey jacket"), after=("home",)),
+        Step("product", lambda context: test.open_first_product(), after=("search",)),
+        Step("add_to_cart", lambda context: test.add_product_to_cart(), after=("product",)),
+        Step("check", check_cart, params=("search_term",), after=("add_to_cart",)),
+    ])
+    tree = ExecutionTree(graph, [{"search_term": "first"}, {"search_term": "second"}], simulated_driver, SIMULATED_ORIGIN)
+
+    assert tree.run() == [True, True]
+    report = tree.report()
+    assert report["replays"] == 1 and report["restores"] == 0
+    assert report["executed_steps"] == 4 + 2 + 4
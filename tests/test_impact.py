@@ -0,0 +1,174 @@
+import subprocess
+import threading
+
+import pytest
+
+from pages.search_page import HomePage
+from utils.impact import ImpactMap, ImpactRecorder, select
+from utils.simulated_driver import SIMULATED_ORIGIN
+
+PAGE = '''class BasePage:
+    TIMEOUT = 10
+
+    def click(self, locator):
+        return locator
+
+
+class HomePage(BasePage):
+    SEARCH_INPUT = "//input[@id='search-field']"
+    SEARCH_RESULT = "//a[starts-with(@id, 'product-')]"
+    READY = ("search_results", SEARCH_RESULT)
+
+    def search(self):
+        return self.click(self.SEARCH_INPUT)
+
+    def open_result(self):
+        return self.click(self.SEARCH_RESULT)
+'''
+
+SIGNUP = '''class RegistrationPage:
+    CREATE_ACCOUNT_BUTTON = "//input[@type='submit']"
+
+    def create(self):
+        return self.CREATE_ACCOUNT_BUTTON
+'''
+
+TESTS = '''def test_search():
+    pass
+
+
+def test_open_result():
+    pass
+
+
+def test_signup():
+    pass
+'''
+
+
+def test_recorder_notes_methods_and_the_locators_they_read(simulated_driver, tmp_path):
+    recorder = ImpactRecorder(ImpactMap(path=str(tmp_path / "impact.json")))
+    home = HomePage(simulated_driver, SIMULATED_ORIGIN)
+
+    with recorder.recording("tests/test_flow.py::test_search") as symbols:
+        home.navigate_to_home()
+        home.search_product("grey jacket")
+
+    assert "pages/search_page.py::HomePage.search_product" in symbols
+    assert "pages/search_page.py::HomePage.SEARCH_INPUT" in symbols
+    assert "pages/base_page.py::BasePage.send_keys_to_element" in symbols
+    assert "pages/search_page.py::HomePage.SIGN_UP_LINK" not in symbols
+    assert not any(symbol.startswith("pages/signup.py") for symbol in symbols)
+
+    recorder.impact_map.save()
+    entry = ImpactMap(path=recorder.impact_map.path).entries["tests/test_flow.py::test_search"]
+    assert entry["symbols"] == sorted(symbols)
+
+
+def _git(root, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=root, check=True,
+                   capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    for path, source in (("pages/search_page.py", PAGE), ("pages/signup.py", SIGNUP), ("tests/test_flow.py", TESTS),
+                         ("tests/conftest.py", ""), ("utils/helpers.py", "")):
+        (tmp_path / path).parent.mkdir(exist_ok=True)
+        (tmp_path / path).write_text(source)
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "base")
+    commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=tmp_path, capture_output=True, text=True).stdout.strip()
+
+    impact_map = ImpactMap(path=str(tmp_path / "impact.json"))
+    page = "pages/search_page.py::"
+    impact_map.record("tests/test_flow.py::test_search", [
+        page + "HomePage.search", page + "HomePage.SEARCH_INPUT", page + "BasePage.click",
+        "tests/test_flow.py::test_search"], commit, False)
+    impact_map.record("tests/test_flow.py::test_open_result", [
+        page + "HomePage.open_result", page + "HomePage.SEARCH_RESULT", page + "HomePage.READY",
+        page + "BasePage.click", "tests/test_flow.py::test_open_result"], commit, False)
+    impact_map.record("tests/test_flow.py::test_signup", [
+        "pages/signup.py::RegistrationPage.create", "pages/signup.py::RegistrationPage.CREATE_ACCOUNT_BUTTON",
+        "tests/test_flow.py::test_signup"], commit, False)
+    return tmp_path, impact_map
+
+
+NODEIDS = ["tests/test_flow.py::test_search", "tests/test_flow.py::test_open_result", "tests/test_flow.py::test_signup"]
+
+
+def _edit(root, path, old, new):
+    source = (root / path).read_text()
+    (root / path).write_text(source.replace(old, new))
+
+
+def test_only_tests_that_used_a_changed_symbol_are_selected(repo):
+    root, impact_map = repo
+
+    _edit(root, "pages/signup.py", "@type='submit'", "@value='Create'")
+    selected, report = select(NODEIDS, impact_map, root=str(root))
+    assert selected == ["tests/test_flow.py::test_signup"]
+    assert report["changed"] == ["pages/signup.py::RegistrationPage.CREATE_ACCOUNT_BUTTON"]
+
+    # READY is built from SEARCH_RESULT, so changing one changes both
+    _edit(root, "pages/signup.py", "@value='Create'", "@type='submit'")
+    _edit(root, "pages/search_page.py", "starts-with(@id, 'product-')", "contains(@class, 'product')")
+    assert select(NODEIDS, impact_map, root=str(root))[0] == ["tests/test_flow.py::test_open_result"]
+
+    _edit(root, "pages/search_page.py", "        return locator", "        print(locator)\n        return locator")
+    assert select(NODEIDS, impact_map, root=str(root))[0] == NODEIDS[:2]
+
+    # A test nobody has recorded yet always runs
+    selected, report = select(NODEIDS + ["tests/test_flow.py::test_new"], impact_map, root=str(root))
+    assert "tests/test_flow.py::test_new" in selected and report["unknown"] == 1
+
+
+def test_everything_runs_when_the_change_cannot_be_narrowed_down(repo):
+    root, impact_map = repo
+
+    assert select(NODEIDS, impact_map, root=str(root))[0] == []
+    (root / "README.md").write_text("docs")
+    assert select(NODEIDS, impact_map, root=str(root))[0] == []
+
+    (root / "utils/helpers.py").write_text("TIMEOUT = 5\n")
+    selected, report = select(NODEIDS, impact_map, root=str(root))
+    assert selected == NODEIDS
+    assert "utils/helpers.py" in report["reason"]
+
+    _git(root, "checkout", "--", "utils/helpers.py")
+    (root / "tests/conftest.py").write_text("import pytest\n")
+    assert select(NODEIDS, impact_map, root=str(root))[0] == NODEIDS
+
+    _git(root, "checkout", "--", "tests/conftest.py")
+    for entry in impact_map.entries.values():
+        entry["commit"] = "0" * 40
+    selected, report = select(NODEIDS, impact_map, root=str(root))
+    assert selected == NODEIDS
+    assert report["reason"] == "dependency data is stale"
+
+    selected, report = select(NODEIDS, ImpactMap(path=str(root / "missing.json")), root=str(root))
+    assert selected == NODEIDS and report["reason"]
+
+
+def test_code_run_on_threads_started_by_the_test_is_recorded(simulated_driver, tmp_path):
+    recorder = ImpactRecorder(ImpactMap(path=str(tmp_path / "impact.json")))
+    home = HomePage(simulated_driver, SIMULATED_ORIGIN)
+
+    with recorder.recording("tests/test_flow.py::test_search") as symbols:
+        worker = threading.Thread(target=home.navigate_to_home)
+        worker.start()
+        worker.join()
+
+    assert "pages/search_page.py::HomePage.navigate_to_home" in symbols
+
+
+def test_a_dirty_entry_at_a_clean_entrys_commit_is_still_stale(repo):
+    root, impact_map = repo
+    impact_map.entries["tests/test_flow.py::test_open_result"]["dirty"] = True
+
+    _edit(root, "pages/signup.py", "@type='submit'", "@value='Create'")
+    selected, report = select(NODEIDS, impact_map, root=str(root))
+    # test_search shares the commit but was recorded clean, so its result must not vouch for the dirty one
+    assert selected == ["tests/test_flow.py::test_open_result", "tests/test_flow.py::test_signup"]
+    assert report["stale"] == 1
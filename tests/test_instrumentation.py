@@ -0,0 +1,82 @@
+import json
+
+import allure
+import pytest
+
+from pages.base_page import BasePage
+from pages.instrumentation import StepMetrics, percentile
+from pages.wire_calls import WireCallCounter
+
+
+class CommandDriver:
+    def execute(self, driver_command, params=None):
+        return {"value": None}
+
+    def set_script_timeout(self, seconds):
+        self.execute("setTimeouts")
+
+    def execute_async_script(self, script, *args):
+        self.execute("executeAsyncScript")
+        return ["done", object()]
+
+
+class CheckoutLikePage(BasePage):
+    @allure.step("Click checkout")
+    def click_checkout(self):
+        self.click_element("//a[@class='checkout']")
+        return True
+
+    def helper(self):
+        return "not a step"
+
+
+@pytest.fixture
+def metrics(isolated_state, monkeypatch):
+    metrics = StepMetrics()
+    monkeypatch.setattr(StepMetrics, "_shared", metrics)
+    return metrics
+
+
+def test_page_steps_record_commands_including_nested_primitives(metrics):
+    driver = CommandDriver()
+    page = CheckoutLikePage(driver)
+
+    assert page.click_checkout() is True
+    assert page.click_checkout() is True
+
+    samples = metrics.samples["CheckoutLikePage.click_checkout"]
+    assert [sample["commands"] for sample in samples] == [2, 1]
+    assert all(sample["wait"] <= sample["wall"] for sample in samples)
+    assert "CheckoutLikePage.helper" not in metrics.samples
+    WireCallCounter.release(driver)
+
+
+def test_summary_reports_percentiles_per_step(metrics):
+    for wall in [0.1, 0.2, 0.3, 0.4, 5.0]:
+        metrics.record("CartPage.click_my_cart", {"wall": wall, "wait": 0.0, "commands": 3, "screenshots": 0})
+
+    summary = metrics.summary()["CartPage.click_my_cart"]
+    assert summary["count"] == 5
+    assert summary["wall"] == {"p50": 0.3, "p95": 5.0, "p99": 5.0}
+    assert summary["commands"]["p99"] == 3
+
+
+def test_percentile_uses_nearest_rank():
+    assert percentile(list(range(1, 101)), 0.95) == 95
+
+
+def test_samples_are_attached_once_per_test_instead_of_as_parameters(metrics, monkeypatch):
+    attachments, parameters = [], []
+    monkeypatch.setattr(allure, "attach", lambda body, name=None, attachment_type=None: attachments.append((name, body)))
+    monkeypatch.setattr(allure.dynamic, "parameter", lambda *args, **kwargs: parameters.append(args))
+
+    for wall in [0.1, 0.25]:
+        metrics.record("CartPage.click_my_cart", {"wall": wall, "wait": 0.0, "commands": 3, "screenshots": 0})
+    metrics.attach_pending()
+    metrics.attach_pending()
+
+    assert parameters == []
+    ((name, body),) = attachments
+    assert name == "step_metrics"
+    assert [sample["wall"] for sample in json.loads(body)["CartPage.click_my_cart"]] == [0.1, 0.25]
+    assert len(metrics.samples["CartPage.click_my_cart"]) == 2
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from pages.base_page import BasePage
+from pages.locator_registry import LocatorRegistry
+
+
+class CandidateDriver:
+    """Answers the first-visible resolution script from a fixed set of visible xpaths."""
+
+    def __init__(self, visible):
+        self.visible = visible
+        self.round_trips = []
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    def execute_async_script(self, script, candidates, timeout_ms, poll_ms):
+        self.round_trips.append(list(candidates))
+        for index, xpath in enumerate(candidates):
+            if xpath in self.visible:
+                return [index, object()]
+        return [-1, None]
+
+
+@pytest.fixture
+def registry(isolated_state, tmp_path, monkeypatch):
+    registry = LocatorRegistry(path=str(tmp_path / "locator_stats.json"), demote_after=2)
+    monkeypatch.setattr(LocatorRegistry, "_shared", registry)
+    return registry
+
+
+def test_last_winner_is_tried_first_and_persisted(registry):
+    registry.record_failure("CheckoutPage", "login_option", "primary")
+    registry.record_success("CheckoutPage", "login_option", "alt")
+
+    assert registry.order("CheckoutPage", "login_option", ["primary", "alt"]) == ["alt", "primary"]
+    # Lookups only update memory; the file is written once, at the end of the run
+    assert not os.path.exists(registry.path)
+
+    LocatorRegistry.save_shared()
+    reloaded = LocatorRegistry(path=registry.path)
+    assert reloaded.order("CheckoutPage", "login_option", ["primary", "alt"]) == ["alt", "primary"]
+
+
+def test_parallel_workers_add_up_their_counts(tmp_path):
+    path = str(tmp_path / "locator_stats.json")
+    first, second = LocatorRegistry(path=path), LocatorRegistry(path=path)
+    first.record_success("CartPage", "checkout", "primary")
+    first.record_failure("CartPage", "checkout", "alt")
+    second.record_success("CartPage", "checkout", "primary")
+    second.record_success("CartPage", "checkout", "primary")
+    second.record_success("CartPage", "my_cart", "link")
+
+    first.save()
+    second.save()
+
+    locators = LocatorRegistry(path=path).report()["steps"]["CartPage.checkout"]["locators"]
+    assert locators["primary"]["successes"] == 3
+    assert locators["alt"]["failures"] == 1
+    assert "CartPage.my_cart" in LocatorRegistry(path=path).stats
+
+
+def test_repeatedly_failing_locator_is_demoted_and_reported(registry):
+    for _ in range(2):
+        registry.record_failure("ProductPage", "add_to_cart", "primary")
+
+    assert registry.order("ProductPage", "add_to_cart", ["primary", "alt", "third"]) == ["alt", "third", "primary"]
+    assert registry.report()["demotions"] == [
+        {"page": "ProductPage", "step": "add_to_cart", "locator": "primary", "consecutive_failures": 2}
+    ]
+
+    registry.record_success("ProductPage", "add_to_cart", "primary")
+    assert registry.order("ProductPage", "add_to_cart", ["primary", "alt"]) == ["primary", "alt"]
+
+
+def test_try_locators_resolves_all_candidates_in_one_round_trip(registry):
+    driver = CandidateDriver(visible={"alt"})
+    page = BasePage(driver)
+    clicked = []
+
+    assert page.try_locators("step", ["primary", "alt"], clicked.append) == "alt"
+    assert page.try_locators("step", ["primary", "alt"], clicked.append) == "alt"
+
+    assert clicked == ["alt", "alt"]
+    assert driver.round_trips == [["primary", "alt"], ["alt", "primary"]]
+
+
+def test_try_locators_raises_when_nothing_matches(registry):
+    page = BasePage(CandidateDriver(visible=set()))
+    with pytest.raises(NoSuchElementException):
+        page.try_locators("step", ["primary", "alt"], lambda xpath: True)
+    assert registry.report()["steps"]["BasePage.step"]["locators"]["alt"]["failures"] == 1
+
+
+def test_action_failure_on_winner_is_recorded(registry):
+    page = BasePage(CandidateDriver(visible={"primary"}))
+    with pytest.raises(AssertionError):
+        page.try_locators("step", ["primary", "alt"], lambda xpath: False)
+    assert registry.report()["steps"]["BasePage.step"]["locators"]["primary"]["failures"] == 1
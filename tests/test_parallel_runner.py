@@ -0,0 +1,55 @@
+import json
+import os
+
+from pages.instrumentation import StepMetrics
+from utils.parallel_runner import merge_allure_results, merge_step_metrics, shard, worker_environment
+
+
+def test_shards_cover_every_case_exactly_once():
+    cases = list(range(10))
+    shards = [shard(cases, index, 3) for index in range(3)]
+    assert sorted(case for part in shards for case in part) == cases
+    assert shard(cases, 1, 3) == shard(cases, 1, 3)
+
+
+def test_workers_get_isolated_artifact_directories():
+    first = worker_environment(0, 2, base_env={})
+    second = worker_environment(1, 2, base_env={})
+    assert first["SCREENSHOTS_DIR"] != second["SCREENSHOTS_DIR"]
+    assert first["SHARD_COUNT"] == "2"
+
+
+def test_merge_moves_worker_results_into_shared_directory(tmp_path):
+    worker_dirs = []
+    for index in range(2):
+        worker_dir = tmp_path / f"worker-{index}"
+        worker_dir.mkdir()
+        (worker_dir / f"{index}-result.json").write_text("{}")
+        (worker_dir / "environment.properties").write_text(f"worker={index}")
+        worker_dirs.append(str(worker_dir))
+
+    target = tmp_path / "allure-results"
+    assert merge_allure_results(worker_dirs, str(target)) == 3
+    assert sorted(os.listdir(target)) == ["0-result.json", "1-result.json", "environment.properties"]
+    assert (target / "environment.properties").read_text() == "worker=0"
+    assert not any(os.path.exists(d) for d in worker_dirs)
+
+
+def test_worker_step_metrics_merge_into_one_summary(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for index, walls in enumerate([[0.1, 0.2, 0.3], [4.0]]):
+        monkeypatch.setenv("WORKER_ID", f"worker-{index}")
+        metrics = StepMetrics()
+        for wall in walls:
+            metrics.record("CartPage.click_my_cart", {"wall": wall, "wait": 0.0, "commands": 3, "screenshots": 0})
+        metrics.write_summary()
+    monkeypatch.delenv("WORKER_ID")
+
+    # A third worker that recorded no steps left no file behind
+    assert merge_step_metrics(3, str(tmp_path / "step_metrics.json")) == str(tmp_path / "step_metrics.json")
+    summary = json.loads((tmp_path / "step_metrics.json").read_text())["CartPage.click_my_cart"]
+    assert summary["count"] == 4
+    # Recomputed from every sample, not averaged from the workers' percentiles
+    assert summary["wall"] == {"p50": 0.2, "p95": 4.0, "p99": 4.0}
+    assert "samples" not in summary
+    assert os.listdir(tmp_path) == ["step_metrics.json"]
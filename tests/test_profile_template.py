@@ -0,0 +1,131 @@
+import os
+
+import pytest
+
+from pages.instrumentation import StepMetrics
+from utils.driver_factory import DriverFactory
+from utils.profile_template import ProfileTemplate, detect_browser_version
+
+BASE_URL = "http://storefront.test"
+
+
+def warm_profile(user_data_dir, version="131.0.1"):
+    for relative_path, content in {
+        "Default/Cache/Cache_Data/f_000001": "theme.css",
+        "Default/Cache/Cache_Data/index": "cache index",
+        "Default/Preferences": "{}",
+        "SingletonLock": "",
+    }.items():
+        path = os.path.join(user_data_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+    return version
+
+
+class BrowserStub:
+    def __init__(self, version, visits):
+        self.capabilities = {"browserVersion": version}
+        self.visits = visits
+
+    def get(self, url):
+        self.visits.append(url)
+
+    def execute_script(self, script):
+        return "complete"
+
+    def quit(self):
+        pass
+
+
+class Launcher:
+    def __init__(self, version="131.0.1"):
+        self.version = version
+        self.visits = []
+        self.user_data_dirs = []
+
+    def __call__(self, options, driver_path):
+        user_data_dir = next(arg.split("=", 1)[1] for arg in options.arguments if arg.startswith("--user-data-dir="))
+        self.user_data_dirs.append(user_data_dir)
+        if not os.listdir(user_data_dir):
+            warm_profile(user_data_dir, self.version)
+        return BrowserStub(self.version, self.visits)
+
+
+@pytest.fixture
+def template(tmp_path):
+    return ProfileTemplate(root=str(tmp_path / "profiles"), ttl=3600)
+
+
+def test_template_is_rebuilt_only_when_url_version_preset_or_age_changes(template):
+    fingerprint = ProfileTemplate.fingerprint(BASE_URL, "131.0.1", "fast")
+    assert template.ensure(fingerprint, warm_profile) is True
+    assert template.ensure(fingerprint, warm_profile) is False
+    # A binary that could not be asked for its version does not force a rebuild
+    assert template.is_valid(ProfileTemplate.fingerprint(BASE_URL, None, "fast"))
+
+    assert not template.is_valid(ProfileTemplate.fingerprint("http://127.0.0.1:8000", "131.0.1", "fast"))
+    assert not template.is_valid(ProfileTemplate.fingerprint(BASE_URL, "132.0.0", "fast"))
+    assert not template.is_valid(ProfileTemplate.fingerprint(BASE_URL, "131.0.1", "faithful"))
+    assert not template.is_valid(fingerprint, now=template.metadata()["built_at"] + 3600)
+
+
+def test_clones_without_reflinks_share_no_files_with_the_template(template):
+    template.ensure(ProfileTemplate.fingerprint(BASE_URL, "131.0.1", "fast"), warm_profile)
+    # Force the fallback the CI filesystem would use when it cannot reflink
+    template.reflinks = False
+    clone = template.clone()
+
+    def inode(root, relative_path):
+        return os.stat(os.path.join(root, relative_path)).st_ino
+
+    entry, index, preferences = "Default/Cache/Cache_Data/f_000001", "Default/Cache/Cache_Data/index", "Default/Preferences"
+    # Chrome rewrites cache entries in place, so even those must not share an inode
+    assert inode(clone, entry) != inode(template.template_dir, entry)
+    assert inode(clone, index) != inode(template.template_dir, index)
+    assert inode(clone, preferences) != inode(template.template_dir, preferences)
+    assert not os.path.exists(os.path.join(clone, "SingletonLock"))
+    assert not os.path.exists(os.path.join(clone, "template.json"))
+    assert template.stats["copied"] == 3 and template.stats["reflinked"] == 0
+    assert template.clone() != clone
+
+
+def test_clones_of_finished_processes_are_pruned(template):
+    stale = os.path.join(template.sessions_dir, "session-999999999-1")
+    os.makedirs(stale)
+    template.ensure(ProfileTemplate.fingerprint(BASE_URL, "131.0.1", "fast"), warm_profile)
+    assert not os.path.exists(stale)
+
+
+def test_factory_warms_once_and_launches_every_session_from_its_own_clone(template, monkeypatch):
+    monkeypatch.setattr(StepMetrics, "_shared", StepMetrics())
+    launcher = Launcher()
+    factory = DriverFactory(launcher, environ={"PATH": ""}, profile_template=template)
+
+    factory.create("fast", BASE_URL)
+    factory.create("fast", BASE_URL)
+
+    assert template.stats["builds"] == 1
+    assert launcher.visits[0] == f"{BASE_URL}/"
+    build_dir, first, second = launcher.user_data_dirs
+    assert first != second and all(path.startswith(template.sessions_dir) for path in (first, second))
+    assert os.path.exists(os.path.join(second, "Default/Cache/Cache_Data/f_000001"))
+    factory.cleanup()
+    assert not os.path.exists(first) and not os.path.exists(second)
+
+
+def test_a_browser_upgrade_discovered_at_launch_invalidates_the_template(template, monkeypatch):
+    monkeypatch.setattr(StepMetrics, "_shared", StepMetrics())
+    template.ensure(ProfileTemplate.fingerprint(BASE_URL, "131.0.1", "fast"), warm_profile)
+    factory = DriverFactory(Launcher(version="132.0.0"), environ={"PATH": ""}, profile_template=template)
+
+    factory.create("fast", BASE_URL)
+    assert template.metadata() is None
+
+
+def test_browser_version_is_read_from_the_binary(tmp_path):
+    chrome = tmp_path / "chrome"
+    chrome.write_text("#!/bin/sh\necho 'Google Chrome 131.0.6778.85 '\n")
+    chrome.chmod(0o755)
+    assert detect_browser_version({"CHROME_BINARY": str(chrome)}) == "131.0.6778.85"
+    assert detect_browser_version({"PATH": str(tmp_path / "empty")}) is None
@@ -0,0 +1,56 @@
+import time
+
+from pages import readiness as ready
+from pages.readiness import ReadinessEngine
+
+
+class ScriptedDriver:
+    """Minimal driver whose URL and readyState change after a delay."""
+
+    def __init__(self, url_after, delay):
+        self.url_before = "https://store.test/"
+        self.url_after = url_after
+        self.switch_at = time.monotonic() + delay
+
+    @property
+    def current_url(self):
+        return self.url_after if time.monotonic() >= self.switch_at else self.url_before
+
+    def execute_script(self, script):
+        return "complete" if time.monotonic() >= self.switch_at else "loading"
+
+    def find_elements(self, by, value):
+        return []
+
+
+def test_wait_returns_as_soon_as_condition_holds():
+    driver = ScriptedDriver("https://store.test/checkout", delay=0.2)
+    engine = ReadinessEngine(driver, poll_frequency=0.02)
+
+    assert engine.wait("checkout_loaded", ready.url_contains("checkout"), ceiling=5, legacy_sleep=5) is True
+
+    timing = engine.report()[0]
+    assert timing["ready"] is True
+    assert timing["waited"] < 1
+    assert timing["saved"] > 4
+
+
+def test_wait_stops_at_ceiling_and_reports_not_ready():
+    driver = ScriptedDriver("https://store.test/checkout", delay=60)
+    engine = ReadinessEngine(driver, poll_frequency=0.02)
+
+    assert engine.wait("checkout_loaded", ready.url_contains("checkout"), ceiling=0.2, legacy_sleep=5) is False
+    assert engine.report()[0]["ready"] is False
+
+
+def test_composed_conditions():
+    driver = ScriptedDriver("https://store.test/search?q=jacket", delay=0)
+    assert ready.all_of(ready.url_contains("search"), ready.document_ready())(driver)
+    assert ready.any_of(ready.url_contains("cart"), ready.url_matches(r"q=\w+"))(driver)
+    assert not ready.element_present("//a")(driver)
+
+
+def test_engine_is_shared_per_driver():
+    driver = ScriptedDriver("https://store.test/", delay=0)
+    assert ReadinessEngine.for_driver(driver) is ReadinessEngine.for_driver(driver)
+    ReadinessEngine.release(driver)
@@ -0,0 +1,111 @@
+from selenium.common.exceptions import WebDriverException
+
+from pages.request_blocking import RequestBlocker, RequestBlockingStats, matches
+from tests.test_saucelabs import SauceLabsTest
+from utils.driver_factory import build_options
+from utils.simulated_driver import SimulatedDriver
+
+FONT = "http://storefront.test/cdn/fonts/futura_n4.woff2"
+ANALYTICS = "http://storefront.test/cdn/shopifycloud/trekkie.storefront.min.js"
+
+
+class CdpDriver:
+    def __init__(self, supports_url_patterns=True):
+        self.supports_url_patterns = supports_url_patterns
+        self.cdp_calls = []
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        if "urlPatterns" in cmd_args and not self.supports_url_patterns:
+            raise WebDriverException("invalid parameters")
+        self.cdp_calls.append((cmd, cmd_args))
+        return {}
+
+
+def run_flow(driver, search_term="grey jacket"):
+    test = SauceLabsTest(driver)
+    assert test.search_add_cart_checkout_login_flow("a@b.c", "pw", search_term) is True
+    report = test.home_page.request_blocker.report()
+    test.attach_reports()
+    return report
+
+
+def test_patterns_use_wildcards_and_allow_wins(tmp_path):
+    assert matches("*://*/*.woff2*", FONT)
+    assert not matches("*://*.doubleclick.net/*", "https://doubleclick.net.example.com/ad")
+    blocker = RequestBlocker(CdpDriver(), environ={"REQUEST_BLOCKING_ALLOW": "*/futura_*"},
+                             stats=RequestBlockingStats(path=str(tmp_path / "stats.json")))
+    assert blocker.decision(ANALYTICS) == "*://*/*trekkie*"
+    assert blocker.decision(FONT) is None
+    assert blocker.decision("http://storefront.test/products/grey-jacket") is None
+
+
+def test_rules_are_sent_once_per_change_with_allows_first(tmp_path):
+    driver = CdpDriver()
+    blocker = RequestBlocker(driver, environ={}, stats=RequestBlockingStats(path=str(tmp_path / "stats.json")))
+    blocker.add_rules(allow=["*://cdn.shopify.com/s/files/*"])
+    blocker.add_rules(allow=["*://cdn.shopify.com/s/files/*"])
+
+    assert [cmd for cmd, _ in driver.cdp_calls] == ["Network.enable", "Network.setBlockedURLs"]
+    rules = driver.cdp_calls[1][1]["urlPatterns"]
+    assert rules[0] == {"urlPattern": "*://cdn.shopify.com/s/files/*", "block": False}
+    assert all(rule["block"] for rule in rules[1:])
+
+
+def test_older_chrome_gets_deny_patterns_without_the_allowed_overlap(tmp_path):
+    driver = CdpDriver(supports_url_patterns=False)
+    blocker = RequestBlocker(driver, environ={"REQUEST_BLOCKING": "aggressive"},
+                             stats=RequestBlockingStats(path=str(tmp_path / "stats.json")))
+    blocker.add_rules(allow=["*://cdn.shopify.com/s/files/*.jpg"])
+
+    urls = driver.cdp_calls[-1][1]["urls"]
+    assert "*://*/*trekkie*" in urls
+    assert "*://*/*.jpg*" not in urls
+
+
+def test_off_profile_leaves_the_browser_alone(tmp_path):
+    driver = CdpDriver()
+    RequestBlocker(driver, environ={"REQUEST_BLOCKING": "off"}).add_rules(deny=["*://*/*"])
+    assert driver.cdp_calls == []
+    assert "goog:loggingPrefs" not in build_options("fast", environ={"REQUEST_BLOCKING": "off"}).to_capabilities()
+    assert "goog:loggingPrefs" in build_options("fast", environ={}).to_capabilities()
+
+
+def test_default_profile_keeps_the_flow_green_and_reports_what_it_blocked(simulated_driver):
+    report = run_flow(simulated_driver)
+
+    # Every page view requests the web font and the analytics script; none of them got through
+    assert report["profile"] == "default"
+    assert report["requests_blocked"] >= 8
+    assert set(report["patterns"]) == {"*://*/*trekkie*", "*://*/*.woff2*"}
+    assert report["estimated_bytes_saved"] == 0
+
+
+def test_observe_run_teaches_the_savings_of_later_blocking_runs(simulated_driver, monkeypatch):
+    monkeypatch.setenv("REQUEST_BLOCKING", "observe")
+    observed = run_flow(simulated_driver)
+    assert observed["requests_blocked"] == 0
+    learned = RequestBlockingStats.shared().learned
+    assert learned["*://*/*.woff2*"]["bytes"] == learned["*://*/*.woff2*"]["samples"] * 32 * 1024
+
+    monkeypatch.setenv("REQUEST_BLOCKING", "default")
+    # A fresh process: learned sizes come back from disk, blocked counts start at zero
+    monkeypatch.setattr(RequestBlockingStats, "_shared", RequestBlockingStats(path=RequestBlockingStats.shared().path))
+    blocked = run_flow(SimulatedDriver(simulated_driver.app), "noir jacket")
+    font = blocked["patterns"]["*://*/*.woff2*"]
+    assert font["estimated_bytes"] == font["requests"] * 32 * 1024
+    assert blocked["estimated_bytes_saved"] > font["estimated_bytes"]
+
+
+def test_parallel_workers_add_up_their_measurements(tmp_path):
+    path = str(tmp_path / "stats.json")
+    first, second = RequestBlockingStats(path=path), RequestBlockingStats(path=path)
+    first.record_observed("*://*/*.woff2*", 1000, 0.1)
+    second.record_observed("*://*/*.woff2*", 3000, 0.3)
+    second.record_observed("*://*/*trekkie*", 500, 0.05)
+
+    first.save()
+    second.save()
+
+    learned = RequestBlockingStats(path=path).learned
+    assert learned["*://*/*.woff2*"] == {"samples": 2, "bytes": 4000, "seconds": 0.4}
+    assert learned["*://*/*trekkie*"]["samples"] == 1
@@ -1,34 +1,47 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 import time
 import allure
+from urllib.parse import urlparse
 from pages.search_page import HomePage
 from pages.product_page import ProductPage
 from pages.cart_page import CartPage
 from pages.checkout_page import CheckoutPage
 from pages.login_page import LoginPage
 from pages.signup import RegistrationPage
+from pages.readiness import ReadinessEngine, AsyncReadinessEngine
+from pages.locator_registry import LocatorRegistry
+from pages.wire_calls import WireCallCounter
+from pages.capture_policy import CapturePolicy
+from pages.request_blocking import RequestBlocker
+from pages.timeouts import TimeoutModel
+from pages.async_pages import AsyncHomePage, AsyncProductPage, AsyncCartPage, AsyncCheckoutPage
+from utils.storage_state import StorageStateCache
+from utils.cart_seeding import CartSeeder
+from utils.checkpoints import StagedFlow
+from utils.execution_tree import ExecutionTree, FlowGraph, Step
+from utils.driver_factory import DriverFactory
 
-class SauceLabsTest:
-    def __init__(self):
-        #ja rakhe ni run chai runner bata garne
-        chrome_options = Options()
-        chrome_options.add_argument("--start-maximized")
-
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-
+def create_driver(preset=None, base_url=None):
+    #ja rakhe ni run chai runner bata garne
+    # Preset and chromedriver binary come from DRIVER_PRESET/CHROMEDRIVER_PATH; see utils.driver_factory
+    return DriverFactory.shared().create(preset, base_url)
 
-        service = Service('/Users/sumana/Downloads/chromedriver-mac-arm64 2/chromedriver')
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.home_page = HomePage(self.driver)
-        self.product_page = ProductPage(self.driver)
-        self.cart_page = CartPage(self.driver)
-        self.checkout_page = CheckoutPage(self.driver)
-        self.login_page = LoginPage(self.driver)
-        self.registration_page = RegistrationPage(self.driver)
+class SauceLabsTest:
+    def __init__(self, driver=None, base_url=None, storage_state=None, retries=None):
+        # A driver leased from a SessionPool can be passed in; otherwise launch a fresh one
+        self.driver = driver if driver is not None else create_driver()
+        # Logged-in cookies/localStorage shared across cases so only the first one types the credentials
+        self.storage_state = storage_state if storage_state is not None else StorageStateCache.shared()
+        self.home_page = HomePage(self.driver, base_url)
+        self.product_page = ProductPage(self.driver, base_url)
+        self.cart_page = CartPage(self.driver, base_url)
+        self.checkout_page = CheckoutPage(self.driver, base_url)
+        self.login_page = LoginPage(self.driver, base_url)
+        self.registration_page = RegistrationPage(self.driver, base_url)
+        self.base_url = self.home_page.base_url
+        # Retries per staged flow, resumed from the last checkpoint; defaults to FLOW_RETRIES
+        self.retries = retries
+        self.flow = None
+        self.tree = None
 
     @allure.feature('SauceLabs Automation')
     @allure.story('Signup')
@@ -36,10 +49,10 @@ class SauceLabsTest:
         with allure.step("Running registration test with unique email"):
             print("Running registration test with unique email")
             self.home_page.navigate_to_home()
-            time.sleep(2)
+            self.home_page.wait_until_ready("home_loaded", legacy_sleep=2)
             self.home_page.click_sign_up()
             print("Clicked on Sign up link")
-            time.sleep(2)
+            self.home_page.wait_until_ready("sign_up_loaded", legacy_sleep=2)
             
             if "register" in self.driver.current_url:
                 with allure.step("Registration form loaded successfully"):
@@ -60,46 +73,169 @@ class SauceLabsTest:
     @allure.feature('SauceLabs Automation')
     @allure.story('Search, Add to Cart, Checkout Flow')
     def search_add_cart_checkout_login_flow(self, email, password, search_term):
+        # Each stage checkpoints the browser once it succeeds; with FLOW_RETRIES a failed stage is
+        # retried from the last checkpoint instead of from the home page
+        self.flow = StagedFlow(self.driver, self.base_url, [
+            ("home", lambda context: self.open_home(context, email)),
+            ("search", lambda context: self.search(search_term)),
+            ("product", lambda context: self.open_first_product()),
+            ("add_to_cart", lambda context: self.add_product_to_cart()),
+            ("cart", lambda context: self.open_cart()),
+            ("checkout", self.open_checkout),
+            ("login", lambda context: self.log_in_at_checkout(context, email, password)),
+        ], self.retries)
+        passed = self.flow.run()
+        if len(self.flow.attempts) > 1:
+            print(self.flow.format_report())
+        return passed
+
+    def open_home(self, context, email):
+        # Inject a still-valid cached login before the first navigation
+        context["state_restored"] = self.storage_state.restore(self.driver, email, self.base_url)
         self.home_page.navigate_to_home()
-        time.sleep(2)
+        self.home_page.wait_until_ready("home_loaded", legacy_sleep=2)
         
         # Verify we're on the home page
-        if "sauce-demo" not in self.driver.current_url:
+        if urlparse(self.base_url).netloc not in self.driver.current_url:
             self.home_page.take_screenshot("homepage_navigation_failure")
             print("Failed to navigate to homepage")
             return False
-            
+        return True
+
+    def search(self, search_term):
         self.home_page.search_product(search_term)
-        time.sleep(5)
+        self.home_page.wait_until_ready("search_results", legacy_sleep=5)
+        return True
 
+    def open_first_product(self):
         product_clicked = self.home_page.click_first_product_in_search_results()
         if not product_clicked:
             self.home_page.take_screenshot("click_product_failure")
             print("Could not click on product from search results, continuing...")
             return False
 
-        time.sleep(3)
+        self.product_page.wait_until_ready("product_loaded", legacy_sleep=3)
+        return True
+
+    def add_product_to_cart(self):
         added_to_cart = self.product_page.add_to_cart()
         if not added_to_cart:
             self.product_page.take_screenshot("add_to_cart_failure")
             print("Could not add product to cart")
             return False
 
-        time.sleep(2)
+        self.product_page.wait_until_ready("added_to_cart", legacy_sleep=2)
+        return True
+
+    def open_cart(self):
         cart_clicked = self.cart_page.click_my_cart()
         if not cart_clicked:
             self.cart_page.take_screenshot("click_cart_failure")
             print("Could not click on cart link")
             return False
 
-        time.sleep(2)
+        self.cart_page.wait_until_ready("cart_opened", legacy_sleep=2)
+        return True
+
+    def flow_graph(self):
+        """
+        The search, cart, checkout and login flow as a graph of steps for utils.execution_tree.
+
+        Unlike search_add_cart_checkout_login_flow, the login is its own step on the account
+        page, so it only has to come before checkout and can be shared by every row of an account.
+        """
+        return FlowGraph([
+            Step("home", lambda context, email: self.open_home(context, email), params=("email",)),
+            Step("login", self.log_in, params=("email", "password"), after=("home",)),
+            Step("search", lambda context, search_term: self.search(search_term), params=("search_term",),
+                 after=("home",)),
+            Step("product", lambda context: self.open_first_product(), after=("search",)),
+            Step("add_to_cart", lambda context: self.add_product_to_cart(), after=("product",)),
+            Step("cart", lambda context: self.open_cart(), after=("add_to_cart",)),
+            Step("checkout", lambda context: self.open_checkout(context) and self.checkout_page.is_logged_in(),
+                 after=("cart", "login")),
+        ])
+
+    @allure.feature('SauceLabs Automation')
+    @allure.story('Search, Add to Cart, Checkout Flow')
+    def search_add_cart_checkout_login_tree(self, rows):
+        """
+        Run several rows through the flow, sharing the steps their rows have in common.
+
+        Args:
+            rows (list): Dicts with email, password and search_term
+
+        Returns:
+            list: True or False per row, in row order
+        """
+        self.tree = ExecutionTree(self.flow_graph(), rows, self.driver, self.base_url)
+        results = self.tree.run()
+        print(self.tree.format_report())
+        return results
+
+    def log_in(self, context, email, password):
+        # A restored login only needs confirming on the account page
+        if context.get("state_restored"):
+            self.driver.get(f"{self.base_url}/account")
+            if self.checkout_page.is_logged_in():
+                print("Logged in from cached storage state; skipping UI login")
+                return True
+            self.storage_state.invalidate(email, self.base_url)
+
+        self.driver.get(f"{self.base_url}/account/login")
+        self.login_page.enter_login_credentials(email, password)
+        self.login_page.click_sign_in()
+        self.checkout_page.wait_until_ready("login_submitted", legacy_sleep=5)
+        if not self.checkout_page.is_logged_in():
+            self.login_page.take_screenshot("account_login_failure")
+            print(f"Login failed. Current URL: {self.driver.current_url}")
+            return False
+        self.storage_state.capture(self.driver, email, self.base_url)
+        return True
+
+    @allure.feature('SauceLabs Automation')
+    @allure.story('Seeded Cart, Checkout Flow')
+    def seeded_checkout_login_flow(self, email, password, search_term):
+        """
+        Reach checkout with a cart filled over HTTP instead of through search and product pages.
+
+        For cases that only care about checkout and login; the UI prefix is covered
+        by search_add_cart_checkout_login_flow.
+        """
+        state_restored = self.storage_state.restore(self.driver, email, self.base_url)
+        seeder = CartSeeder(self.base_url)
+        line_item = seeder.add_search_result(search_term)
+        print(f"Seeded cart with {line_item['title']} in {seeder.requests} HTTP requests")
+        seeder.transfer(self.driver)
+        if not self.cart_page.wait_until_ready("cart_opened"):
+            self.cart_page.take_screenshot("seeded_cart_not_opened")
+            print("Seeded cart page did not load")
+            return False
+        return self.checkout_login_flow(email, password, state_restored)
+
+    def checkout_login_flow(self, email, password, state_restored=False):
+        """
+        From an open cart: check out and log in, unless a restored login already holds.
+
+        Args:
+            email (str): Account to log in as
+            password (str): Password for the account
+            state_restored (bool): Whether a cached storage state was injected for this case
+
+        Returns:
+            bool: True if checkout was reached as a logged-in customer
+        """
+        context = {"state_restored": state_restored}
+        return self.open_checkout(context) and self.log_in_at_checkout(context, email, password)
+
+    def open_checkout(self, context):
         checkout_clicked = self.cart_page.click_checkout()
         if not checkout_clicked:
             self.cart_page.take_screenshot("click_checkout_failure")
             print("Could not click on checkout button")
             return False
 
-        time.sleep(5)
+        self.cart_page.wait_until_ready("checkout_loaded", legacy_sleep=5)
         current_url = self.driver.current_url
         print(f"Current URL after clicking checkout: {current_url}")
 
@@ -108,6 +244,18 @@ class SauceLabsTest:
             print("Failed to navigate to checkout page")
             return False
 
+        if context.get("state_restored") and self.checkout_page.is_logged_in():
+            print("Logged in from cached storage state; skipping UI login")
+            context["logged_in"] = True
+        return True
+
+    def log_in_at_checkout(self, context, email, password):
+        if context.get("logged_in"):
+            return True
+        if context.get("state_restored"):
+            self.storage_state.invalidate(email, self.base_url)
+            context["state_restored"] = False
+
         login_clicked = self.checkout_page.click_login_option()
         if not login_clicked:
             self.checkout_page.take_screenshot("click_login_option_failure")
@@ -126,17 +274,19 @@ class SauceLabsTest:
             print("Could not click sign in button")
             return False
 
-        time.sleep(5)
+        self.checkout_page.wait_until_ready("login_submitted", legacy_sleep=5)
         login_verified = self.checkout_page.verify_login_success()
         current_url = self.driver.current_url
         print(f"URL after login: {current_url}")
         
         if "checkout" in current_url or login_verified:
             print("Successfully returned to checkout after login")
+            self.storage_state.capture(self.driver, email, self.base_url)
         elif "account" in current_url:
             print("Still on account page, need to go to checkout")
-            self.driver.get('https://sauce-demo.myshopify.com/cart')
-            time.sleep(2)
+            self.storage_state.capture(self.driver, email, self.base_url)
+            self.driver.get(f"{self.base_url}/cart")
+            self.cart_page.wait_until_ready("cart_opened", legacy_sleep=2)
             checkout_clicked = self.cart_page.click_checkout()
             if checkout_clicked:
                 print("Clicked on Check Out link from cart")
@@ -148,6 +298,110 @@ class SauceLabsTest:
     
         return True
 
+    def readiness_report(self):
+        """Return the per-step comparison of the old fixed sleeps against the actual waits."""
+        return self.home_page.readiness.report()
+
+    def attach_reports(self):
+        """
+        Attach the readiness, locator, wire-call, capture-policy, storage-state, request-blocking, timeout, retry and execution-tree reports,
+        then detach per-driver state so a reused driver starts fresh.
+        """
+        self.home_page.readiness.attach_report()
+        print(self.home_page.readiness.format_report())
+        ReadinessEngine.release(self.driver)
+        LocatorRegistry.shared().attach_report()
+        self.home_page.wire_calls.attach_report()
+        CapturePolicy.shared().attach_report()
+        self.storage_state.attach_report()
+        self.home_page.request_blocker.attach_report()
+        TimeoutModel.shared().attach_report()
+        if self.flow is not None:
+            self.flow.attach_report()
+        if self.tree is not None:
+            self.tree.attach_report()
+        WireCallCounter.release(self.driver)
+        RequestBlocker.release(self.driver)
+
     def close_driver(self):
+        self.attach_reports()
         self.driver.quit()
-        print("All tests completed")
\ No newline at end of file
+        print("All tests completed")
+
+class AsyncSauceLabsTest:
+    """
+    search_add_cart_checkout_login_flow on an AsyncWebDriver (utils.async_webdriver).
+
+    Many instances run concurrently on one event loop; see utils.async_benchmark.
+    The cached storage state is not used here, so every flow logs in through the UI.
+    """
+
+    def __init__(self, driver, base_url=None):
+        self.driver = driver
+        self.home_page = AsyncHomePage(driver, base_url)
+        self.product_page = AsyncProductPage(driver, base_url)
+        self.cart_page = AsyncCartPage(driver, base_url)
+        self.checkout_page = AsyncCheckoutPage(driver, base_url)
+        self.base_url = self.home_page.base_url
+
+    async def search_add_cart_checkout_login_flow(self, email, password, search_term):
+        await self.home_page.navigate_to_home()
+        await self.home_page.wait_until_ready("home_loaded", legacy_sleep=2)
+        if urlparse(self.base_url).netloc not in await self.driver.get_current_url():
+            await self.home_page.take_screenshot("homepage_navigation_failure")
+            print("Failed to navigate to homepage")
+            return False
+
+        await self.home_page.search_product(search_term)
+        await self.home_page.wait_until_ready("search_results", legacy_sleep=5)
+        if not await self.home_page.click_first_product_in_search_results():
+            return False
+
+        await self.product_page.wait_until_ready("product_loaded", legacy_sleep=3)
+        if not await self.product_page.add_to_cart():
+            return False
+
+        await self.product_page.wait_until_ready("added_to_cart", legacy_sleep=2)
+        if not await self.cart_page.click_my_cart():
+            await self.cart_page.take_screenshot("click_cart_failure")
+            print("Could not click on cart link")
+            return False
+
+        await self.cart_page.wait_until_ready("cart_opened", legacy_sleep=2)
+        if not await self.cart_page.click_checkout():
+            await self.cart_page.take_screenshot("click_checkout_failure")
+            print("Could not click on checkout button")
+            return False
+
+        await self.cart_page.wait_until_ready("checkout_loaded", legacy_sleep=5)
+        if "checkout" not in await self.driver.get_current_url():
+            await self.cart_page.take_screenshot("checkout_navigation_failure")
+            print("Failed to navigate to checkout page")
+            return False
+
+        if not await self.checkout_page.click_login_option():
+            return False
+        if not await self.checkout_page.enter_login_credentials(email, password):
+            return False
+        if not await self.checkout_page.click_sign_in():
+            return False
+
+        await self.checkout_page.wait_until_ready("login_submitted", legacy_sleep=5)
+        login_verified = await self.checkout_page.verify_login_success()
+        current_url = await self.driver.get_current_url()
+        if "checkout" in current_url or login_verified:
+            return True
+        if "account" in current_url:
+            await self.driver.get(f"{self.base_url}/cart")
+            await self.cart_page.wait_until_ready("cart_opened", legacy_sleep=2)
+            if await self.cart_page.click_checkout():
+                print("Clicked on Check Out link from cart")
+            return True
+        print(f"Not on checkout page after login. Current URL: {current_url}")
+        await self.checkout_page.take_screenshot("post_login_state_unexpected")
+        return False
+
+    async def close_driver(self):
+        print(self.home_page.readiness.format_report())
+        AsyncReadinessEngine.release(self.driver)
+        await self.driver.quit()
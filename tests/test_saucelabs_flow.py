@@ -1,15 +1,44 @@
+import allure
 import pytest
 from tests.test_saucelabs import SauceLabsTest
-from tests.test_data import login_search_data
-
-@pytest.mark.parametrize("data", login_search_data)
-def test_search_add_cart_checkout_login_flow(data):
-    test = SauceLabsTest()
-    try:
-        assert test.search_add_cart_checkout_login_flow(
-            data["email"],
-            data["password"],
-            data["search_term"]
-        ) is True
-    finally:
-        test.close_driver()
+from utils import execution_tree
+
+
+def test_search_add_cart_checkout_login_flow(data_batch, session_pool):
+    # data_batch is a DataProvider shard (see conftest): rows are read one at a time as they run
+    if execution_tree.enabled():
+        run_batch_as_tree(data_batch, session_pool)
+        return
+    failures = []
+    ran = 0
+    for position, data in data_batch.iter_indexed():
+        ran += 1
+        with allure.step(f"Row {position}: {data['search_term']}"), session_pool.session() as driver:
+            test = SauceLabsTest(driver)
+            try:
+                if test.search_add_cart_checkout_login_flow(
+                    data["email"],
+                    data["password"],
+                    data["search_term"]
+                ) is not True:
+                    failures.append(f"row {position} ({data['search_term']})")
+            finally:
+                test.attach_reports()
+    if not ran:
+        pytest.skip(f"No rows in {data_batch.describe()}")
+    assert not failures, f"Flow failed for {', '.join(failures)}"
+
+
+def run_batch_as_tree(data_batch, session_pool):
+    # FLOW_TREE=1: the batch's rows share one session and every step they have in common
+    indexed = list(data_batch.iter_indexed())
+    if not indexed:
+        pytest.skip(f"No rows in {data_batch.describe()}")
+    with allure.step(f"Rows {indexed[0][0]}-{indexed[-1][0]} as an execution tree"), session_pool.session() as driver:
+        test = SauceLabsTest(driver)
+        try:
+            results = test.search_add_cart_checkout_login_tree([data for _, data in indexed])
+        finally:
+            test.attach_reports()
+    failures = [f"row {position} ({data['search_term']})" for (position, data), passed in zip(indexed, results) if not passed]
+    assert not failures, f"Flow failed for {', '.join(failures)}"
@@ -0,0 +1,76 @@
+import io
+import os
+
+import pytest
+
+from pages.screenshot_store import ScreenshotStore
+from pages.screenshots import Image, ScreenshotPipeline
+
+pytestmark = pytest.mark.skipif(Image is None, reason="Pillow is not installed")
+
+
+def png_bytes(width, height, color=(200, 30, 30)):
+    image = Image.new("RGB", (width, height), color)
+    # A gradient band gives the perceptual hash some structure to work with
+    for x in range(width):
+        image.putpixel((x, height // 2), (x % 256, 0, 0))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_flush_waits_for_every_queued_screenshot(tmp_path):
+    pipeline = ScreenshotPipeline(image_format="jpeg", max_width=400, queue_size=2)
+    jobs = [pipeline.submit(png_bytes(1600, 900), str(tmp_path), f"failure_{i}", test="t") for i in range(5)]
+    pipeline.flush()
+
+    assert pipeline.written == 5
+    assert all(job.path.endswith(".jpg") for job in jobs)
+    with Image.open(jobs[0].path) as written:
+        assert written.format == "JPEG"
+        assert written.size == (400, 225)
+
+
+def test_repeated_failures_share_one_blob(tmp_path):
+    store = ScreenshotStore(str(tmp_path), key_mode="content")
+    first = store.put(b"same image", "png", "test_flow[0]", "cart_opened", timestamp=1)
+    second = store.put(b"same image", "png", "test_flow[1]", "cart_opened", timestamp=2)
+
+    assert first == second
+    assert len(store.index["blobs"]) == 1
+    assert [entry["test"] for entry in store.entries(step="cart_opened")] == ["test_flow[0]", "test_flow[1]"]
+    assert ScreenshotStore(str(tmp_path)).entries()[1]["path"] == first
+
+
+def test_perceptual_key_ignores_encoder_noise(tmp_path):
+    store = ScreenshotStore(str(tmp_path), key_mode="perceptual")
+    original = png_bytes(320, 200)
+    first = store.put(b"jpeg bytes a", "jpg", "t", "checkout", png_bytes=original)
+    second = store.put(b"jpeg bytes b", "jpg", "t", "checkout", png_bytes=original)
+    assert first == second
+
+
+def test_budget_evicts_least_recently_used_blobs(tmp_path):
+    store = ScreenshotStore(str(tmp_path), budget_bytes=25, key_mode="content")
+    oldest = store.put(b"a" * 10, "png", "t", "one", timestamp=1)
+    store.put(b"b" * 10, "png", "t", "two", timestamp=2)
+    store.put(b"a" * 10, "png", "t", "one", timestamp=3)
+    store.put(b"c" * 10, "png", "t", "three", timestamp=4)
+
+    assert store.disk_usage() <= 25
+    assert sorted(entry["step"] for entry in store.entries()) == ["one", "one", "three"]
+    assert ScreenshotStore(str(tmp_path)).entries()[0]["path"] == oldest
+
+
+def test_entry_trim_releases_blobs_nothing_references(tmp_path):
+    store = ScreenshotStore(str(tmp_path), key_mode="content", max_entries=2)
+    dropped = store.put(b"a" * 10, "png", "t", "one", timestamp=1)
+    shared = store.put(b"b" * 10, "png", "t", "two", timestamp=2)
+    store.put(b"b" * 10, "png", "t", "two", timestamp=3)
+    store.put(b"c" * 10, "png", "t", "three", timestamp=4)
+
+    assert [entry["timestamp"] for entry in store.entries()] == [3, 4]
+    assert not os.path.exists(dropped)
+    assert os.path.exists(shared)
+    assert sorted(blob["refs"] for blob in store.index["blobs"].values()) == [1, 1]
+    assert store.disk_usage() == 20
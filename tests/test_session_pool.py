@@ -0,0 +1,97 @@
+from selenium.common.exceptions import WebDriverException
+
+from utils.session_pool import SessionPool
+
+
+class FakeSwitch:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_handle = handle
+
+
+class FakeDriver:
+    def __init__(self):
+        self.window_handles = ["main", "popup"]
+        self.current_handle = "main"
+        self.switch_to = FakeSwitch(self)
+        self.cookies_cleared = 0
+        self.quit_called = False
+        self.healthy = True
+        self.cdp_commands = []
+
+    def close(self):
+        self.window_handles.remove(self.current_handle)
+
+    def delete_all_cookies(self):
+        self.cookies_cleared += 1
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise WebDriverException("browser crashed")
+        return 1
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append(command)
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_sessions_are_reset_and_reused():
+    pool = SessionPool(FakeDriver, size=1)
+    with pool.session() as first:
+        pass
+    with pool.session() as second:
+        pass
+
+    assert first is second
+    assert first.window_handles == ["main"]
+    assert first.cookies_cleared == 2
+    stats = pool.stats()
+    assert stats["launches"] == 1
+    assert stats["hit_rate"] == 1.0
+
+
+def test_sessions_are_recycled_after_max_uses():
+    pool = SessionPool(FakeDriver, size=1, max_uses=2)
+    drivers = []
+    for _ in range(3):
+        with pool.session() as driver:
+            drivers.append(driver)
+
+    assert drivers[0] is drivers[1]
+    assert drivers[0].quit_called
+    assert drivers[2] is not drivers[0]
+    assert pool.stats()["recycled"] == 1
+
+
+def test_unhealthy_session_is_discarded():
+    pool = SessionPool(FakeDriver, size=1, prelaunch=False)
+    with pool.session() as driver:
+        driver.healthy = False
+    with pool.session() as replacement:
+        pass
+
+    assert driver.quit_called
+    assert replacement is not driver
+    assert pool.stats()["health_failures"] == 1
+    assert pool.stats()["hit_rate"] == 0.0
+
+
+def test_warmed_cache_survives_reset():
+    pool = SessionPool(FakeDriver, size=1, clear_cache=False)
+    with pool.session() as driver:
+        pass
+
+    assert driver.cdp_commands == ["Network.clearBrowserCookies"]
+    assert driver.cookies_cleared == 1
+
+    cold = SessionPool(FakeDriver, size=1)
+    with cold.session() as driver:
+        pass
+    assert driver.cdp_commands == ["Network.clearBrowserCache", "Network.clearBrowserCookies"]
@@ -0,0 +1,126 @@
+import pytest
+from selenium.common.exceptions import InvalidSelectorException, NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+from pages.cart_page import CartPage
+from pages.checkout_page import CheckoutPage
+from pages.locator_registry import LocatorRegistry
+from pages.product_page import ProductPage
+from pages.search_page import HomePage
+from pages.wire_calls import WireCallCounter
+from tests.test_data import login_search_data
+from tests.test_saucelabs import SauceLabsTest
+from utils.simulated_driver import compile_xpath, parse_document
+from utils.storefront import StorefrontApp
+
+PAGE = """<html><head><title>t</title></head><body>
+<div class="customer-account profile"><a id="product-1" href="/a">First <span>(2)</span></a></div>
+<a id="product-2" href="/b" style="display: none">Hidden</a>
+<input type="submit" value="Sign In"><input type="submit" value="Create" disabled>
+<p>Log Out</p><p>Welcome back</p>
+</body></html>"""
+
+
+def select(xpath):
+    return compile_xpath(xpath)(parse_document("http://x/", PAGE).root)
+
+
+@pytest.mark.parametrize("xpath, expected", [
+    ("//a[starts-with(@id, 'product-')]", ["product-1", "product-2"]),
+    ("(//a[starts-with(@id, 'product-')])[2]", ["product-2"]),
+    ("//div[contains(@class, 'dashboard') or contains(@class, 'profile')]//a", ["product-1"]),
+    ("//a[contains(text(), 'First')]", ["product-1"]),
+    ("//a[@id='product-1' and @href='/b']", []),
+])
+def test_xpath_subset_matches_like_a_browser(xpath, expected):
+    assert [node.attrs["id"] for node in select(xpath)] == expected
+
+
+def test_and_binds_tighter_than_or():
+    # SIGN_IN_BUTTON_ALT relies on XPath precedence: (submit and 'Sign') or 'Login' or 'In'
+    assert [node.attrs["value"] for node in select(CheckoutPage.SIGN_IN_BUTTON_ALT)] == ["Sign In"]
+    assert [node.tag for node in select("//p[text()='Log Out']")] == ["p"]
+
+
+def test_unsupported_xpath_is_an_invalid_selector():
+    with pytest.raises(InvalidSelectorException):
+        select("//a[last()]")
+
+
+def test_elements_report_visibility_text_and_go_stale(simulated_driver):
+    simulated_driver.get(f"{simulated_driver.base_url}/cart")
+    cart_link = simulated_driver.find_element(By.XPATH, CartPage.MY_CART_LINK)
+    assert cart_link.text == "My Cart (0)"
+    assert simulated_driver.find_elements(By.XPATH, "//input[@name='id']") == []
+
+    simulated_driver.find_element(By.XPATH, CartPage.CHECKOUT_BUTTON).click()
+    assert simulated_driver.current_url.endswith("/checkout")
+    with pytest.raises(StaleElementReferenceException):
+        cart_link.text
+    with pytest.raises(NoSuchElementException):
+        simulated_driver.find_element(By.XPATH, CartPage.CHECKOUT_BUTTON)
+
+
+def test_full_flow_passes_for_every_data_row(simulated_driver):
+    test = SauceLabsTest(simulated_driver)
+    for row in login_search_data:
+        assert test.search_add_cart_checkout_login_flow(row["email"], row["password"], row["search_term"]) is True
+        # Each row starts as a fresh visitor, as a pooled session does
+        simulated_driver.delete_all_cookies()
+    assert simulated_driver.current_url == f"{test.base_url}/checkout"
+
+
+def test_registration_succeeds_for_a_new_visitor(simulated_driver):
+    assert SauceLabsTest(simulated_driver).perform_registration() is True
+
+
+def test_commands_flow_through_the_wire_call_counter(simulated_driver):
+    home = HomePage(simulated_driver)
+    home.navigate_to_home()
+    home.search_product("noir jacket")
+    assert home.click_first_product_in_search_results() is True
+    report = WireCallCounter.for_driver(simulated_driver).report()
+    assert report["HomePage.send_keys_to_element"]["commands"] == 2
+    WireCallCounter.release(simulated_driver)
+
+
+def test_checkout_falls_back_to_alt_login_locator(simulated_driver):
+    simulated_driver.rewrite("/checkout", 'id="customer_login_link"', 'id="login-link"')
+    checkout = CheckoutPage(simulated_driver)
+    simulated_driver.get(f"{checkout.base_url}/checkout")
+
+    assert checkout.click_login_option() is True
+    assert "/account/login" in simulated_driver.current_url
+    assert LocatorRegistry.shared().order("CheckoutPage", "login_option", [
+        CheckoutPage.LOGIN_OPTION, CheckoutPage.LOGIN_OPTION_ALT,
+    ])[0] == CheckoutPage.LOGIN_OPTION_ALT
+
+
+def test_add_to_cart_reports_false_when_no_button_is_visible(simulated_driver):
+    simulated_driver.rewrite("/products/", '<input type="submit" id="add"', '<input type="submit" id="add" hidden')
+    product = ProductPage(simulated_driver)
+    simulated_driver.get(f"{product.base_url}/products/grey-jacket")
+
+    assert product.add_to_cart() is False
+    assert product.cart_count_before == 0
+
+
+def test_flow_stops_when_checkout_never_loads(simulated_driver):
+    simulated_driver.rewrite("/cart", 'href="/checkout"', 'href="/cart"')
+    test = SauceLabsTest(simulated_driver)
+
+    assert test.search_add_cart_checkout_login_flow("a@b.c", "pw", "striped top") is False
+    assert simulated_driver.current_url.endswith("/cart")
+    assert test.readiness_report()[-1]["step"] == "checkout_loaded"
+    assert test.readiness_report()[-1]["ready"] is False
+
+
+def test_rejected_login_stays_on_the_login_form(simulated_driver):
+    driver = simulated_driver
+    driver.app = StorefrontApp(accounts={"a@b.c": "right"})
+    driver.get(f"{driver.base_url}/account/login?checkout_url=/checkout")
+    checkout = CheckoutPage(driver, driver.base_url)
+    assert checkout.enter_login_credentials("a@b.c", "wrong") is True
+    assert checkout.click_sign_in() is True
+    assert "/account/login" in driver.current_url
+    assert "Incorrect email or password." in driver.page_source
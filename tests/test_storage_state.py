@@ -0,0 +1,87 @@
+import os
+import stat
+
+import pytest
+
+from tests.test_saucelabs import SauceLabsTest
+from utils.simulated_driver import SimulatedDriver
+from utils.storage_state import StorageStateCache
+from utils.storefront import CART_COOKIE, CUSTOMER_COOKIE
+
+BASE_URL = "http://storefront.test"
+
+
+class CookieDriver:
+    def __init__(self, cookies, local_storage=None):
+        self.cookies = cookies
+        self.local_storage = local_storage or {}
+
+    def get_cookies(self):
+        return self.cookies
+
+    def execute_script(self, script, *args):
+        return self.local_storage
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return StorageStateCache(path=str(tmp_path / "state.json"), ttl=60)
+
+
+def test_entries_are_keyed_by_account_and_base_url_and_expire(cache):
+    driver = CookieDriver([{"name": "session", "value": "abc"}], {"theme": "dark"})
+    cache.capture(driver, "a@b.c", BASE_URL, now=1000)
+
+    assert cache.get("a@b.c", BASE_URL, now=1059)["local_storage"] == {"theme": "dark"}
+    assert cache.get("other@b.c", BASE_URL, now=1059) is None
+    assert cache.get("a@b.c", "http://elsewhere.test", now=1059) is None
+    assert cache.get("a@b.c", BASE_URL, now=1060) is None
+    assert cache.report()["expired"] == 1
+
+
+def test_cart_cookies_are_not_cached_and_cookie_expiry_caps_the_ttl(cache):
+    driver = CookieDriver([
+        {"name": "cart", "value": "items"},
+        {"name": "session", "value": "abc", "expiry": 1030},
+    ])
+    entry = cache.capture(driver, "a@b.c", BASE_URL, now=1000)
+
+    assert [cookie["name"] for cookie in entry["cookies"]] == ["session"]
+    assert entry["expires_at"] == 1030
+
+
+def test_cache_file_persists_and_is_private(cache):
+    cache.capture(CookieDriver([{"name": "session", "value": "abc"}]), "a@b.c", BASE_URL)
+
+    assert stat.S_IMODE(os.stat(cache.path).st_mode) == 0o600
+    assert StorageStateCache(path=cache.path).get("a@b.c", BASE_URL)["cookies"][0]["value"] == "abc"
+
+
+def test_second_case_reuses_the_login_without_the_cart(simulated_driver):
+    test = SauceLabsTest(simulated_driver)
+    assert test.search_add_cart_checkout_login_flow("a@b.c", "pw", "grey jacket") is True
+
+    # A fresh browser on the same store: the login is injected, the first case's cart is not
+    second_driver = SimulatedDriver(simulated_driver.app)
+    second = SauceLabsTest(second_driver)
+    assert second.search_add_cart_checkout_login_flow("a@b.c", "pw", "noir jacket") is True
+
+    assert second.storage_state.report()["restored"] == 1
+    assert "login_submitted" not in [timing["step"] for timing in second.readiness_report()]
+    assert sum(second_driver.app.state.cart(second_driver.cookies[CART_COOKIE]).values()) == 1
+
+
+def test_rejected_state_falls_back_to_ui_login(simulated_driver):
+    test = SauceLabsTest(simulated_driver)
+    test.storage_state.entries[StorageStateCache.key("a@b.c", test.base_url)] = {
+        "cookies": [{"name": CUSTOMER_COOKIE, "value": "revoked"}],
+        "local_storage": {},
+        "captured_at": 0,
+        "expires_at": float("inf"),
+    }
+
+    assert test.search_add_cart_checkout_login_flow("a@b.c", "pw", "striped top") is True
+
+    report = test.storage_state.report()
+    assert report["rejected"] == 1 and report["captured"] == 1
+    assert test.storage_state.entries[StorageStateCache.key("a@b.c", test.base_url)]["cookies"][0]["value"] != "revoked"
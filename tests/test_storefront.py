@@ -0,0 +1,118 @@
+import http.cookiejar
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import pytest
+
+from pages.product_page import ProductPage
+from pages.search_page import HomePage
+from utils.benchmark import compare
+from utils.storefront import StorefrontServer
+
+
+@pytest.fixture
+def storefront():
+    with StorefrontServer() as server:
+        yield server
+
+
+def opener():
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+
+def fetch(client, url, form=None):
+    data = urllib.parse.urlencode(form).encode() if form is not None else None
+    with client.open(url, data=data) as response:
+        return response.geturl(), response.read().decode()
+
+
+def test_home_page_serves_search_cart_and_signup_contract(storefront):
+    _, body = fetch(opener(), storefront.base_url)
+    assert 'id="search-field"' in body
+    assert 'class="toggle-drawer cart"' in body
+    assert 'id="cart-target-desktop"><span>(0)</span>' in body
+    assert ">Sign up</a>" in body
+
+
+def test_search_returns_product_links(storefront):
+    url, body = fetch(opener(), f"{storefront.base_url}/search?q=grey+jacket")
+    assert "search" in url
+    assert 'id="product-1" href="/products/grey-jacket"' in body
+    assert "noir-jacket" not in body
+
+
+def test_add_to_cart_is_kept_per_session(storefront):
+    client = opener()
+    _, product = fetch(client, f"{storefront.base_url}/products/striped-top")
+    assert 'id="feature-image"' in product and 'id="add"' in product
+
+    url, cart = fetch(client, f"{storefront.base_url}/cart/add", {"id": "39003"})
+    assert url.endswith("/cart")
+    assert '<a class="checkout" href="/checkout">' in cart
+    assert "<span>(1)</span>" in cart
+    # A different visitor has their own empty cart
+    assert "<span>(0)</span>" in fetch(opener(), f"{storefront.base_url}/cart")[1]
+
+
+def test_login_from_checkout_returns_to_checkout(storefront):
+    client = opener()
+    _, checkout = fetch(client, f"{storefront.base_url}/checkout")
+    assert 'id="customer_login_link" href="/account/login?checkout_url=/checkout"' in checkout
+
+    _, form = fetch(client, f"{storefront.base_url}/account/login?checkout_url=/checkout")
+    assert 'id="customer_email"' in form and 'id="customer_password"' in form and 'value="Sign In"' in form
+
+    url, body = fetch(
+        client,
+        f"{storefront.base_url}/account/login",
+        {"customer[email]": "a@b.c", "customer[password]": "secret", "checkout_url": "/checkout"},
+    )
+    assert url.endswith("/checkout")
+    assert 'class="customer-account"' in body
+
+
+def test_configured_accounts_reject_wrong_password():
+    with StorefrontServer(accounts={"a@b.c": "secret"}) as server:
+        url, body = fetch(
+            opener(), f"{server.base_url}/account/login", {"customer[email]": "a@b.c", "customer[password]": "wrong"}
+        )
+    assert "/account/login" in url
+    assert "Incorrect email or password." in body
+
+
+def test_registration_lands_on_account_with_log_out(storefront):
+    client = opener()
+    _, form = fetch(client, f"{storefront.base_url}/account/register")
+    assert 'value="Create"' in form and 'id="first_name"' in form
+    url, body = fetch(client, f"{storefront.base_url}/account", {"customer[email]": "n@b.c", "customer[password]": "pw"})
+    assert "register" not in url
+    assert ">Log Out</a>" in body
+
+
+def test_latency_is_added_to_every_response():
+    with StorefrontServer(latency=0.2) as server:
+        start = time.monotonic()
+        fetch(opener(), server.base_url)
+    assert time.monotonic() - start >= 0.2
+
+
+def test_unknown_paths_are_404(storefront):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetch(opener(), f"{storefront.base_url}/nope")
+    assert error.value.code == 404
+
+
+def test_page_objects_use_the_injected_base_url(monkeypatch):
+    monkeypatch.delenv("BASE_URL", raising=False)
+    assert HomePage(object(), "http://127.0.0.1:8000/").base_url == "http://127.0.0.1:8000"
+    assert ProductPage(object()).base_url == "https://sauce-demo.myshopify.com"
+    monkeypatch.setenv("BASE_URL", "http://localhost:9000")
+    assert ProductPage(object()).base_url == "http://localhost:9000"
+
+
+def test_compare_flags_steps_slower_than_tolerance():
+    baseline = {"steps": {"fast": {"p50": 1.0}, "slow": {"p50": 1.0}}}
+    results = {"steps": {"fast": {"p50": 1.1}, "slow": {"p50": 1.5}, "new": {"p50": 9.0}}}
+    assert compare(results, baseline, tolerance=0.25) == [("slow", 1.0, 1.5, 1.5)]
@@ -0,0 +1,100 @@
+from pages.checkout_page import CheckoutPage
+from pages.search_page import HomePage
+from pages.timeouts import TimeoutModel
+from utils.simulated_driver import SIMULATED_ORIGIN
+
+
+def test_ceiling_follows_p99_within_floor_and_cap_after_cold_start(tmp_path):
+    model = TimeoutModel(path=str(tmp_path / "timeouts.json"), safety_factor=3, floor=2, cap=30, min_samples=20)
+    key = "HomePage.click|//a"
+
+    for _ in range(19):
+        model.record(key, 1.0)
+    assert model.timeout(key, legacy=10) == 10
+    assert model.explain(key) == "cold start: 19 of 20 samples, legacy 10s"
+
+    model.record(key, 1.5)
+    assert model.timeout(key) == 4.5
+    assert model.explain(key) == "p99 1.50s over 20 samples x 3 = 4.50s"
+
+    fast, slow = "HomePage.visible|//input", "CartPage.click|//button"
+    for _ in range(20):
+        model.record(fast, 0.3)
+        model.record(slow, 12.0)
+    assert model.timeout(fast) == 2 and "raised to the 2s floor" in model.explain(fast)
+    assert model.timeout(slow) == 30 and "capped at 30s" in model.explain(slow)
+    report = model.report()["steps"]
+    assert report[fast]["mode"] == "floor" and report[fast]["p99"] == 0.3
+    assert report[key]["reason"] in model.format_report()
+
+    disabled = TimeoutModel(path=model.path, adaptive=False)
+    assert disabled.timeout(key, legacy=10) == 10 and "off" in disabled.explain(key)
+
+
+def test_workers_add_their_samples_to_the_store(tmp_path):
+    path = str(tmp_path / "timeouts.json")
+    first, second = TimeoutModel(path=path, window=3), TimeoutModel(path=path, window=3)
+    first.record("HomePage.click|//a", 0.5)
+    first.record_timeout("HomePage.click|//a")
+    second.record("HomePage.click|//a", 0.7)
+    second.record("HomePage.click|//a", 0.9)
+    first.save()
+    second.save()
+
+    reloaded = TimeoutModel(path=path, window=3)
+    # The window keeps the newest samples only
+    assert reloaded.samples("HomePage.click|//a") == [0.5, 0.7, 0.9]
+    reloaded.record("HomePage.click|//a", 0.4)
+    assert reloaded.samples("HomePage.click|//a") == [0.7, 0.9, 0.4]
+    assert reloaded.stats["HomePage.click|//a"]["timeouts"] == 1
+
+
+def test_page_waits_use_learned_ceilings_and_fall_back_to_legacy_ones(simulated_driver):
+    model = TimeoutModel.shared()
+    home = HomePage(simulated_driver, SIMULATED_ORIGIN)
+    deadlines = []
+    execute_async_script = simulated_driver.execute_async_script
+
+    def recording(script, *args):
+        deadlines.append(args[-3] if len(args) > 3 else args[1])
+        return execute_async_script(script, *args)
+
+    simulated_driver.execute_async_script = recording
+    home.navigate_to_home()
+    key = f"HomePage.click|{HomePage.SEARCH_RESULT}"
+    for _ in range(model.min_samples):
+        model.record(key, 0.9)
+
+    # No search ran, so there are no results: the miss costs the learned ceiling, not the old 10s
+    assert home.click_first_product_in_search_results() is False
+    assert deadlines[-1] == 2700
+    assert model.report()["steps"][key]["timeouts"] == 1
+
+    home.search_product("grey jacket")
+    assert home.click_first_product_in_search_results() is True
+    assert model.samples(key)[-1] < 0.9
+
+    # The account probe has no history yet, so it keeps the 5s it always had
+    checkout = CheckoutPage(simulated_driver, SIMULATED_ORIGIN)
+    assert checkout.verify_login_success() is False
+    assert deadlines[-1] == 5000
+    assert model.explain(f"CheckoutPage.account_element|{CheckoutPage.ACCOUNT_ELEMENT}") == (
+        "cold start: 0 of 20 samples, legacy 5s")
+
+
+def test_timeouts_at_a_tight_ceiling_widen_it_again(tmp_path):
+    model = TimeoutModel(path=str(tmp_path / "timeouts.json"), safety_factor=3, floor=2, cap=30, min_samples=20)
+    key = "HomePage.click|//a"
+    for _ in range(20):
+        model.record(key, 0.3)
+    assert model.timeout(key) == 2
+
+    # The store got slower: every wait now runs into the ceiling, which counts as a sample at least that long
+    ceilings = []
+    for _ in range(3):
+        model.record_timeout(key)
+        ceilings.append(model.timeout(key))
+
+    assert ceilings == [6, 18, 30]
+    assert model.explain(key) == "p99 18.00s over 23 samples x 3 = 54.00s, capped at 30s"
+    assert model.report()["steps"][key]["timeouts"] == 3
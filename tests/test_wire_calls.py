@@ -0,0 +1,54 @@
+import pytest
+
+from pages.base_page import BasePage
+from pages.wire_calls import WireCallCounter
+
+pytestmark = pytest.mark.usefixtures("isolated_state")
+
+
+class CommandDriver:
+    """Routes every call through execute like Selenium's remote WebDriver does."""
+
+    def __init__(self, status="done"):
+        self.status = status
+        self.commands = []
+
+    def execute(self, driver_command, params=None):
+        self.commands.append(driver_command)
+        return {"value": None}
+
+    def set_script_timeout(self, seconds):
+        self.execute("setTimeouts", {"script": seconds})
+
+    def execute_async_script(self, script, *args):
+        self.execute("executeAsyncScript", {"script": script, "args": args})
+        return [self.status, object()]
+
+
+class CartLikePage(BasePage):
+    pass
+
+
+def test_click_is_a_single_exchange_after_script_timeout_is_set():
+    driver = CommandDriver()
+    page = CartLikePage(driver)
+
+    page.click_element("//a[@class='checkout']")
+    page.click_element("//a[@class='checkout']")
+
+    report = page.wire_calls.report()["CartLikePage.click_element"]
+    assert report["calls"] == 2
+    assert report["by_command"] == {"setTimeouts": 1, "executeAsyncScript": 2}
+    WireCallCounter.release(driver)
+
+
+def test_counter_does_not_double_wrap_a_reused_driver():
+    driver = CommandDriver()
+    first = WireCallCounter(driver)
+    second = WireCallCounter(driver)
+
+    with second.action("step"):
+        driver.execute("getTitle")
+
+    assert first.report() == {}
+    assert second.report()["step"]["commands"] == 1
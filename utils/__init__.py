@@ -0,0 +1,7 @@
+"""
+Utilities module initialization file.
+
+This module contains the test-harness infrastructure shared by the flows and page objects,
+such as browser session management, kept separate from the page objects themselves so that
+the Page Object Model classes stay focused on describing the application.
+"""
@@ -0,0 +1,486 @@
+"""
+A compact, streaming allure results writer and a one-pass merge of worker results.
+
+allure-pytest's file logger writes one JSON file per result, container and
+attachment, and every failed result carries pytest's full long traceback:
+the whole body of every function on the stack. With ALLURE_STREAM=1 the
+results directory gets a StreamingAllureLogger instead, which
+
+    - cuts traces down to the failing frames: the signature and the few lines
+      leading up to the failing line of at most MAX_FRAMES frames
+    - appends results, containers and text attachments to one gzip stream per
+      process (<worker>-stream.jsonl.gz), flushed after every record, so a crashed
+      run keeps everything written before the crash
+    - still writes binary attachments (screenshots) as files, since they are compressed already
+
+The allure CLI reads plain result files, so streams are expanded before a
+report is generated. merge_results() does that while merging the worker
+directories of utils.parallel_runner, touching every entry once. The expanded
+directory has as many files as without streaming and only slightly fewer
+bytes, so report generation is no faster; what streaming buys is small,
+crash-safe worker output.
+
+    python -m utils.allure_stream merge allure-results/worker-0 allure-results/worker-1 --output allure-results
+    python -m utils.allure_stream expand allure-results
+    python -m utils.allure_stream bench --tests 200 --steps 25
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+
+from allure_commons import hookimpl
+
+STREAM_SUFFIX = "-stream.jsonl.gz"
+# Frames kept per traceback: the test function plus the innermost frames
+MAX_FRAMES = 4
+# Source lines kept above the failing line of each frame
+CONTEXT_LINES = 3
+# Attachments that compress well and are stored in the stream
+TEXT_EXTENSIONS = {".txt", ".json", ".csv", ".tsv", ".html", ".htm", ".xml", ".uri", ".log", ".md", ".yaml", ".yml"}
+
+FRAME_SEPARATOR = re.compile(r"^_(?: _)+ *$", re.MULTILINE)
+LOCATION_LINE = re.compile(r"^\S.*:\d+:")
+FUNCTION_LINE = re.compile(r"^\s*(async\s+)?def\s")
+
+
+def enabled(environ=None):
+    environ = os.environ if environ is None else environ
+    return environ.get("ALLURE_STREAM", "").lower() in ("1", "true", "yes")
+
+
+def _truncate_pytest_frame(frame):
+    lines = frame.strip("\n").splitlines()
+    failing = next((index for index, line in enumerate(lines) if line.startswith(">")), None)
+    if failing is None:
+        return "\n".join(lines[-(CONTEXT_LINES + 2):])
+    kept = []
+    signature = next((index for index in range(failing) if FUNCTION_LINE.match(lines[index])), None)
+    first = max(0, failing - CONTEXT_LINES)
+    if signature is not None and signature < first:
+        kept.append(lines[signature])
+        if signature + 1 < first:
+            kept.append("    ...")
+    elif signature is not None:
+        first = signature
+    kept.extend(lines[first:failing + 1])
+    # The E lines of the exception and the file:line location follow the failing line
+    kept.extend(line for line in lines[failing + 1:] if line.startswith("E ") or LOCATION_LINE.match(line))
+    return "\n".join(kept)
+
+
+def truncate_trace(trace, max_frames=MAX_FRAMES):
+    """
+    Cut a traceback down to its failing frames.
+
+    Handles pytest's long representation (frames separated by "_ _ _" lines) and
+    traceback.format_tb output (what allure records for failed steps).
+
+    Returns:
+        str: The outermost frame and the innermost max_frames - 1 frames, each
+            reduced to its signature and the lines leading up to the failing line
+    """
+    if not trace:
+        return trace
+    if trace.lstrip().startswith('File "'):
+        frames = re.split(r'(?m)^(?=  File ")', trace)
+        frames = [frame for frame in frames if frame.strip()]
+        truncate = str.rstrip
+        separator = "\n"
+    else:
+        frames = FRAME_SEPARATOR.split(trace)
+        frames = [frame for frame in frames if frame.strip()]
+        truncate = _truncate_pytest_frame
+        separator = "\n" + "_ " * 20 + "\n\n"
+    omitted = len(frames) - max_frames
+    if omitted > 0:
+        frames = frames[:1] + frames[-(max_frames - 1):]
+    parts = [truncate(frame) for frame in frames]
+    if omitted > 0:
+        parts.insert(1, f"... {omitted} frame{'s' if omitted != 1 else ''} omitted ...")
+    return separator.join(parts)
+
+
+def compact(data):
+    """Truncate every statusDetails trace in a result or container dict, in place."""
+    details = data.get("statusDetails")
+    if details and details.get("trace"):
+        details["trace"] = truncate_trace(details["trace"])
+    for key in ("steps", "befores", "afters"):
+        for child in data.get(key, ()):
+            compact(child)
+    return data
+
+
+def _is_text(file_name):
+    return os.path.splitext(file_name)[1].lower() in TEXT_EXTENSIONS
+
+
+class StreamingAllureLogger:
+    """
+    allure_commons plugin writing compacted records to one gzip stream.
+
+    Takes the place of allure-pytest's AllureFileLogger for the same directory.
+    """
+
+    def __init__(self, report_dir, stream_name=None):
+        """
+        Args:
+            report_dir (str): The --alluredir directory
+            stream_name (str): Prefix of the stream file; defaults to WORKER_ID, else the process id
+        """
+        self.report_dir = os.path.abspath(report_dir)
+        os.makedirs(self.report_dir, exist_ok=True)
+        stream_name = stream_name or os.environ.get("WORKER_ID") or f"process-{os.getpid()}"
+        self.path = os.path.join(self.report_dir, f"{stream_name}-{uuid.uuid4().hex[:8]}{STREAM_SUFFIX}")
+        self._stream = gzip.open(self.path, "ab", compresslevel=6)
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        with self._lock:
+            self._stream.write(line)
+            # A sync flush keeps the compression window but makes every record readable right away
+            self._stream.flush()
+            self.records += 1
+
+    def _report_item(self, kind, item):
+        from attr import asdict
+
+        data = asdict(item, filter=lambda _, v: v or v is False)
+        file_name = item.file_pattern.format(prefix=uuid.uuid4())
+        self._write({"kind": kind, "file": file_name, "data": compact(data)})
+
+    @hookimpl
+    def report_result(self, result):
+        self._report_item("result", result)
+
+    @hookimpl
+    def report_container(self, container):
+        self._report_item("container", container)
+
+    @hookimpl
+    def report_globals(self, globals_item):
+        self._report_item("globals", globals_item)
+
+    @hookimpl
+    def report_attached_data(self, body, file_name):
+        if _is_text(file_name):
+            text = body if isinstance(body, str) else body.decode("utf-8", "replace")
+            self._write({"kind": "attachment", "file": file_name, "text": text})
+            return
+        with open(os.path.join(self.report_dir, file_name), "wb") as f:
+            f.write(body.encode("utf-8") if isinstance(body, str) else body)
+
+    @hookimpl
+    def report_attached_file(self, source, file_name):
+        if _is_text(file_name):
+            with open(source, "rb") as f:
+                self.report_attached_data(f.read(), file_name)
+            return
+        shutil.copy2(source, os.path.join(self.report_dir, file_name))
+
+    def close(self):
+        with self._lock:
+            if not self._stream.closed:
+                self._stream.close()
+
+
+def _decompress_prefix(data):
+    # Decompress piece by piece and keep whatever came out before the stream broke off;
+    # the piece it breaks in is retried a byte at a time so its intact records survive
+    decompressor = zlib.decompressobj(wbits=31)
+    output = []
+    for offset in range(0, len(data), 4096):
+        checkpoint = decompressor.copy()
+        try:
+            output.append(decompressor.decompress(data[offset:offset + 4096]))
+        except zlib.error:
+            decompressor = checkpoint
+            for index in range(offset, min(offset + 4096, len(data))):
+                try:
+                    output.append(decompressor.decompress(data[index:index + 1]))
+                except zlib.error:
+                    break
+            break
+        if decompressor.eof:
+            break
+    return b"".join(output)
+
+
+def _lines(member):
+    # The text after the last newline is a record the writer never finished
+    for line in member.split(b"\n")[:-1]:
+        if line:
+            yield json.loads(line)
+
+
+def read_stream(path):
+    """
+    Yield the records of a stream, including one whose writer never closed it.
+
+    Concatenated streams (several gzip members, as merge_results(expand_streams=False)
+    writes them) are read one member after another. A member cut off by a crash
+    yields the records flushed before the crash and reading resumes at the next member.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    position = 0
+    while position < len(data):
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            member = decompressor.decompress(data[position:])
+        except zlib.error:
+            yield from _lines(_decompress_prefix(data[position:]))
+            position = data.find(b"\x1f\x8b\x08", position + 1)
+            if position < 0:
+                return
+            continue
+        yield from _lines(member)
+        if not decompressor.eof:
+            return
+        position = len(data) - len(decompressor.unused_data)
+
+
+def _expand_stream(path, target_dir, seen):
+    records = 0
+    for record in read_stream(path):
+        if record["file"] in seen:
+            continue
+        seen.add(record["file"])
+        destination = os.path.join(target_dir, record["file"])
+        if record["kind"] == "attachment":
+            content = record["text"]
+        else:
+            # One write per file; json.dump would issue a write per encoded chunk
+            content = json.dumps(record["data"], ensure_ascii=False)
+        with open(destination, "w", encoding="utf-8") as f:
+            f.write(content)
+        records += 1
+    return records
+
+
+def expand(results_dir):
+    """
+    Replace the streams in a results directory by the plain files the allure CLI reads.
+
+    Returns:
+        int: Number of files written
+    """
+    seen = set(os.listdir(results_dir))
+    written = 0
+    for name in sorted(seen):
+        if name.endswith(STREAM_SUFFIX):
+            path = os.path.join(results_dir, name)
+            written += _expand_stream(path, results_dir, seen)
+            os.remove(path)
+    return written
+
+
+def merge_results(sources, target_dir, expand_streams=True):
+    """
+    Merge worker result directories into target_dir in a single pass over their entries.
+
+    Plain files are renamed into place (result, container and attachment names are
+    UUIDs; for shared files such as environment.properties the first copy wins).
+    Streams are expanded into plain files, or with expand_streams=False appended
+    to one combined stream byte for byte, which gzip reads as consecutive members.
+
+    Returns:
+        dict: Counts of files moved, stream records written, streams read and duplicates skipped
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    seen = set(os.listdir(target_dir))
+    stats = {"files": 0, "records": 0, "streams": 0, "duplicates": 0}
+    combined = None
+    try:
+        for source in sources:
+            if not os.path.isdir(source):
+                continue
+            with os.scandir(source) as entries:
+                for entry in entries:
+                    if entry.name.endswith(STREAM_SUFFIX):
+                        stats["streams"] += 1
+                        if expand_streams:
+                            stats["records"] += _expand_stream(entry.path, target_dir, seen)
+                            continue
+                        if combined is None:
+                            combined = open(os.path.join(target_dir, f"merged-{uuid.uuid4().hex[:8]}{STREAM_SUFFIX}"), "ab")
+                        with open(entry.path, "rb") as stream:
+                            shutil.copyfileobj(stream, combined)
+                        continue
+                    if entry.name in seen:
+                        stats["duplicates"] += 1
+                        continue
+                    seen.add(entry.name)
+                    shutil.move(entry.path, os.path.join(target_dir, entry.name))
+                    stats["files"] += 1
+            shutil.rmtree(source, ignore_errors=True)
+    finally:
+        if combined is not None:
+            combined.close()
+    return stats
+
+
+def directory_size(path):
+    """Return (bytes, files) of the regular files under path."""
+    total = files = 0
+    for directory, _, names in os.walk(path):
+        for name in names:
+            total += os.path.getsize(os.path.join(directory, name))
+            files += 1
+    return total, files
+
+
+def load_results(results_dir):
+    """
+    Read a results directory the way a report generator does: parse every result and
+    container and read every attachment once.
+
+    Stands in for `allure generate` where the CLI is not installed.
+
+    Returns:
+        int: Number of files read
+    """
+    count = 0
+    for entry in os.scandir(results_dir):
+        if not entry.is_file():
+            continue
+        with open(entry.path, "rb") as f:
+            data = f.read()
+        if entry.name.endswith(("-result.json", "-container.json")):
+            json.loads(data)
+        count += 1
+    return count
+
+
+def _synthetic_trace(depth):
+    frames = []
+    for level in range(depth):
+        body = "\n".join(f"        value_{line} = compute({line})" for line in range(30))
+        frames.append(
+            f"self = <tests.test_flow.TestFlow object at 0x10{level}>\n\n"
+            f"    def step_{level}(self):\n        \"\"\"Step {level}\"\"\"\n{body}\n"
+            f">       step_{level + 1}()\n\ntests/test_flow.py:{100 + level}: "
+        )
+    frames[-1] = frames[-1].replace(f">       step_{depth}()", ">       assert False\nE       AssertionError")
+    return "\n_ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _\n\n".join(frames)
+
+
+def _emit(logger, tests, steps):
+    from allure_commons.model2 import Attachment, Status, StatusDetails, TestResult, TestResultContainer, TestStepResult
+
+    for index in range(tests):
+        failed = index % 5 == 0
+        result = TestResult(uuid=str(uuid.uuid4()), name=f"test_flow[{index}]", fullName=f"tests.test_flow#{index}",
+                            status=Status.FAILED if failed else Status.PASSED, start=0, stop=1)
+        for step in range(steps):
+            log_name = f"{uuid.uuid4()}-attachment.txt"
+            logger.report_attached_data(f"Step {step} of row {index}: waited 0.12s\n" * 20, log_name)
+            result.steps.append(TestStepResult(
+                name=f"Click on element with xpath: //a[@id='product-{step}']", status=Status.PASSED, start=0, stop=1,
+                attachments=[Attachment(name="log", source=log_name, type="text/plain")]))
+        if failed:
+            result.statusDetails = StatusDetails(message="AssertionError", trace=_synthetic_trace(6))
+        logger.report_result(result)
+        logger.report_container(TestResultContainer(uuid=str(uuid.uuid4()), children=[result.uuid]))
+
+
+def benchmark(tests=200, steps=25, workers=4):
+    """
+    Write the same synthetic run with allure's file logger and with the streaming logger.
+
+    Each layout is written by workers directories, merged, read back with
+    load_results(), and handed to `allure generate` when the CLI is installed.
+
+    Returns:
+        dict: Per layout, write/merge/load/generate seconds and the merged directory's size and file count
+    """
+    from allure_commons.logger import AllureFileLogger
+
+    results = {}
+    for layout in ("files", "stream"):
+        root = tempfile.mkdtemp(prefix=f"allure-{layout}-")
+        try:
+            worker_dirs = [os.path.join(root, f"worker-{index}") for index in range(workers)]
+            start = time.monotonic()
+            for worker_dir in worker_dirs:
+                logger = AllureFileLogger(worker_dir) if layout == "files" else StreamingAllureLogger(worker_dir)
+                _emit(logger, tests // workers, steps)
+                if layout == "stream":
+                    logger.close()
+            written = time.monotonic() - start
+            stream_bytes = sum(directory_size(worker_dir)[0] for worker_dir in worker_dirs)
+            target = os.path.join(root, "merged")
+            start = time.monotonic()
+            merge_results(worker_dirs, target)
+            merged = time.monotonic() - start
+            size, files = directory_size(target)
+            start = time.monotonic()
+            load_results(target)
+            loaded = time.monotonic() - start
+            generate = None
+            if shutil.which("allure"):
+                start = time.monotonic()
+                subprocess.run(["allure", "generate", target, "-o", os.path.join(root, "report"), "--clean"],
+                               capture_output=True, check=False)
+                generate = round(time.monotonic() - start, 3)
+            results[layout] = {
+                "write_seconds": round(written, 3),
+                "written_bytes": stream_bytes,
+                "merge_seconds": round(merged, 3),
+                "merged_bytes": size,
+                "merged_files": files,
+                "load_seconds": round(loaded, 3),
+                "generate_seconds": generate,
+            }
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge, expand and benchmark streamed allure results")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge = commands.add_parser("merge", help="merge worker result directories")
+    merge.add_argument("sources", nargs="+")
+    merge.add_argument("--output", default="allure-results")
+    merge.add_argument("--keep-streams", action="store_true", help="concatenate streams instead of expanding them")
+    expand_parser = commands.add_parser("expand", help="turn the streams in a directory into plain allure files")
+    expand_parser.add_argument("directory")
+    bench = commands.add_parser("bench", help="compare allure's file logger with the streaming logger")
+    bench.add_argument("--tests", type=int, default=200)
+    bench.add_argument("--steps", type=int, default=25)
+    bench.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    if args.command == "merge":
+        stats = merge_results(args.sources, args.output, expand_streams=not args.keep_streams)
+        print(f"Merged {stats['files']} files and {stats['records']} streamed records from "
+              f"{len(args.sources)} directories into {args.output}")
+    elif args.command == "expand":
+        print(f"Expanded {expand(args.directory)} files in {args.directory}")
+    else:
+        results = benchmark(args.tests, args.steps, args.workers)
+        print(f"{'layout':<8}{'write(s)':>10}{'written KB':>12}{'merge(s)':>10}{'merged KB':>11}{'files':>8}"
+              f"{'load(s)':>9}{'generate(s)':>13}")
+        for layout, stats in results.items():
+            generate = f"{stats['generate_seconds']:>13.2f}" if stats["generate_seconds"] is not None else f"{'-':>13}"
+            print(f"{layout:<8}{stats['write_seconds']:>10.2f}{stats['written_bytes'] // 1024:>12}"
+                  f"{stats['merge_seconds']:>10.2f}{stats['merged_bytes'] // 1024:>11}{stats['merged_files']:>8}"
+                  f"{stats['load_seconds']:>9.2f}{generate}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
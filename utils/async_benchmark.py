@@ -0,0 +1,193 @@
+"""
+Flows per minute of the synchronous harness against the asyncio backend.
+
+    python -m utils.async_benchmark --flows 40 --concurrency 20 --latency 0.02
+    python -m utils.async_benchmark --backend chrome --flows 20 --concurrency 10 --preset fast
+
+The simulated backend runs both paths on SimulatedDriver sessions sharing one
+stand-in storefront, with every command delayed by --latency to stand in for
+the browser round trip: the synchronous path blocks on it flow after flow, as
+main.py does, while the async path overlaps it across --concurrency sessions.
+The chrome backend drives real browsers against a local StorefrontServer; the
+synchronous path reuses one browser, the async path opens --concurrency
+sessions on a single chromedriver. With --contexts those sessions are browser
+contexts of one shared Chrome rather than one Chrome each.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from tests.test_data import login_search_data
+from utils.async_webdriver import ChromeDriverService, simulated_session
+from utils.simulated_driver import SIMULATED_ORIGIN, SimulatedDriver
+from utils.storage_state import StorageStateCache
+from utils.storefront import StorefrontApp, StorefrontServer
+
+BACKENDS = ("simulated", "chrome")
+
+
+async def run_flows_concurrently(rows, concurrency, new_session, base_url=None):
+    """
+    Run every row through AsyncSauceLabsTest on at most concurrency sessions.
+
+    Each session takes the next unclaimed row until none are left, clearing its
+    cookies between rows so every row starts as a fresh visitor.
+
+    Args:
+        rows (list): Dicts with email, password and search_term
+        concurrency (int): Sessions open at once
+        new_session: Coroutine function returning a new AsyncWebDriver
+        base_url (str): Storefront the page objects drive
+
+    Returns:
+        list: (search_term, success) per row, in completion order
+    """
+    # Imported here so the flow module's page objects load only when a flow runs
+    from tests.test_saucelabs import AsyncSauceLabsTest
+
+    pending = list(reversed(rows))
+    results = []
+
+    async def session():
+        test = AsyncSauceLabsTest(await new_session(), base_url)
+        try:
+            while pending:
+                row = pending.pop()
+                try:
+                    success = await test.search_add_cart_checkout_login_flow(
+                        row["email"], row["password"], row["search_term"]
+                    )
+                except Exception as e:
+                    print(f"Flow for {row['search_term']} raised: {e}")
+                    success = False
+                results.append((row["search_term"], success))
+                await test.driver.delete_all_cookies()
+        finally:
+            await test.close_driver()
+
+    await asyncio.gather(*(session() for _ in range(max(1, min(concurrency, len(rows))))))
+    return results
+
+
+def _summary(results, seconds, threads):
+    return {
+        "flows": len(results),
+        "failures": sum(not success for _, success in results),
+        "seconds": round(seconds, 3),
+        "flows_per_minute": round(len(results) / seconds * 60, 1) if seconds else None,
+        "threads": threads,
+    }
+
+
+def run_sync(rows, backend, latency=0.0, preset=None):
+    """Run the rows one after another through SauceLabsTest; returns the summary dict."""
+    from tests.test_saucelabs import SauceLabsTest, create_driver
+
+    # A zero TTL keeps cached logins out of the comparison, as the async flow never restores one
+    with tempfile.TemporaryDirectory() as state_dir:
+        storage_state = StorageStateCache(path=os.path.join(state_dir, "storage_state.json"), ttl=0)
+        results = []
+        if backend == "chrome":
+            with StorefrontServer() as server:
+                start = time.monotonic()
+                test = SauceLabsTest(create_driver(preset, server.base_url), server.base_url, storage_state)
+                try:
+                    for row in rows:
+                        results.append((row["search_term"], test.search_add_cart_checkout_login_flow(
+                            row["email"], row["password"], row["search_term"])))
+                        test.driver.delete_all_cookies()
+                finally:
+                    test.close_driver()
+                return _summary(results, time.monotonic() - start, threading.active_count())
+
+        app = StorefrontApp()
+        start = time.monotonic()
+        for row in rows:
+            test = SauceLabsTest(SimulatedDriver(app, latency=latency), SIMULATED_ORIGIN, storage_state)
+            results.append((row["search_term"], test.search_add_cart_checkout_login_flow(
+                row["email"], row["password"], row["search_term"])))
+            test.attach_reports()
+        return _summary(results, time.monotonic() - start, threading.active_count())
+
+
+async def run_async(rows, backend, concurrency, latency=0.0, preset=None, contexts=False):
+    """Run the rows concurrently through AsyncSauceLabsTest; returns the summary dict."""
+    if backend == "chrome":
+        with StorefrontServer() as server:
+            async with ChromeDriverService() as service:
+                new_session = service.new_context_session if contexts else service.new_session
+                start = time.monotonic()
+                results = await run_flows_concurrently(rows, concurrency, lambda: new_session(preset), server.base_url)
+                return _summary(results, time.monotonic() - start, threading.active_count())
+
+    app = StorefrontApp()
+
+    async def new_session():
+        return simulated_session(app, latency)
+
+    start = time.monotonic()
+    results = await run_flows_concurrently(rows, concurrency, new_session, SIMULATED_ORIGIN)
+    return _summary(results, time.monotonic() - start, threading.active_count())
+
+
+def run_comparison(flows=20, concurrency=10, latency=0.02, backend="simulated", preset=None, rows=None, contexts=False):
+    """
+    Time the same rows through both paths.
+
+    Returns:
+        dict: meta, a summary per path, and the async/sync flows-per-minute ratio
+    """
+    rows = rows or login_search_data
+    rows = [rows[index % len(rows)] for index in range(flows)]
+    sync = run_sync(rows, backend, latency, preset)
+    concurrent = asyncio.run(run_async(rows, backend, concurrency, latency, preset, contexts))
+    return {
+        "meta": {"backend": backend, "flows": flows, "concurrency": concurrency, "latency": latency, "preset": preset,
+                 "contexts": contexts},
+        "sync": sync,
+        "async": concurrent,
+        "speedup": round(concurrent["flows_per_minute"] / sync["flows_per_minute"], 2)
+        if sync["flows_per_minute"] else None,
+    }
+
+
+def format_comparison(results):
+    lines = [f"{'path':<8}{'flows':>7}{'failed':>8}{'seconds':>10}{'flows/min':>11}{'threads':>9}"]
+    for path in ("sync", "async"):
+        stats = results[path]
+        lines.append(
+            f"{path:<8}{stats['flows']:>7}{stats['failures']:>8}{stats['seconds']:>10.2f}"
+            f"{stats['flows_per_minute']:>11.1f}{stats['threads']:>9}"
+        )
+    lines.append(f"async/sync throughput: {results['speedup']}x at concurrency {results['meta']['concurrency']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare flows per minute of the sync and asyncio backends")
+    parser.add_argument("--flows", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per simulated command")
+    parser.add_argument("--backend", choices=BACKENDS, default="simulated")
+    parser.add_argument("--preset", help="driver preset for the chrome backend; defaults to DRIVER_PRESET")
+    parser.add_argument("--contexts", action="store_true",
+                        help="chrome backend: run the async sessions as contexts of one shared browser")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run_comparison(args.flows, args.concurrency, args.latency, args.backend, args.preset,
+                             contexts=args.contexts)
+    print(format_comparison(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if results["sync"]["failures"] or results["async"]["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
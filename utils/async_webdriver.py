@@ -0,0 +1,459 @@
+"""
+An asyncio WebDriver client, so dozens of flows share one interpreter and one thread.
+
+Commands use Selenium's command names and its W3C endpoint table
+(RemoteConnection), so an AsyncWebDriver speaks exactly what the synchronous
+driver does; DevTools commands go through chromedriver's goog/cdp endpoint.
+Only the transport differs:
+
+    HttpTransport       keep-alive HTTP/1.1 on asyncio streams to a chromedriver
+    SimulatedTransport  a SimulatedDriver behind a per-command latency, for tests and benchmarks
+
+One ChromeDriverService hosts every session of a run; each session is a
+separate Chrome process, but none of them needs a Python thread:
+
+    async with ChromeDriverService() as service:
+        drivers = await asyncio.gather(*(service.new_session("fast") for _ in range(20)))
+
+new_context_session() instead gives each session its own browser context and
+tab in one shared Chrome (see utils.browser_contexts).
+"""
+import asyncio
+import base64
+import json
+import os
+import socket
+import time
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.remote_connection import remote_commands
+
+from utils.browser_contexts import attach_options, target_window
+from utils.driver_factory import DEFAULT_PRESET, build_options, resolve_driver_path
+from utils.simulated_driver import SimulatedDriver, SimulatedElement
+
+# How a W3C remote end identifies an element in JSON
+ELEMENT_KEY = "element-6066-11e4-a52f-4f58310c1e18"
+
+COMMANDS = dict(remote_commands)
+COMMANDS["executeCdpCommand"] = ("POST", "/session/$sessionId/goog/cdp/execute")
+COMMANDS["isElementDisplayed"] = ("GET", "/session/$sessionId/element/$id/displayed")
+
+SERVICE_START_TIMEOUT = 20
+
+
+class AsyncElement:
+    """A remote element reference; every call is one awaited command."""
+
+    def __init__(self, driver, element_id):
+        self._driver = driver
+        self.id = element_id
+
+    async def _execute(self, command, params=None):
+        return await self._driver.execute(command, dict(params or {}, id=self.id))
+
+    async def text(self):
+        return await self._execute(Command.GET_ELEMENT_TEXT)
+
+    async def get_attribute(self, name):
+        return await self._execute(Command.GET_ELEMENT_ATTRIBUTE, {"name": name})
+
+    async def is_displayed(self):
+        return await self._execute("isElementDisplayed")
+
+    async def is_enabled(self):
+        return await self._execute(Command.IS_ELEMENT_ENABLED)
+
+    async def click(self):
+        await self._execute(Command.CLICK_ELEMENT)
+
+    async def clear(self):
+        await self._execute(Command.CLEAR_ELEMENT)
+
+    async def send_keys(self, *value):
+        text = "".join(str(v) for v in value)
+        await self._execute(Command.SEND_KEYS_TO_ELEMENT, {"text": text, "value": list(text)})
+
+    async def find_elements(self, by=By.XPATH, value=None):
+        return await self._execute(Command.FIND_CHILD_ELEMENTS, {"using": by, "value": value})
+
+    def __eq__(self, other):
+        return isinstance(other, AsyncElement) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"<AsyncElement {self.id}>"
+
+
+class AsyncWebDriver:
+    """
+    The subset of the WebDriver API the page objects use, as coroutines.
+
+    Properties of the synchronous driver (current_url, title) are methods here,
+    since reading them is a round trip.
+    """
+
+    def __init__(self, transport, capabilities=None, on_quit=None):
+        """
+        Args:
+            transport: Object with async execute(command, params) -> JSON value
+            capabilities (dict): What the remote end reported when the session was created
+            on_quit: Coroutine function run after the session ends, e.g. to dispose its browser context
+        """
+        self.transport = transport
+        self.capabilities = capabilities or {}
+        self.on_quit = on_quit
+        self.commands = 0
+
+    async def execute(self, command, params=None):
+        self.commands += 1
+        value = await self.transport.execute(command, self._unwrap(params or {}))
+        return self._wrap(value)
+
+    def _wrap(self, value):
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return AsyncElement(self, value[ELEMENT_KEY])
+            return {key: self._wrap(item) for key, item in value.items()}
+        return value
+
+    def _unwrap(self, value):
+        if isinstance(value, AsyncElement):
+            return {ELEMENT_KEY: value.id}
+        if isinstance(value, list):
+            return [self._unwrap(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._unwrap(item) for key, item in value.items()}
+        return value
+
+    async def get(self, url):
+        await self.execute(Command.GET, {"url": url})
+
+    async def get_current_url(self):
+        return await self.execute(Command.GET_CURRENT_URL)
+
+    async def get_title(self):
+        return await self.execute(Command.GET_TITLE)
+
+    async def find_element(self, by=By.XPATH, value=None):
+        return await self.execute(Command.FIND_ELEMENT, {"using": by, "value": value})
+
+    async def find_elements(self, by=By.XPATH, value=None):
+        return await self.execute(Command.FIND_ELEMENTS, {"using": by, "value": value})
+
+    async def execute_script(self, script, *args):
+        return await self.execute(Command.W3C_EXECUTE_SCRIPT, {"script": script, "args": list(args)})
+
+    async def execute_async_script(self, script, *args):
+        return await self.execute(Command.W3C_EXECUTE_SCRIPT_ASYNC, {"script": script, "args": list(args)})
+
+    async def set_script_timeout(self, time_to_wait):
+        await self.execute(Command.SET_TIMEOUTS, {"script": int(time_to_wait * 1000)})
+
+    async def get_screenshot_as_png(self):
+        value = await self.execute(Command.SCREENSHOT)
+        # Remote ends send base64; the simulated one hands over the bytes
+        return base64.b64decode(value) if isinstance(value, str) else value
+
+    async def get_cookies(self):
+        return await self.execute(Command.GET_ALL_COOKIES)
+
+    async def add_cookie(self, cookie):
+        await self.execute(Command.ADD_COOKIE, {"cookie": cookie})
+
+    async def delete_all_cookies(self):
+        await self.execute(Command.DELETE_ALL_COOKIES)
+
+    async def execute_cdp_cmd(self, cmd, cmd_args):
+        return await self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})
+
+    async def quit(self):
+        try:
+            await self.execute(Command.QUIT)
+        finally:
+            if self.on_quit is not None:
+                await self.on_quit()
+            close = getattr(self.transport, "close", None)
+            if close is not None:
+                await close()
+
+
+class HttpTransport:
+    """
+    Sends commands to a WebDriver server over keep-alive HTTP/1.1 connections.
+
+    A session's commands are sequential, so each transport normally holds one
+    connection; a connection the server dropped while idle is replaced once.
+    """
+
+    def __init__(self, server_url, session_id=None):
+        parsed = urlparse(server_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.prefix = parsed.path.rstrip("/")
+        self.session_id = session_id
+        self._idle = []
+        self._error_handler = ErrorHandler()
+
+    async def execute(self, command, params):
+        method, path = COMMANDS[command]
+        path = path.replace("$sessionId", self.session_id or "")
+        if "$" in path:
+            for key, value in params.items():
+                path = path.replace(f"${key}", str(value))
+        body = {key: value for key, value in params.items() if key not in ("sessionId", "id")}
+        status, payload = await self.request(method, path, body if method == "POST" else None)
+        if status >= 400:
+            self._error_handler.check_response({"status": status, "value": payload.decode("utf-8", "replace")})
+            raise WebDriverException(f"{command} failed with HTTP {status}")
+        return json.loads(payload)["value"] if payload else None
+
+    async def request(self, method, path, body=None):
+        """
+        Send one request and read the whole response.
+
+        Returns:
+            tuple: (HTTP status, body bytes)
+        """
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = (
+            f"{method} {self.prefix}{path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Accept: application/json\r\n"
+            "Content-Type: application/json;charset=UTF-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("latin-1")
+        reused = bool(self._idle)
+        reader, writer = self._idle.pop() if reused else await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(head + data)
+            await writer.drain()
+            status, headers, payload = await self._read_response(reader)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            writer.close()
+            if not reused:
+                raise
+            return await self.request(method, path, body)
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return status, payload
+
+    @staticmethod
+    async def _read_response(reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before the response")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            return status, headers, b"".join(chunks)
+        return status, headers, await reader.readexactly(int(headers.get("content-length", 0)))
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+class SimulatedTransport:
+    """
+    Routes commands to a SimulatedDriver in W3C wire form, after an optional delay.
+
+    The delay stands in for the browser round trip, so concurrent flows overlap
+    their waiting exactly as they would against real browsers.
+    """
+
+    def __init__(self, driver=None, latency=0.0):
+        """
+        Args:
+            driver (SimulatedDriver): Driver to route to; defaults to a fresh one
+            latency (float): Seconds every command waits before it runs
+        """
+        self.driver = driver if driver is not None else SimulatedDriver()
+        self.latency = latency
+
+    async def execute(self, command, params):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._encode(self.driver.execute(command, self._decode(params))["value"])
+
+    def _decode(self, value):
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return SimulatedElement(self.driver, value[ELEMENT_KEY])
+            return {key: self._decode(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        return value
+
+    def _encode(self, value):
+        if isinstance(value, SimulatedElement):
+            return {ELEMENT_KEY: value.id}
+        if isinstance(value, list):
+            return [self._encode(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._encode(item) for key, item in value.items()}
+        return value
+
+
+def simulated_session(app=None, latency=0.0):
+    """Return an AsyncWebDriver over a fresh SimulatedDriver sharing app with other sessions."""
+    return AsyncWebDriver(SimulatedTransport(SimulatedDriver(app), latency))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ChromeDriverService:
+    """
+    One chromedriver process hosting many concurrent sessions.
+
+    Use as an async context manager; sessions still open on exit are quit.
+    """
+
+    def __init__(self, driver_path=None, environ=None, port=None):
+        """
+        Args:
+            driver_path (str): chromedriver binary; defaults to CHROMEDRIVER_PATH, then PATH
+            environ (dict): Environment for presets and binary lookup; defaults to os.environ
+            port (int): Port to listen on; a free one by default
+        """
+        self.environ = os.environ if environ is None else environ
+        self.driver_path = driver_path or resolve_driver_path(self.environ)
+        self.port = port or _free_port()
+        self.process = None
+        self.sessions = []
+        self.host = None
+        self._host_lock = asyncio.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self):
+        if self.driver_path is None:
+            raise WebDriverException("chromedriver not found; set CHROMEDRIVER_PATH or put it on PATH")
+        self.process = await asyncio.create_subprocess_exec(
+            self.driver_path, f"--port={self.port}",
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        )
+        status_transport = HttpTransport(self.url)
+        deadline = time.monotonic() + SERVICE_START_TIMEOUT
+        try:
+            while True:
+                try:
+                    status, payload = await status_transport.request("GET", "/status")
+                    if status == 200 and json.loads(payload)["value"].get("ready"):
+                        return self
+                except (OSError, ValueError, KeyError):
+                    pass
+                if self.process.returncode is not None or time.monotonic() > deadline:
+                    raise WebDriverException(f"chromedriver did not start on port {self.port}")
+                await asyncio.sleep(0.1)
+        finally:
+            await status_transport.close()
+
+    def _preset(self, preset):
+        return preset or self.environ.get("DRIVER_PRESET", DEFAULT_PRESET)
+
+    async def new_session(self, preset=None):
+        """
+        Start a browser with a utils.driver_factory preset.
+
+        Args:
+            preset (str): Name in PRESETS; defaults to DRIVER_PRESET or "faithful"
+
+        Returns:
+            AsyncWebDriver: The new session
+        """
+        return await self._open(build_options(self._preset(preset), self.environ).to_capabilities())
+
+    async def new_context_session(self, preset=None):
+        """
+        Open a browser context and tab in the service's shared browser, and a session driving that tab.
+
+        The first call launches the shared browser. Quitting the returned driver
+        disposes its context; the browser keeps running for the other sessions.
+
+        Args:
+            preset (str): Name in PRESETS; defaults to DRIVER_PRESET or "faithful"
+
+        Returns:
+            AsyncWebDriver: The new session
+        """
+        preset = self._preset(preset)
+        async with self._host_lock:
+            if self.host is None:
+                self.host = await self._open(build_options(preset, self.environ).to_capabilities(), track=False)
+        host = self.host
+        context_id = (await host.execute_cdp_cmd("Target.createBrowserContext", {}))["browserContextId"]
+        target = dict(target_window(build_options(preset, self.environ)), url="about:blank", browserContextId=context_id)
+        target_id = (await host.execute_cdp_cmd("Target.createTarget", target))["targetId"]
+
+        async def dispose():
+            await host.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+
+        debugger_address = host.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        driver = await self._open(attach_options(preset, debugger_address, self.environ).to_capabilities())
+        driver.on_quit = dispose
+        await driver.execute(Command.SWITCH_TO_WINDOW, {"handle": target_id})
+        return driver
+
+    async def _open(self, capabilities, track=True):
+        transport = HttpTransport(self.url)
+        response = await transport.execute(
+            Command.NEW_SESSION, {"capabilities": {"firstMatch": [{}], "alwaysMatch": capabilities}}
+        )
+        transport.session_id = response["sessionId"]
+        driver = AsyncWebDriver(transport, response.get("capabilities"))
+        if track:
+            self.sessions.append(driver)
+        return driver
+
+    async def stop(self):
+        await asyncio.gather(*(driver.quit() for driver in self.sessions), return_exceptions=True)
+        self.sessions = []
+        if self.host is not None:
+            try:
+                await self.host.quit()
+            except WebDriverException:
+                pass
+            self.host = None
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
+            await self.process.wait()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
@@ -0,0 +1,177 @@
+"""
+End-to-end benchmark of the harness against the offline stand-in storefront.
+
+Times the full search_add_cart_checkout_login_flow (or, with --flow seeded, the
+HTTP-seeded seeded_checkout_login_flow) and every instrumented page action, then
+compares the medians against a stored baseline per flow:
+
+    python -m utils.benchmark --runs 5 --latency 0.05
+    python -m utils.benchmark --runs 5 --update-baseline
+    python -m utils.benchmark --flow seeded --runs 5
+    python -m utils.benchmark --preset fast --runs 5
+
+A step regresses when its p50 exceeds the baseline p50 by more than the
+tolerance; the command then exits non-zero so CI can gate on it.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from pages.instrumentation import StepMetrics, percentile
+from tests.test_data import login_search_data
+from utils.storefront import StorefrontServer
+
+BASELINE_DIR = "benchmarks"
+FLOWS = {
+    "full": "search_add_cart_checkout_login_flow",
+    "seeded": "seeded_checkout_login_flow",
+}
+DEFAULT_TOLERANCE = 0.25
+
+
+def baseline_path(flow="full", preset=None):
+    suffix = f"-{preset}" if preset else ""
+    return os.path.join(BASELINE_DIR, f"baseline-{flow}{suffix}.json")
+
+
+def run_benchmark(runs=3, latency=0.0, rows=None, driver_factory=None, flow="full", preset=None):
+    """
+    Run the flow repeatedly against a fresh stand-in storefront.
+
+    Args:
+        runs (int): Passes over the data rows
+        latency (float): Seconds the stand-in adds to every response
+        rows (list): Dicts with email, password and search_term; defaults to the test data
+        driver_factory (callable): Returns a new WebDriver; defaults to create_driver
+        flow (str): Key of FLOWS naming the SauceLabsTest flow to time
+        preset (str): utils.driver_factory preset used by the default driver factory
+
+    Returns:
+        dict: Per-label p50/p95 wall seconds and sample count, plus run metadata
+    """
+    # Imported here so the module can be loaded without selenium for baseline comparisons
+    from tests.test_saucelabs import SauceLabsTest, create_driver
+
+    rows = rows or login_search_data
+    metrics = StepMetrics.shared()
+    flow_times = []
+    failures = 0
+    with StorefrontServer(latency=latency) as server:
+        driver = driver_factory() if driver_factory else create_driver(preset, server.base_url)
+        test = SauceLabsTest(driver, base_url=server.base_url)
+        run_flow = getattr(test, FLOWS[flow])
+        try:
+            for _ in range(runs):
+                for row in rows:
+                    start = time.monotonic()
+                    success = run_flow(row["email"], row["password"], row["search_term"])
+                    flow_times.append(time.monotonic() - start)
+                    failures += not success
+                    # Start every row logged out with an empty cart, like a fresh visitor
+                    test.driver.delete_all_cookies()
+        finally:
+            test.close_driver()
+
+    steps = {f"SauceLabsTest.{FLOWS[flow]}": flow_times}
+    for label, samples in metrics.samples.items():
+        steps[label] = [sample["wall"] for sample in samples]
+    return {
+        "meta": {
+            "flow": flow,
+            "preset": preset,
+            "runs": runs,
+            "rows": len(rows),
+            "latency": latency,
+            "failures": failures,
+            "python": platform.python_version(),
+        },
+        "steps": {
+            label: {
+                "count": len(values),
+                "p50": round(percentile(values, 0.5), 4),
+                "p95": round(percentile(values, 0.95), 4),
+            }
+            for label, values in steps.items()
+            if values
+        },
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare benchmark results against a baseline.
+
+    Returns:
+        list: (label, baseline_p50, current_p50, ratio) for every step slower than the tolerance allows
+    """
+    regressions = []
+    for label, current in results["steps"].items():
+        reference = baseline.get("steps", {}).get(label)
+        if not reference or reference["p50"] <= 0:
+            continue
+        ratio = current["p50"] / reference["p50"]
+        if ratio > 1 + tolerance:
+            regressions.append((label, reference["p50"], current["p50"], round(ratio, 2)))
+    return regressions
+
+
+def format_results(results, baseline=None):
+    baseline_steps = (baseline or {}).get("steps", {})
+    lines = [f"{'step':<60}{'n':>5}{'p50(s)':>10}{'p95(s)':>10}{'base p50':>10}"]
+    for label, stats in sorted(results["steps"].items(), key=lambda item: item[1]["p50"], reverse=True):
+        reference = baseline_steps.get(label, {}).get("p50")
+        reference = f"{reference:>10.3f}" if reference is not None else f"{'-':>10}"
+        lines.append(f"{label:<60}{stats['count']:>5}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{reference}")
+    return "\n".join(lines)
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Baseline written to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the flow against the stand-in storefront")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the stand-in adds to every response")
+    parser.add_argument("--flow", choices=sorted(FLOWS), default="full")
+    parser.add_argument("--preset", help="driver preset (fast, faithful, debug); defaults to DRIVER_PRESET")
+    parser.add_argument("--baseline", help="baseline file; defaults to benchmarks/baseline-<flow>[-<preset>].json")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    args.baseline = args.baseline or baseline_path(args.flow, args.preset)
+    results = run_benchmark(args.runs, args.latency, flow=args.flow, preset=args.preset)
+    baseline = load_baseline(args.baseline)
+    print(format_results(results, baseline))
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        return 0
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    if baseline.get("meta", {}).get("latency") != args.latency:
+        print("Warning: baseline was recorded with a different stand-in latency")
+    regressions = compare(results, baseline, args.tolerance)
+    for label, reference, current, ratio in regressions:
+        print(f"REGRESSION {label}: p50 {reference:.3f}s -> {current:.3f}s ({ratio}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
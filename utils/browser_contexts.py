@@ -0,0 +1,313 @@
+"""
+Many isolated flows in one Chrome: a browser context and a tab per flow.
+
+A browser context is Chrome's incognito-like partition. Its cookies, storage,
+HTTP cache and service workers are its own, so flows sharing a browser never
+see each other's login or cart. The host session launches Chrome through
+DriverFactory once; every flow then gets
+
+    1. a context (Target.createBrowserContext) with one tab in it (Target.createTarget)
+    2. its own WebDriver session on the host's chromedriver, attached to the running
+       browser (debuggerAddress) and switched to that tab
+
+so page objects, request blocking and readiness waits work unchanged. Closing
+the flow's driver detaches its session and disposes the context, which closes
+the tab and drops everything the flow stored. Contexts are off the record, so
+they do not read the host's profile template cache.
+
+Enable with BROWSER_CONTEXTS=1: the session_pool fixture then leases a fresh
+context per row instead of resetting a whole browser. Compare the memory of one
+Chrome per flow against one context per flow with:
+
+    python -m utils.browser_contexts --flows 8 --preset fast
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+from utils.driver_factory import DEFAULT_PRESET, DriverFactory, build_options
+from utils.session_pool import SessionPool
+
+
+def enabled(environ=None):
+    environ = os.environ if environ is None else environ
+    return environ.get("BROWSER_CONTEXTS", "").lower() in ("1", "true", "yes")
+
+
+def attach_options(preset, debugger_address, environ=None):
+    """
+    Options for a session that attaches to the host browser instead of launching one.
+
+    Launch arguments and prefs belong to the host; the per-session page load
+    strategy and the performance log request blocking reads carry over.
+    """
+    base = build_options(preset, environ)
+    options = Options()
+    options.page_load_strategy = base.page_load_strategy
+    options.debugger_address = debugger_address
+    if "goog:loggingPrefs" in base.capabilities:
+        options.set_capability("goog:loggingPrefs", base.capabilities["goog:loggingPrefs"])
+    if "perfLoggingPrefs" in base.experimental_options:
+        options.add_experimental_option("perfLoggingPrefs", base.experimental_options["perfLoggingPrefs"])
+    return options
+
+
+def target_window(options):
+    """Target.createTarget size parameters matching the preset's --window-size, if it sets one."""
+    for argument in options.arguments:
+        match = re.match(r"--window-size=(\d+),(\d+)$", argument)
+        if match:
+            return {"width": int(match.group(1)), "height": int(match.group(2))}
+    return {}
+
+
+def _memory(pid):
+    # Proportional set size splits shared pages between the processes sharing them, so the
+    # renderers of one browser are not each charged for the whole of Chrome's shared code
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def process_tree_memory(pid):
+    """
+    Memory in bytes of a process and all its descendants (chromedriver, Chrome and its renderers).
+
+    Returns:
+        int: Summed proportional set size, or None where /proc is not available
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += _memory(current)
+        pending.extend(children.get(current, []))
+    return total
+
+
+def _attach_chrome(server_url, options):
+    return webdriver.Remote(command_executor=server_url, options=options)
+
+
+def _driver_pid(driver):
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    return getattr(process, "pid", None)
+
+
+class BrowserContext:
+    """One flow's context in the host browser, its tab and the session driving it."""
+
+    def __init__(self, context_id, target_id, driver):
+        self.context_id = context_id
+        self.target_id = target_id
+        self.driver = driver
+
+
+class BrowserContextHost:
+    """
+    Owns the shared browser and the lifecycle of every context opened in it.
+
+    Thread-safe: parallel leases each get their own context and session.
+    """
+
+    _shared = None
+
+    def __init__(self, launch=None, attach=_attach_chrome, preset=None, base_url=None, environ=None):
+        """
+        Args:
+            launch (callable): Takes (preset, base_url) and returns the host WebDriver; defaults to DriverFactory
+            attach (callable): Takes (chromedriver URL, Options) and returns a session attached to the host browser
+            preset (str): utils.driver_factory preset; defaults to DRIVER_PRESET or "faithful"
+            base_url (str): Storefront the flows browse, passed on to the launch
+            environ (dict): Environment to read the preset and request-blocking profile from
+        """
+        self.environ = os.environ if environ is None else environ
+        self.launch = launch or (lambda preset, base_url: DriverFactory.shared().create(preset, base_url))
+        self.attach = attach
+        self.preset = preset or self.environ.get("DRIVER_PRESET", DEFAULT_PRESET)
+        self.base_url = base_url
+        self.driver = None
+        self.contexts = {}
+        self.opened = 0
+        self.peak = 0
+        self.last_sample = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def start(self):
+        """Launch the host browser if it is not running yet."""
+        if self.driver is None:
+            self.driver = self.launch(self.preset, self.base_url)
+        return self.driver
+
+    def new_context(self):
+        """
+        Open a context with one tab in the shared browser.
+
+        Returns:
+            WebDriver: A session driving only that tab; hand it to close_context() when done
+        """
+        with self._lock:
+            host = self.start()
+            context_id = host.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+            target = dict(target_window(build_options(self.preset, self.environ)),
+                          url="about:blank", browserContextId=context_id)
+            target_id = host.execute_cdp_cmd("Target.createTarget", target)["targetId"]
+            debugger_address = host.capabilities["goog:chromeOptions"]["debuggerAddress"]
+            server_url = host.service.service_url
+        try:
+            driver = self.attach(server_url, attach_options(self.preset, debugger_address, self.environ))
+            # chromedriver names windows by their DevTools target id
+            driver.switch_to.window(target_id)
+        except Exception:
+            self._dispose(context_id)
+            raise
+        with self._lock:
+            self.contexts[id(driver)] = BrowserContext(context_id, target_id, driver)
+            self.opened += 1
+            self.peak = max(self.peak, len(self.contexts))
+        return driver
+
+    def close_context(self, driver):
+        """Detach a session from new_context() and dispose its context; the browser keeps running."""
+        with self._lock:
+            context = self.contexts.pop(id(driver), None)
+            open_contexts = len(self.contexts) + 1
+        pid = _driver_pid(self.driver) if self.driver is not None else None
+        if context is not None and pid is not None:
+            # Sampled while the finished flow's tab is still open, so the figure reflects a full load
+            self.last_sample = (process_tree_memory(pid), open_contexts)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+        if context is not None:
+            self._dispose(context.context_id)
+
+    def _dispose(self, context_id):
+        try:
+            self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+        except WebDriverException as e:
+            print(f"Failed to dispose browser context {context_id}: {e}")
+
+    def session_pool(self):
+        """A SessionPool leasing a fresh context per lease and disposing it on release."""
+        return SessionPool(self.new_context, size=1, max_uses=1, prelaunch=False, dispose=self.close_context)
+
+    def report(self):
+        """
+        Summarize context usage and the browser's memory.
+
+        Returns:
+            dict: Contexts opened, peak and currently open, and the last memory sample in MB
+        """
+        memory, open_contexts = self.last_sample or (None, 0)
+        return {
+            "contexts_opened": self.opened,
+            "peak_open": self.peak,
+            "open": len(self.contexts),
+            "browser_mb": round(memory / 2 ** 20, 1) if memory else None,
+            "mb_per_open_context": round(memory / 2 ** 20 / open_contexts, 1) if memory and open_contexts else None,
+        }
+
+    def close(self):
+        """Dispose every open context and quit the host browser."""
+        for context in list(self.contexts.values()):
+            self.close_context(context.driver)
+        report = self.report()
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass
+            self.driver = None
+        print(f"Browser contexts: {report['contexts_opened']} opened, peak {report['peak_open']} in one browser")
+        return report
+
+
+def compare_memory(flows, preset=None, path="/search?q=jacket"):
+    """
+    Load the same page in flows separate browsers, then in flows contexts of one browser.
+
+    Returns:
+        dict: Total and per-flow MB for each layout
+    """
+    from utils.storefront import StorefrontServer
+
+    def megabytes(total):
+        return round(total / 2 ** 20, 1) if total is not None else None
+
+    factory = DriverFactory.shared()
+    with StorefrontServer() as server:
+        drivers = []
+        try:
+            for _ in range(flows):
+                drivers.append(factory.create(preset, server.base_url))
+                drivers[-1].get(f"{server.base_url}{path}")
+            separate = sum(process_tree_memory(_driver_pid(driver)) or 0 for driver in drivers)
+        finally:
+            for driver in drivers:
+                driver.quit()
+
+        host = BrowserContextHost(preset=preset, base_url=server.base_url)
+        try:
+            for _ in range(flows):
+                host.new_context().get(f"{server.base_url}{path}")
+            shared = process_tree_memory(_driver_pid(host.driver)) or 0
+        finally:
+            host.close()
+    return {
+        "flows": flows,
+        "separate_browsers_mb": megabytes(separate),
+        "contexts_mb": megabytes(shared),
+        "separate_browsers_mb_per_flow": megabytes(separate / flows),
+        "contexts_mb_per_flow": megabytes(shared / flows),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare browser memory: one Chrome per flow vs one context per flow")
+    parser.add_argument("--flows", type=int, default=8)
+    parser.add_argument("--preset", help="driver preset; defaults to DRIVER_PRESET")
+    args = parser.parse_args(argv)
+    results = compare_memory(args.flows, args.preset)
+    print(f"{'layout':<20}{'total MB':>10}{'MB/flow':>10}")
+    print(f"{'browser per flow':<20}{results['separate_browsers_mb']:>10}{results['separate_browsers_mb_per_flow']:>10}")
+    print(f"{'context per flow':<20}{results['contexts_mb']:>10}{results['contexts_mb_per_flow']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
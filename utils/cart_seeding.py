@@ -0,0 +1,143 @@
+"""
+HTTP-level cart seeding, so checkout-focused cases skip the search/product UI.
+
+A CartSeeder talks to the storefront's Shopify AJAX endpoints over a pooled
+HTTP connection:
+
+    GET  /search/suggest.json?q=...   resolve a search term to a product handle
+    GET  /products/<handle>.js        resolve the handle to its first variant id
+    POST /cart/add.js                 add the variant to the seeder's cart
+    GET  /cart.js                     read the cart back
+
+then hands the cart cookie to the browser and opens /cart directly. The same
+endpoints exist on the real Shopify store and on utils.storefront.
+"""
+import json
+import threading
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+import urllib3
+
+from utils.storage_state import LANDING_PATH
+
+
+class CartSeedingError(Exception):
+    """The storefront refused or did not understand a seeding request."""
+
+
+class CartSeeder:
+    """
+    Fills a cart through the storefront's cart endpoints and transfers it to a browser.
+
+    Every seeder shares one urllib3 PoolManager, so repeated cases reuse
+    keep-alive connections instead of paying a TCP/TLS handshake per request.
+    Each seeder keeps its own cookies, i.e. its own cart.
+    """
+
+    POOL_SIZE = 8
+    TIMEOUT = 10
+
+    _pool = None
+    _pool_lock = threading.Lock()
+
+    def __init__(self, base_url, pool=None, timeout=TIMEOUT):
+        """
+        Args:
+            base_url (str): Storefront root URL
+            pool (urllib3.PoolManager): Connection pool; defaults to the shared one
+            timeout (float): Seconds allowed per request
+        """
+        self.base_url = base_url.rstrip("/")
+        self.http = pool if pool is not None else self.shared_pool()
+        self.timeout = timeout
+        self.cookies = {}
+        self.requests = 0
+
+    @classmethod
+    def shared_pool(cls):
+        """Return the connection pool shared by every seeder in this process."""
+        with cls._pool_lock:
+            if cls._pool is None:
+                cls._pool = urllib3.PoolManager(num_pools=4, maxsize=cls.POOL_SIZE, retries=urllib3.Retry(2, redirect=0))
+            return cls._pool
+
+    def _request(self, method, path, fields=None):
+        headers = {"Accept": "application/json"}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        body = None
+        if fields is not None:
+            body = urlencode(fields)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        response = self.http.request(
+            method, f"{self.base_url}{path}", body=body, headers=headers, redirect=False, timeout=self.timeout
+        )
+        self.requests += 1
+        for header in response.headers.getlist("Set-Cookie"):
+            for name, morsel in SimpleCookie(header).items():
+                if morsel["max-age"] == "0" or not morsel.value:
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = morsel.value
+        if response.status >= 400:
+            raise CartSeedingError(f"{method} {path} answered {response.status}: {response.data[:200]!r}")
+        try:
+            return json.loads(response.data)
+        except ValueError:
+            raise CartSeedingError(f"{method} {path} did not answer JSON")
+
+    def find_product(self, search_term):
+        """
+        Resolve a search term to the handle of its first product result.
+
+        Raises:
+            CartSeedingError: If the search has no product results
+        """
+        query = urlencode({"q": search_term, "resources[type]": "product", "resources[limit]": 1})
+        products = self._request("GET", f"/search/suggest.json?{query}")["resources"]["results"]["products"]
+        if not products:
+            raise CartSeedingError(f"No product found for '{search_term}'")
+        return products[0]["handle"]
+
+    def variant_id(self, handle):
+        """Return the id of the product's first available variant."""
+        variants = self._request("GET", f"/products/{handle}.js")["variants"]
+        available = [variant for variant in variants if variant.get("available", True)]
+        if not available:
+            raise CartSeedingError(f"Product '{handle}' has no available variant")
+        return available[0]["id"]
+
+    def add(self, handle, quantity=1):
+        """
+        Add a product to this seeder's cart.
+
+        Returns:
+            dict: The line item the store answered with
+        """
+        return self._request("POST", "/cart/add.js", {"id": self.variant_id(handle), "quantity": quantity})
+
+    def add_search_result(self, search_term, quantity=1):
+        """Add the first product a search for the term returns, as the UI flow would."""
+        return self.add(self.find_product(search_term), quantity)
+
+    def cart(self):
+        return self._request("GET", "/cart.js")
+
+    def transfer(self, driver, open_cart=True):
+        """
+        Hand the seeded cart to the browser and optionally open /cart.
+
+        WebDriver only accepts cookies for the loaded origin, so a tiny same-origin
+        page is opened first unless the browser is already on the store.
+
+        Args:
+            driver: WebDriver to receive the cookies
+            open_cart (bool): Navigate to /cart once the cookies are set
+        """
+        if not driver.current_url.startswith(self.base_url):
+            driver.get(f"{self.base_url}{LANDING_PATH}")
+        for name, value in self.cookies.items():
+            driver.add_cookie({"name": name, "value": value, "path": "/"})
+        if open_cart:
+            driver.get(f"{self.base_url}/cart")
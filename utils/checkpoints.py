@@ -0,0 +1,216 @@
+"""
+Named flow stages with a checkpoint after each one, so a retry resumes where the flow failed.
+
+A checkpoint holds what the browser carries from one stage to the next: the
+cookies (login and the cart token), localStorage, the current URL and the
+cart count the header shows. When a stage fails and retries are left, the
+browser is reset to the last good checkpoint and the flow continues with the
+stage that failed instead of starting again at the home page. If the store
+no longer honours the checkpoint, e.g. the cart count does not come back,
+the retry falls back to a full rerun.
+
+FLOW_RETRIES sets how many retries SauceLabsTest allows per flow (default 0).
+"""
+import copy
+import json
+import os
+import time
+
+import allure
+from selenium.common.exceptions import WebDriverException
+
+from pages.product_page import ProductPage
+from pages.readiness import read_count
+from utils.storage_state import CART_COOKIES, LANDING_PATH, READ_LOCAL_STORAGE_SCRIPT, WRITE_LOCAL_STORAGE_SCRIPT
+
+CLEAR_STORAGE_SCRIPT = "window.localStorage.clear(); window.sessionStorage.clear();"
+
+
+def default_retries(environ=None):
+    environ = os.environ if environ is None else environ
+    return int(environ.get("FLOW_RETRIES", "0"))
+
+
+class FlowCheckpoint:
+    """Browser state after a stage succeeded, and how long the flow took to get there."""
+
+    def __init__(self, stage, url, cookies, local_storage, cart_count, context, elapsed):
+        self.stage = stage
+        self.url = url
+        self.cookies = cookies
+        self.local_storage = local_storage
+        self.cart_count = cart_count
+        self.context = context
+        self.elapsed = elapsed
+
+    @classmethod
+    def capture(cls, driver, stage, context, elapsed):
+        """
+        Record the browser's state after stage.
+
+        Args:
+            driver: WebDriver the flow runs on
+            stage (str): Name of the stage that just succeeded
+            context (dict): Values the stages hand each other, copied so later stages cannot change them
+            elapsed (float): Seconds of successful stages up to and including this one
+        """
+        try:
+            local_storage = driver.execute_script(READ_LOCAL_STORAGE_SCRIPT) or {}
+        except WebDriverException:
+            local_storage = {}
+        cart_count = read_count(driver, ProductPage.CART_COUNT)
+        cookies = driver.get_cookies()
+        if cart_count == 0:
+            # Without the token of an empty cart the store starts a fresh one, so a restored
+            # checkpoint never sees items added after it was taken
+            cookies = [cookie for cookie in cookies if cookie["name"] not in CART_COOKIES]
+        return cls(stage, driver.current_url, cookies, local_storage, cart_count, copy.deepcopy(context), elapsed)
+
+    def restore(self, driver, base_url):
+        """
+        Put the browser back into this checkpoint's state.
+
+        Returns:
+            bool: True if the store honoured the restored state
+        """
+        driver.delete_all_cookies()
+        # WebDriver only accepts cookies for the loaded origin
+        driver.get(f"{base_url.rstrip('/')}{LANDING_PATH}")
+        for cookie in self.cookies:
+            driver.add_cookie({k: v for k, v in cookie.items() if k in ("name", "value", "path", "secure", "httpOnly", "expiry")})
+        driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        if self.local_storage:
+            driver.execute_script(WRITE_LOCAL_STORAGE_SCRIPT, self.local_storage)
+        driver.get(self.url)
+        if self.cart_count is not None and read_count(driver, ProductPage.CART_COUNT) != self.cart_count:
+            print(f"Checkpoint '{self.stage}' expected {self.cart_count} items in the cart; the store lost it")
+            return False
+        return True
+
+    def describe(self):
+        return {"stage": self.stage, "url": self.url, "cookies": len(self.cookies),
+                "cart_count": self.cart_count, "elapsed": round(self.elapsed, 3)}
+
+
+class StagedFlow:
+    """
+    Runs named stages in order and retries a failed stage from the last checkpoint.
+
+    A stage is a callable taking the shared context dict and returning True on
+    success; False or an exception fails it. The context carries values from one
+    stage to a later one (e.g. whether a cached login was restored) and is
+    restored along with the browser.
+    """
+
+    def __init__(self, driver, base_url, stages, retries=None, clock=time.monotonic):
+        """
+        Args:
+            driver: WebDriver the stages drive
+            base_url (str): Storefront root URL, used to reach the origin when restoring cookies
+            stages (list): (name, callable) pairs in flow order
+            retries (int): Retries after a failed stage; defaults to FLOW_RETRIES
+            clock (callable): Seconds counter; the default is time.monotonic
+        """
+        self.driver = driver
+        self.base_url = base_url
+        self.stages = list(stages)
+        self.retries = default_retries() if retries is None else retries
+        self.clock = clock
+        self.context = {}
+        self.checkpoints = []
+        self.durations = {}
+        self.attempts = []
+
+    def _run_from(self, index, elapsed):
+        for name, stage in self.stages[index:]:
+            start = self.clock()
+            try:
+                with allure.step(f"Stage: {name}"):
+                    passed = stage(self.context) is True
+            except Exception as e:
+                print(f"Stage '{name}' raised: {e}")
+                passed = False
+            duration = self.clock() - start
+            self.durations.setdefault(name, duration)
+            if not passed:
+                return name
+            elapsed += duration
+            # Capturing costs a few commands per stage, only worth paying when a retry can use it
+            if self.retries:
+                self.checkpoints.append(FlowCheckpoint.capture(self.driver, name, self.context, elapsed))
+        return None
+
+    def _stage_index(self, name):
+        return [stage_name for stage_name, _ in self.stages].index(name)
+
+    def run(self):
+        """
+        Run every stage, retrying failures from the last good checkpoint.
+
+        Returns:
+            bool: True once all stages have succeeded
+        """
+        start = self.clock()
+        failed = self._run_from(0, 0.0)
+        self.attempts.append({"resumed_from": None, "failed_stage": failed, "seconds": round(self.clock() - start, 3)})
+        retries = self.retries
+        while failed is not None and retries > 0:
+            retries -= 1
+            start = self.clock()
+            checkpoint = self.checkpoints[-1] if self.checkpoints else None
+            if checkpoint is not None and not checkpoint.restore(self.driver, self.base_url):
+                checkpoint = None
+            restored = self.clock() - start
+            self.checkpoints = [checkpoint] if checkpoint is not None else []
+            retried = failed
+            if checkpoint is None:
+                self.context = {}
+                print(f"Retrying the flow from the start after '{retried}' failed")
+                failed = self._run_from(0, 0.0)
+            else:
+                self.context = copy.deepcopy(checkpoint.context)
+                print(f"Resuming at '{retried}' from checkpoint '{checkpoint.stage}'")
+                failed = self._run_from(self._stage_index(retried), checkpoint.elapsed)
+            seconds = self.clock() - start
+            self.attempts.append({
+                "resumed_from": checkpoint.stage if checkpoint is not None else None,
+                "retried_stage": retried,
+                "failed_stage": failed,
+                "seconds": round(seconds, 3),
+                "restore_seconds": round(restored, 3),
+                # A full rerun repeats the stages the checkpoint skipped; their first-run time is what resuming saved
+                "full_rerun_estimate": round(seconds - restored + (checkpoint.elapsed if checkpoint else 0.0), 3),
+                "saved_seconds": round(checkpoint.elapsed - restored, 3) if checkpoint else 0.0,
+            })
+        return failed is None
+
+    def report(self):
+        """
+        Summarize the attempts and what resuming saved.
+
+        Returns:
+            dict: Stages, per-attempt timings, first-run stage durations and total seconds saved
+        """
+        return {
+            "stages": [name for name, _ in self.stages],
+            "attempts": list(self.attempts),
+            "stage_seconds": {name: round(seconds, 3) for name, seconds in self.durations.items()},
+            "checkpoints": [checkpoint.describe() for checkpoint in self.checkpoints],
+            "saved_seconds": round(sum(attempt.get("saved_seconds", 0.0) for attempt in self.attempts), 3),
+        }
+
+    def format_report(self):
+        lines = []
+        for attempt in self.attempts[1:]:
+            resumed = f"from checkpoint '{attempt['resumed_from']}'" if attempt["resumed_from"] else "from the start"
+            outcome = f"failed at '{attempt['failed_stage']}'" if attempt["failed_stage"] else "passed"
+            lines.append(
+                f"Retry of '{attempt['retried_stage']}' {resumed} {outcome} in {attempt['seconds']:.2f}s; "
+                f"a full rerun would take ~{attempt['full_rerun_estimate']:.2f}s (saved {attempt['saved_seconds']:.2f}s)"
+            )
+        return "\n".join(lines)
+
+    def attach_report(self, name="flow_checkpoints"):
+        if len(self.attempts) < 2:
+            return
+        allure.attach(json.dumps(self.report(), indent=2), name=name, attachment_type=allure.attachment_type.JSON)
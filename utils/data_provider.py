@@ -0,0 +1,209 @@
+"""
+Streaming, shard-aware test data for the data-driven flows.
+
+Rows are read lazily from a CSV or JSONL file, a generator function or an
+in-memory list, so memory stays flat however large the dataset is. Every row
+keeps its position in the source stream, which makes sharding, sampling and
+resuming deterministic:
+
+    DATA_SOURCE=soak.jsonl DATA_SAMPLE=0.1 DATA_SEED=7 python -m pytest tests/test_saucelabs_flow.py
+    DATA_SOURCE=tests.test_data:search_combinations DATA_OFFSET=12000 python main.py
+
+DATA_SOURCE accepts a .csv/.jsonl path or "module:function" naming a generator.
+"""
+import csv
+import functools
+import hashlib
+import importlib
+import itertools
+import json
+import os
+
+
+def _read_rows(rows):
+    return iter(rows)
+
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def _read_jsonl(path):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _call_generator(spec, args, kwargs):
+    module_name, _, function_name = spec.partition(":")
+    return iter(getattr(importlib.import_module(module_name), function_name)(*args, **kwargs))
+
+
+def _sampled(seed, position, rate):
+    # Hash rather than a seeded RNG, so whether a row is sampled never depends on which rows came before it
+    digest = hashlib.blake2b(f"{seed}:{position}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64 < rate
+
+
+class DataProvider:
+    """
+    A lazily evaluated, re-iterable stream of data rows.
+
+    shard, sample, skip and limit return narrowed copies, so one provider
+    describes the whole dataset and each worker or test item holds only the
+    recipe for its part. Providers pickle cheaply and can be sent to spawned
+    worker processes.
+    """
+
+    def __init__(self, read, name="rows", length=None):
+        """
+        Args:
+            read (callable): Returns a fresh iterator over the source rows; must be picklable for worker processes
+            name (str): Description of the source for logs and test ids
+            length (int): Number of source rows, when known without reading them
+        """
+        self.read = read
+        self.name = name
+        self.length = length
+        self.shard_index = 0
+        self.shard_count = 1
+        self.sample_rate = 1.0
+        self.seed = 0
+        self.offset = 0
+        self.max_rows = None
+
+    # Sources
+
+    @classmethod
+    def from_rows(cls, rows, name="rows"):
+        return cls(functools.partial(_read_rows, rows), name, length=len(rows))
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(functools.partial(_read_csv, path), os.path.basename(path))
+
+    @classmethod
+    def from_jsonl(cls, path):
+        return cls(functools.partial(_read_jsonl, path), os.path.basename(path))
+
+    @classmethod
+    def from_generator(cls, spec, *args, **kwargs):
+        """
+        Stream rows from a generator function named "module:function".
+
+        The function is imported and called on every iteration, so it is never
+        exhausted and worker processes import it themselves.
+        """
+        return cls(functools.partial(_call_generator, spec, args, kwargs), spec)
+
+    @classmethod
+    def from_source(cls, source):
+        """Build a provider from a .csv/.jsonl path or a "module:function" generator spec."""
+        if source.endswith(".csv"):
+            return cls.from_csv(source)
+        if source.endswith(".jsonl"):
+            return cls.from_jsonl(source)
+        if ":" in source:
+            return cls.from_generator(source)
+        raise ValueError(f"Unsupported data source '{source}': expected a .csv or .jsonl file or module:function")
+
+    @classmethod
+    def from_environment(cls, default_rows, environ=None):
+        """
+        Build the provider configured through DATA_SOURCE, DATA_SAMPLE, DATA_SEED, DATA_OFFSET and DATA_LIMIT.
+
+        Worker sharding is left to the caller, which knows whether it shards rows or test items.
+
+        Args:
+            default_rows (list): Rows used when DATA_SOURCE is not set
+        """
+        environ = os.environ if environ is None else environ
+        source = environ.get("DATA_SOURCE")
+        provider = cls.from_source(source) if source else cls.from_rows(default_rows, "login_search_data")
+        if "DATA_SAMPLE" in environ:
+            provider = provider.sample(float(environ["DATA_SAMPLE"]), int(environ.get("DATA_SEED", 0)))
+        if "DATA_OFFSET" in environ:
+            provider = provider.skip(int(environ["DATA_OFFSET"]))
+        if "DATA_LIMIT" in environ:
+            provider = provider.limit(int(environ["DATA_LIMIT"]))
+        return provider
+
+    # Narrowing
+
+    def _copy(self, **changes):
+        provider = DataProvider.__new__(DataProvider)
+        provider.__dict__.update(self.__dict__, **changes)
+        return provider
+
+    def shard(self, index, count):
+        """
+        Keep the rows whose source position is index modulo count.
+
+        Shards nest: a shard of a shard splits the rows the outer shard kept, so a
+        worker's rows can be split again into test items. Membership depends only
+        on the source position, so sampling, resuming and limiting never move a
+        row to another shard, and a limit applies to the dataset, not per shard.
+        """
+        if not 0 <= index < count:
+            raise ValueError(f"Shard index {index} is outside 0..{count - 1}")
+        # Row p is in outer shard i of n when p % n == i; its ordinal there is p // n,
+        # so inner shard j of m keeps exactly p % (n * m) == i + n * j
+        return self._copy(
+            shard_index=self.shard_index + self.shard_count * index,
+            shard_count=self.shard_count * count,
+        )
+
+    def split(self, count):
+        """Split into count shards that together cover every row exactly once."""
+        return [self.shard(index, count) for index in range(count)]
+
+    def sample(self, rate, seed=0):
+        """Keep roughly rate of the rows; the same seed always keeps the same positions."""
+        return self._copy(sample_rate=rate, seed=seed)
+
+    def skip(self, offset):
+        """Resume from a source position: rows before it are read past but not yielded."""
+        return self._copy(offset=offset)
+
+    def limit(self, count):
+        """Stop after count rows of the dataset; shards share the same first count rows."""
+        return self._copy(max_rows=count)
+
+    # Iteration
+
+    def iter_indexed(self):
+        """
+        Yield (position, row) pairs, position being the row's index in the source stream.
+
+        Pass the last position reached, plus one, to skip() to resume an interrupted run.
+        """
+        stream = enumerate(self.read())
+        if self.sample_rate < 1.0:
+            stream = filter(lambda item: _sampled(self.seed, item[0], self.sample_rate), stream)
+        if self.offset:
+            stream = filter(lambda item: item[0] >= self.offset, stream)
+        if self.max_rows is not None:
+            stream = itertools.islice(stream, self.max_rows)
+        if self.shard_count > 1:
+            stream = filter(lambda item: item[0] % self.shard_count == self.shard_index, stream)
+        return stream
+
+    def __iter__(self):
+        return (row for _, row in self.iter_indexed())
+
+    def describe(self):
+        parts = [self.name]
+        if self.shard_count > 1:
+            parts.append(f"shard {self.shard_index}/{self.shard_count}")
+        if self.sample_rate < 1.0:
+            parts.append(f"sample {self.sample_rate:g} seed {self.seed}")
+        if self.offset:
+            parts.append(f"from {self.offset}")
+        if self.max_rows is not None:
+            parts.append(f"limit {self.max_rows}")
+        return ", ".join(parts)
+
+    def __repr__(self):
+        return f"DataProvider({self.describe()})"
@@ -0,0 +1,236 @@
+"""
+Named Chrome presets and a factory that measures how long each session takes to launch.
+
+    fast      eager page loads, no images, extensions or background networking, small headless window
+    faithful  what a user's browser does: full page loads and images, large headless window
+    debug     a visible, maximized window with DevTools open
+
+The preset comes from DRIVER_PRESET (default "faithful"). The chromedriver binary
+is resolved from CHROMEDRIVER_PATH, then from PATH, and otherwise left to Selenium
+Manager; CHROME_BINARY points at a specific Chrome build. With PROFILE_TEMPLATE=1
+every session starts from a clone of a warmed profile (see utils.profile_template).
+Compare cold starts and flow timings per preset with:
+
+    python -m utils.benchmark --preset fast --runs 5
+"""
+import atexit
+import os
+import shutil
+import threading
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from pages.base_page import DEFAULT_BASE_URL
+from pages.instrumentation import StepMetrics, percentile
+from pages.request_blocking import profile_name
+from utils.profile_template import WARM_PATHS, ProfileTemplate, detect_browser_version
+
+DEFAULT_PRESET = "faithful"
+
+COMMON_ARGUMENTS = ["--no-sandbox", "--disable-dev-shm-usage"]
+
+PRESETS = {
+    "fast": {
+        "headless": True,
+        "page_load_strategy": "eager",
+        "window_size": (1280, 800),
+        "arguments": [
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--no-first-run",
+            "--blink-settings=imagesEnabled=false",
+        ],
+        "prefs": {"profile.managed_default_content_settings.images": 2},
+    },
+    "faithful": {
+        "headless": True,
+        "page_load_strategy": "normal",
+        "window_size": (1920, 1080),
+        "arguments": [],
+        "prefs": {},
+    },
+    "debug": {
+        "headless": False,
+        "page_load_strategy": "normal",
+        "window_size": None,
+        "arguments": ["--start-maximized", "--auto-open-devtools-for-tabs"],
+        "prefs": {},
+    },
+}
+
+
+def resolve_driver_path(environ=None):
+    """
+    Find the chromedriver binary.
+
+    Returns:
+        str: CHROMEDRIVER_PATH if set, else chromedriver on PATH, else None so Selenium Manager resolves one
+    """
+    environ = os.environ if environ is None else environ
+    if environ.get("CHROMEDRIVER_PATH"):
+        return environ["CHROMEDRIVER_PATH"]
+    return shutil.which("chromedriver", path=environ.get("PATH"))
+
+
+def build_options(preset, environ=None):
+    """
+    Build ChromeOptions for a named preset.
+
+    Raises:
+        ValueError: If the preset is unknown
+    """
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown driver preset '{preset}', expected one of {', '.join(PRESETS)}")
+    environ = os.environ if environ is None else environ
+    settings = PRESETS[preset]
+    options = Options()
+    options.page_load_strategy = settings["page_load_strategy"]
+    if settings["headless"]:
+        options.add_argument("--headless=new")
+    if settings["window_size"]:
+        options.add_argument("--window-size={},{}".format(*settings["window_size"]))
+    for argument in COMMON_ARGUMENTS + settings["arguments"]:
+        options.add_argument(argument)
+    if settings["prefs"]:
+        options.add_experimental_option("prefs", settings["prefs"])
+    if profile_name(environ) != "off":
+        # Network events in the performance log are how RequestBlocker counts what it blocked
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    if environ.get("CHROME_BINARY"):
+        options.binary_location = environ["CHROME_BINARY"]
+    return options
+
+
+def _launch_chrome(options, driver_path):
+    return webdriver.Chrome(service=Service(driver_path), options=options)
+
+
+class DriverFactory:
+    """
+    Launches Chrome sessions from named presets and records each launch time.
+
+    Launches are also recorded as driver_launch[<preset>] steps in StepMetrics,
+    so cold-start cost shows up in step_metrics.json and in benchmark results.
+    """
+
+    _shared = None
+
+    def __init__(self, launcher=_launch_chrome, environ=None, profile_template=None):
+        """
+        Args:
+            launcher (callable): Takes (options, driver_path) and returns a WebDriver
+            environ (dict): Environment to read DRIVER_PRESET, CHROMEDRIVER_PATH, CHROME_BINARY and PROFILE_TEMPLATE from
+            profile_template (ProfileTemplate): Warmed profile to clone per session; by default one is
+                used only when PROFILE_TEMPLATE is set
+        """
+        self.launcher = launcher
+        self.environ = os.environ if environ is None else environ
+        self.launches = {}
+        self._lock = threading.Lock()
+        if profile_template is None and self.environ.get("PROFILE_TEMPLATE", "").lower() in ("1", "true", "yes"):
+            profile_template = ProfileTemplate(
+                self.environ.get("PROFILE_TEMPLATE_DIR"),
+                float(self.environ["PROFILE_TEMPLATE_TTL"]) if "PROFILE_TEMPLATE_TTL" in self.environ else None,
+            )
+        self.profile_template = profile_template
+        self.clones = []
+        if profile_template is not None:
+            atexit.register(self.cleanup)
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def default_preset(self):
+        return self.environ.get("DRIVER_PRESET", DEFAULT_PRESET)
+
+    def create(self, preset=None, base_url=None):
+        """
+        Launch a new session.
+
+        Args:
+            preset (str): Name in PRESETS; defaults to DRIVER_PRESET or "faithful"
+            base_url (str): Storefront the session will browse, which the profile template is warmed for;
+                defaults to BASE_URL or the Sauce Demo store
+
+        Returns:
+            WebDriver: The launched session
+        """
+        preset = preset or self.default_preset()
+        options = build_options(preset, self.environ)
+        driver_path = resolve_driver_path(self.environ)
+        fingerprint = None
+        if self.profile_template is not None:
+            base_url = (base_url or self.environ.get("BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+            fingerprint = ProfileTemplate.fingerprint(base_url, detect_browser_version(self.environ), preset)
+            self.profile_template.ensure(fingerprint, lambda user_data_dir: self._warm(preset, base_url, user_data_dir))
+            user_data_dir = self.profile_template.clone()
+            self.clones.append(user_data_dir)
+            options.add_argument(f"--user-data-dir={user_data_dir}")
+        start = time.monotonic()
+        with StepMetrics.shared().step(f"driver_launch[{preset}]"):
+            driver = self.launcher(options, driver_path)
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self.launches.setdefault(preset, []).append(elapsed)
+        print(f"Launched '{preset}' browser session in {elapsed:.2f}s")
+        if fingerprint is not None:
+            self._check_browser_version(driver)
+        return driver
+
+    def _warm(self, preset, base_url, user_data_dir):
+        # Browse the storefront once so the HTTP cache, code cache and service workers are populated
+        options = build_options(preset, self.environ)
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+        driver = self.launcher(options, resolve_driver_path(self.environ))
+        try:
+            for path in WARM_PATHS:
+                driver.get(f"{base_url}{path}")
+                deadline = time.monotonic() + 10
+                while driver.execute_script("return document.readyState") != "complete" and time.monotonic() < deadline:
+                    time.sleep(0.1)
+            return getattr(driver, "capabilities", {}).get("browserVersion")
+        finally:
+            # Chrome writes its caches and databases out on a clean quit
+            driver.quit()
+
+    def _check_browser_version(self, driver):
+        # A binary we could not ask up front may still turn out newer than the one the template was built with
+        actual = getattr(driver, "capabilities", {}).get("browserVersion")
+        metadata = self.profile_template.metadata() or {}
+        built_with = metadata.get("fingerprint", {}).get("browser_version")
+        if actual and built_with and actual != built_with:
+            print(f"Browser is {actual} but the profile template was built with {built_with}; rebuilding it next launch")
+            self.profile_template.invalidate()
+
+    def cleanup(self):
+        """Remove the profile clones of sessions launched by this factory."""
+        while self.clones:
+            self.profile_template.cleanup(self.clones.pop())
+
+    def report(self):
+        """
+        Summarize launch times per preset.
+
+        Returns:
+            dict: Per preset, the launch count and p50/max launch seconds
+        """
+        with self._lock:
+            launches = {preset: list(times) for preset, times in self.launches.items()}
+        return {
+            preset: {
+                "launches": len(times),
+                "p50_seconds": round(percentile(times, 0.5), 3),
+                "max_seconds": round(max(times), 3),
+            }
+            for preset, times in launches.items()
+        }
@@ -0,0 +1,242 @@
+"""
+Run data-driven flows as a tree, so steps shared by several rows run once.
+
+A flow is a FlowGraph of steps. Each step names the row fields it reads and
+the steps that must come before it. The planner orders the steps so that those
+whose inputs vary least across the rows come first: the home page and the
+login before the search. It then merges the rows into a tree, where rows
+share a node for as long as every step so far had the same inputs. For
+login_search_data (one account, three search terms) this is:
+
+    home -> login -+- search(grey jacket) -> product -> add_to_cart -> cart -> checkout
+                   +- search(noir jacket) -> ...
+                   +- search(Striped top) -> ...
+
+Walking the tree depth-first, the browser state is captured at every branch
+point (cookies, localStorage, URL and cart, as utils.checkpoints captures it)
+and restored before each further branch. If the store no longer honours a
+snapshot, the branch replays its path from the start instead. The report
+compares the steps executed with the naive count of every step for every row.
+
+Enable for the flow test with FLOW_TREE=1, which also puts every row of the
+dataset into one batch (DATA_BATCHES overrides).
+"""
+import copy
+import json
+import os
+
+import allure
+
+from utils.checkpoints import CLEAR_STORAGE_SCRIPT, FlowCheckpoint
+
+
+def enabled(environ=None):
+    environ = os.environ if environ is None else environ
+    return environ.get("FLOW_TREE", "").lower() in ("1", "true", "yes")
+
+
+class Step:
+    """One step of a flow graph."""
+
+    def __init__(self, name, run, params=(), after=()):
+        """
+        Args:
+            name (str): Unique step name
+            run (callable): Takes the context dict and the row values of params as keyword arguments;
+                returns True on success
+            params (tuple): Row fields the step reads
+            after (tuple): Names of the steps that must run before this one
+        """
+        self.name = name
+        self.run = run
+        self.params = tuple(params)
+        self.after = tuple(after)
+
+
+class FlowGraph:
+    """Steps and their ordering constraints."""
+
+    def __init__(self, steps):
+        self.steps = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Duplicate step {step.name}")
+            self.steps[step.name] = step
+        for step in self.steps.values():
+            missing = [name for name in step.after if name not in self.steps]
+            if missing:
+                raise ValueError(f"Step {step.name} runs after unknown steps {missing}")
+
+    def order(self, rows):
+        """
+        A topological order of the steps in which the most widely shared steps come first.
+
+        Among the steps whose predecessors have all been placed, the one with the
+        fewest distinct inputs across rows goes next; ties keep declaration order.
+
+        Raises:
+            ValueError: If the steps' after constraints form a cycle
+        """
+        declared = list(self.steps)
+
+        def distinct(step):
+            return len({tuple(row[param] for param in step.params) for row in rows}) if step.params else 1
+
+        placed, order = set(), []
+        while len(order) < len(declared):
+            ready = [self.steps[name] for name in declared
+                     if name not in placed and all(before in placed for before in self.steps[name].after)]
+            if not ready:
+                raise ValueError(f"Steps {sorted(set(declared) - placed)} form a cycle")
+            step = min(ready, key=lambda candidate: (distinct(candidate), declared.index(candidate.name)))
+            placed.add(step.name)
+            order.append(step)
+        return order
+
+
+class Node:
+    """A step with the inputs of the rows that share it."""
+
+    def __init__(self, step, values, parent=None):
+        self.step = step
+        self.values = values
+        self.parent = parent
+        self.children = []
+        self.rows = []
+
+    def path(self):
+        node, path = self, []
+        while node is not None and node.step is not None:
+            path.append(node)
+            node = node.parent
+        return list(reversed(path))
+
+    def size(self):
+        return (1 if self.step is not None else 0) + sum(child.size() for child in self.children)
+
+
+def plan(graph, rows):
+    """
+    Merge the rows into a tree of steps.
+
+    Returns:
+        Node: A root without a step whose descendants hold each step once per distinct prefix;
+            leaves list the indexes of the rows ending there
+    """
+    order = graph.order(rows)
+    root = Node(None, None)
+    for index, row in enumerate(rows):
+        node = root
+        for step in order:
+            values = {param: row[param] for param in step.params}
+            child = next((c for c in node.children if c.step is step and c.values == values), None)
+            if child is None:
+                child = Node(step, values, node)
+                node.children.append(child)
+            node = child
+        node.rows.append(index)
+    return root
+
+
+class ExecutionTree:
+    """Walks a planned tree on one driver, snapshotting and restoring at branch points."""
+
+    def __init__(self, graph, rows, driver, base_url):
+        self.graph = graph
+        self.rows = list(rows)
+        self.driver = driver
+        self.base_url = base_url
+        self.root = plan(graph, self.rows)
+        self.results = [False] * len(self.rows)
+        self.stats = {"executed_steps": 0, "snapshots": 0, "restores": 0, "replays": 0, "failed_steps": 0}
+
+    def _run_step(self, node, context):
+        self.stats["executed_steps"] += 1
+        label = ", ".join(f"{value}" for value in node.values.values())
+        try:
+            with allure.step(f"Step: {node.step.name}" + (f" ({label})" if label else "")):
+                passed = node.step.run(context, **node.values) is True
+        except Exception as e:
+            print(f"Step '{node.step.name}' raised: {e}")
+            passed = False
+        if not passed:
+            self.stats["failed_steps"] += 1
+        return passed
+
+    def _reset(self):
+        # A fresh visitor, as a new session would be
+        self.driver.delete_all_cookies()
+        self.driver.execute_script(CLEAR_STORAGE_SCRIPT)
+
+    def _replay(self, node):
+        # The snapshot was not honoured: rebuild this node's state from the start of its path
+        self.stats["replays"] += 1
+        self._reset()
+        context = {}
+        for step_node in node.path():
+            if not self._run_step(step_node, context):
+                return None
+        return context
+
+    def _walk(self, node, context):
+        if node.step is not None and not self._run_step(node, context):
+            return
+        for index in node.rows:
+            self.results[index] = True
+        snapshot = None
+        if node.step is not None and len(node.children) > 1:
+            snapshot = FlowCheckpoint.capture(self.driver, node.step.name, context, 0.0)
+            self.stats["snapshots"] += 1
+        for position, child in enumerate(node.children):
+            # The first branch continues from the live state; the snapshot holds its own copy of the context
+            if position == 0:
+                branch_context = context
+            elif snapshot is None:
+                self._reset()
+                branch_context = {}
+            elif snapshot.restore(self.driver, self.base_url):
+                self.stats["restores"] += 1
+                branch_context = copy.deepcopy(snapshot.context)
+            else:
+                branch_context = self._replay(node)
+                if branch_context is None:
+                    continue
+            self._walk(child, branch_context)
+
+    def run(self):
+        """
+        Run every row.
+
+        Returns:
+            list: True or False per row, in row order
+        """
+        self._walk(self.root, {})
+        return list(self.results)
+
+    def report(self):
+        """
+        Compare the steps executed with running every step for every row.
+
+        Returns:
+            dict: Rows, planned and naive step counts, executed steps, snapshots, restores and replays
+        """
+        naive = len(self.graph.steps) * len(self.rows)
+        return dict(
+            self.stats,
+            rows=len(self.rows),
+            passed=sum(self.results),
+            naive_steps=naive,
+            planned_steps=self.root.size(),
+            saved_steps=naive - self.stats["executed_steps"],
+        )
+
+    def format_report(self):
+        report = self.report()
+        return (
+            f"Execution tree: {report['executed_steps']} steps executed for {report['rows']} rows "
+            f"instead of {report['naive_steps']} ({report['saved_steps']} saved; "
+            f"{report['snapshots']} snapshots, {report['restores']} restores, {report['replays']} replays)"
+        )
+
+    def attach_report(self, name="execution_tree"):
+        allure.attach(json.dumps(self.report(), indent=2), name=name, attachment_type=allure.attachment_type.JSON)
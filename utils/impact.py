@@ -0,0 +1,461 @@
+"""
+Change-impact test selection from the page objects each test exercised.
+
+Recording (IMPACT_RECORD=1): while a test runs, a profile hook on every thread
+notes each function defined under pages/ and tests/ that it calls, and every UPPER_CASE
+class constant those functions read (self.SEARCH_INPUT, HomePage.SEARCH_RESULT),
+resolved to the class that defines it. The map is saved to .impact_map.json
+(a file per worker under utils.parallel_runner) with the commit it was recorded at.
+
+Selection (IMPACT_SELECT=1): git diff against the recorded commit gives the
+changed lines of pages/ and tests/. Parsing the old and new source turns them
+into symbols: functions, class constants, class bodies and module bodies. A
+test runs when it exercised a changed symbol, or when it is not in the map yet.
+Everything runs instead when the map is missing or stale, git is unavailable, a
+changed file cannot be parsed, or code outside pages/ and tests/ changed. Before
+Python 3.12 only threads started during a test are hooked, so changes to code
+run on the long-lived screenshot worker thread run everything too.
+
+    IMPACT_RECORD=1 python -m pytest tests
+    IMPACT_SELECT=1 python -m pytest tests
+    python -m utils.impact select --base origin/main
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRACKED_DIRS = ("pages/", "tests/")
+# Changes here never affect what a test does
+IGNORED_PATTERNS = (r"\.(md|rst)$", r"^allure-results/", r"^\.gitignore$", r"(^|/)LICENSE")
+# Code run on long-lived worker threads, which may have started before a recording could hook them
+WORKER_THREAD_MODULES = ("pages/screenshots.py", "pages/screenshot_store.py")
+CONSTANT_NAME = re.compile(r"^[A-Z][A-Z0-9_]*$")
+HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+VERSION = 1
+
+
+def recording_enabled(environ=None):
+    environ = os.environ if environ is None else environ
+    return environ.get("IMPACT_RECORD", "").lower() in ("1", "true", "yes")
+
+
+def selection_enabled(environ=None):
+    environ = os.environ if environ is None else environ
+    return environ.get("IMPACT_SELECT", "").lower() in ("1", "true", "yes")
+
+
+def _git(root, *args):
+    result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        return None
+    return result.stdout
+
+
+def head_commit(root=ROOT):
+    """The checked-out commit and whether pages/ or tests/ have uncommitted changes."""
+    commit = _git(root, "rev-parse", "HEAD")
+    status = _git(root, "status", "--porcelain", "--", *TRACKED_DIRS)
+    return (commit.strip() if commit else None), bool(status and status.strip())
+
+
+class ImpactMap:
+    """
+    Per test, the symbols it exercised and the commit they were recorded at.
+
+    Entries from every worker's file are merged on load; the newest entry per test wins.
+    """
+
+    DEFAULT_PATH = ".impact_map.json"
+
+    _shared = None
+
+    def __init__(self, path=None):
+        if path is None:
+            base = os.environ.get("IMPACT_MAP_PATH", self.DEFAULT_PATH)
+            worker = os.environ.get("WORKER_ID")
+            self.base_path = base
+            self.path = f"{os.path.splitext(base)[0]}-{worker}.json" if worker else base
+        else:
+            self.base_path = self.path = path
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _load(self):
+        entries = {}
+        paths = [self.base_path] + sorted(glob.glob(f"{glob.escape(os.path.splitext(self.base_path)[0])}-*.json"))
+        for path in paths:
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if data.get("version") != VERSION:
+                continue
+            for nodeid, entry in data.get("tests", {}).items():
+                if nodeid not in entries or entry["recorded"] > entries[nodeid]["recorded"]:
+                    entries[nodeid] = entry
+        return entries
+
+    def save(self):
+        # Write-then-rename so concurrent workers never leave a truncated file behind
+        with self._lock:
+            data = {"version": VERSION, "tests": self.entries}
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+
+    def record(self, nodeid, symbols, commit, dirty):
+        with self._lock:
+            self.entries[nodeid] = {
+                "commit": commit,
+                "dirty": dirty,
+                "recorded": time.time(),
+                "symbols": sorted(symbols),
+            }
+
+
+def _relative(filename, root):
+    if not filename or filename.startswith("<"):
+        return None
+    path = os.path.relpath(os.path.abspath(filename), root).replace(os.sep, "/")
+    return path if path.startswith(TRACKED_DIRS) else None
+
+
+class ImpactRecorder:
+    """Collects the symbols each test exercises through sys.setprofile."""
+
+    _shared = None
+
+    def __init__(self, impact_map=None, root=ROOT):
+        self.impact_map = impact_map or ImpactMap.shared()
+        self.root = root
+        self.commit, self.dirty = head_commit(root)
+        self._scopes = {}
+        self._current = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def save_shared(cls):
+        """Save the map of the process-wide recorder, if one recorded anything."""
+        if cls._shared is not None:
+            cls._shared.impact_map.save()
+            print(f"Impact map written to {cls._shared.impact_map.path}")
+
+    def _scope(self, code):
+        # Module bodies, comprehensions and closures count as the function they sit in, which is also recorded
+        qualname = getattr(code, "co_qualname", code.co_name)
+        if "<" in qualname:
+            return False
+        path = _relative(code.co_filename, self.root)
+        if path is None:
+            return False
+        constants = tuple(name for name in code.co_names if CONSTANT_NAME.match(name))
+        return path, qualname, constants
+
+    def _owner(self, name, frame):
+        candidates = []
+        receiver = frame.f_locals.get("self", frame.f_locals.get("cls"))
+        if receiver is not None:
+            candidates.append(receiver if isinstance(receiver, type) else type(receiver))
+        for global_name in frame.f_code.co_names:
+            value = frame.f_globals.get(global_name)
+            if isinstance(value, type):
+                candidates.append(value)
+        for candidate in candidates:
+            for klass in candidate.__mro__:
+                if name in vars(klass):
+                    module = sys.modules.get(klass.__module__)
+                    path = _relative(getattr(module, "__file__", None), self.root)
+                    return f"{path}::{klass.__qualname__}.{name}" if path else None
+        return None
+
+    def _profile(self, frame, event, arg):
+        current = self._current
+        # Threads started while recording keep the hook after the test ends
+        if event != "call" or current is None:
+            return
+        code = frame.f_code
+        scope = self._scopes.get(code)
+        if scope is None:
+            scope = self._scopes[code] = self._scope(code)
+        if not scope:
+            return
+        path, qualname, constants = scope
+        current.add(f"{path}::{qualname}")
+        for name in constants:
+            symbol = self._owner(name, frame)
+            if symbol:
+                current.add(symbol)
+
+    @contextmanager
+    def recording(self, nodeid):
+        """Record the symbols exercised inside the block, on any thread, as nodeid's dependencies."""
+        previous, previous_threads = sys.getprofile(), threading.getprofile()
+        self._current = set()
+        # Threads started inside the block are hooked too; on Python 3.12+ so are running ones
+        if hasattr(threading, "setprofile_all_threads"):
+            threading.setprofile_all_threads(self._profile)
+        else:
+            threading.setprofile(self._profile)
+            sys.setprofile(self._profile)
+        try:
+            yield self._current
+        finally:
+            if hasattr(threading, "setprofile_all_threads"):
+                threading.setprofile_all_threads(previous)
+            else:
+                sys.setprofile(previous)
+            threading.setprofile(previous_threads)
+            self.impact_map.record(nodeid, self._current, self.commit, self.dirty)
+            self._current = None
+
+
+def _spans(source):
+    """
+    The symbols a module defines, with the lines they cover.
+
+    Returns:
+        tuple: (spans, references). spans is a list of (first line, last line, symbol) where
+            symbol is a function or method qualname, "Class.CONSTANT" for a class constant,
+            "Class" for the rest of a class body and "" for module-level code; references
+            maps each class constant to the sibling constants its value uses.
+    """
+    tree = ast.parse(source)
+    spans = [(1, max(len(source.splitlines()), 1), "")]
+    references = {}
+
+    def visit(body, prefix):
+        for node in body:
+            first = min([node.lineno] + [decorator.lineno for decorator in getattr(node, "decorator_list", [])])
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                spans.append((first, node.end_lineno, prefix + node.name))
+            elif isinstance(node, ast.ClassDef):
+                name = prefix + node.name
+                spans.append((first, node.end_lineno, name))
+                visit(node.body, name + ".")
+            elif prefix and isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                used = {n.id for n in ast.walk(node.value) if isinstance(n, ast.Name)} if node.value else set()
+                for target in targets:
+                    if isinstance(target, ast.Name) and CONSTANT_NAME.match(target.id):
+                        symbol = prefix + target.id
+                        spans.append((first, node.end_lineno, symbol))
+                        references[symbol] = {prefix + name for name in used if CONSTANT_NAME.match(name)}
+
+    visit(tree.body, "")
+    return spans, references
+
+
+def _symbols_on_lines(source, lines):
+    spans, references = _spans(source)
+    changed = set()
+    for line in lines:
+        # The innermost span holding the line names what changed
+        containing = [span for span in spans if span[0] <= line <= span[1]]
+        if containing:
+            changed.add(min(containing, key=lambda span: span[1] - span[0])[2])
+    # A constant built from a changed constant (READY_CONDITIONS from SEARCH_RESULT) changed with it
+    grown = True
+    while grown:
+        grown = False
+        for symbol, used in references.items():
+            if symbol not in changed and used & changed:
+                changed.add(symbol)
+                grown = True
+    return changed
+
+
+def _parse_diff(diff):
+    files = {}
+    path = None
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            path = None
+        elif line.startswith("--- "):
+            old = line[4:]
+            path = old[2:] if old.startswith("a/") else None
+        elif line.startswith("+++ "):
+            new = line[4:]
+            path = new[2:] if new.startswith("b/") else path
+            files.setdefault(path, (set(), set()))
+        elif path is not None:
+            match = HUNK.match(line)
+            if match:
+                old_start, old_count, new_start, new_count = (
+                    int(value) if value is not None else 1 for value in match.groups())
+                old_lines, new_lines = files[path]
+                old_lines.update(range(old_start, old_start + old_count))
+                new_lines.update(range(new_start, new_start + new_count))
+    return files
+
+
+def changed_symbols(base, root=ROOT):
+    """
+    The symbols of pages/ and tests/ that differ between base and the working tree.
+
+    Returns:
+        tuple: (symbols, reason). symbols is a set of "path::symbol" strings; reason is
+            None, or why the change cannot be narrowed down and everything should run
+    """
+    diff = _git(root, "diff", "-U0", "--no-color", "--no-renames", base, "--")
+    if diff is None:
+        return None, f"cannot diff against {base}"
+    symbols = set()
+    for path, (old_lines, new_lines) in sorted(_parse_diff(diff).items()):
+        if any(re.search(pattern, path) for pattern in IGNORED_PATTERNS):
+            continue
+        if not path.startswith(TRACKED_DIRS) or not path.endswith(".py"):
+            return None, f"{path} changed outside the page objects and tests"
+        if os.path.basename(path) == "conftest.py":
+            # Hooks run at collection and session boundaries, where no test records them
+            return None, f"{path} changed"
+        for revision_lines, source in ((old_lines, _git(root, "show", f"{base}:{path}")),
+                                       (new_lines, _read(os.path.join(root, path)))):
+            if not revision_lines or source is None:
+                continue
+            try:
+                symbols.update(f"{path}::{symbol}" for symbol in _symbols_on_lines(source, revision_lines))
+            except SyntaxError:
+                return None, f"{path} does not parse"
+    return symbols, None
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _affected(nodeid, entry, changed):
+    recorded = set(entry["symbols"])
+    for symbol in changed:
+        path, name = symbol.split("::", 1)
+        if not name:
+            # Module-level code: imports and helpers shared by everything in the file
+            if nodeid.startswith(path + "::") or any(s.startswith(path + "::") for s in recorded):
+                return True
+        elif symbol in recorded or any(s.startswith(symbol + ".") for s in recorded):
+            return True
+    return False
+
+
+def _changes(revision, entry, base, impact_map, root):
+    # (symbols, None) when the change can be narrowed down, (None, None) when the entry is stale,
+    # (None, reason) when everything has to run
+    if entry["dirty"] and not base:
+        return None, None
+    if _git(root, "cat-file", "-e", f"{revision}^{{commit}}") is None:
+        return None, None
+    symbols, reason = changed_symbols(revision, root)
+    if reason:
+        return None, reason
+    for symbol in symbols:
+        path, name = symbol.split("::", 1)
+        if path in WORKER_THREAD_MODULES and not hasattr(threading, "setprofile_all_threads"):
+            return None, f"{path} runs on worker threads the recorder may not have seen"
+        # Module-level changes to a tests/ module holding no recorded tests (conftest, test_data)
+        # reach every test through fixtures, hooks and parametrization
+        if not name and path.startswith("tests/") and \
+                not any(nodeid.startswith(path + "::") for nodeid in impact_map.entries):
+            return None, f"module-level code of {path} changed"
+    return symbols, None
+
+
+def select(nodeids, impact_map, base=None, root=ROOT):
+    """
+    Pick the tests a change can affect.
+
+    Args:
+        nodeids (list): Collected pytest node ids
+        impact_map (ImpactMap): Recorded dependencies
+        base (str): Git revision to diff against; defaults to the commit each entry was recorded at
+        root (str): Repository root
+
+    Returns:
+        tuple: (selected node ids, report dict with the changed symbols and the reason for a full run, if any)
+    """
+    nodeids = list(nodeids)
+    report = {"total": len(nodeids), "changed": set(), "reason": None, "unknown": 0, "stale": 0}
+    changes = {}
+    selected = []
+    for nodeid in nodeids:
+        entry = impact_map.entries.get(nodeid)
+        if entry is None:
+            report["unknown"] += 1
+            selected.append(nodeid)
+            continue
+        # A dirty entry is stale at its commit while a clean one is not, so they never share a result
+        key = (base or entry["commit"], entry["dirty"])
+        if key not in changes:
+            changes[key] = _changes(key[0], entry, base, impact_map, root)
+        symbols, reason = changes[key]
+        if reason:
+            report["reason"] = reason
+            break
+        if symbols is None:
+            report["stale"] += 1
+            selected.append(nodeid)
+            continue
+        report["changed"] |= symbols
+        if _affected(nodeid, entry, symbols):
+            selected.append(nodeid)
+    if report["reason"] is None and report["unknown"] == len(nodeids):
+        report["reason"] = "no dependency data recorded for these tests"
+    elif report["reason"] is None and report["stale"] and report["stale"] + report["unknown"] == len(nodeids):
+        report["reason"] = "dependency data is stale"
+    report["changed"] = sorted(report["changed"])
+    if report["reason"]:
+        return nodeids, report
+    return selected, report
+
+
+def format_report(selected, report):
+    if report["reason"]:
+        return f"Impact selection: running all {report['total']} tests ({report['reason']})"
+    return (f"Impact selection: {len(selected)} of {report['total']} tests affected by "
+            f"{len(report['changed'])} changed symbols ({report['unknown']} new, {report['stale']} stale)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the recorded tests a change affects")
+    commands = parser.add_subparsers(dest="command", required=True)
+    select_parser = commands.add_parser("select", help="print the affected test ids")
+    select_parser.add_argument("--map", help="impact map file; defaults to IMPACT_MAP_PATH or .impact_map.json")
+    select_parser.add_argument("--base", help="git revision to diff against; defaults to the recorded commit")
+    args = parser.parse_args(argv)
+
+    impact_map = ImpactMap(args.map)
+    selected, report = select(sorted(impact_map.entries), impact_map, args.base)
+    for symbol in report["changed"]:
+        print(f"changed: {symbol}")
+    for nodeid in selected:
+        print(nodeid)
+    print(format_report(selected, report), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Parallel execution of the data-driven flows across worker processes.
+
+Every worker owns its browser and writes artifacts into its own
+screenshots/<worker> and allure-results/<worker> directories; the allure
+directories are merged back into the shared results directory at the end,
+and the per-worker step metrics into one step_metrics.json.
+
+Run the pytest suite sharded across workers with:
+
+    python -m utils.parallel_runner --workers 4 tests/test_saucelabs_flow.py
+"""
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+from pages.instrumentation import StepMetrics
+from utils.allure_stream import merge_results
+from utils.data_provider import DataProvider
+
+SCREENSHOTS_ROOT = "screenshots"
+ALLURE_RESULTS_ROOT = "allure-results"
+
+
+def worker_name(index):
+    return f"worker-{index}"
+
+
+def worker_environment(index, count, base_env=None):
+    """
+    Build the environment variables that isolate one worker's artifacts.
+
+    Args:
+        index (int): Zero-based worker index
+        count (int): Total number of workers
+
+    Returns:
+        dict: Environment for the worker process
+    """
+    env = dict(os.environ if base_env is None else base_env)
+    env["SHARD_INDEX"] = str(index)
+    env["SHARD_COUNT"] = str(count)
+    env["WORKER_ID"] = worker_name(index)
+    env["SCREENSHOTS_DIR"] = os.path.join(SCREENSHOTS_ROOT, worker_name(index))
+    return env
+
+
+def shard(items, index, count):
+    """Deterministically select the items belonging to shard index of count."""
+    return [item for position, item in enumerate(items) if position % count == index]
+
+
+def merge_allure_results(worker_dirs, target_dir=ALLURE_RESULTS_ROOT):
+    """
+    Move every worker's allure files into the shared results directory.
+
+    Result, container and attachment files are UUID-named so they never collide;
+    for shared files such as environment.properties the first copy wins. Streams
+    written with ALLURE_STREAM=1 are expanded into plain files on the way.
+
+    Returns:
+        int: Number of files merged
+    """
+    stats = merge_results(worker_dirs, target_dir)
+    merged = stats["files"] + stats["records"]
+    print(f"Merged {merged} allure files from {len(worker_dirs)} workers into {target_dir}")
+    return merged
+
+
+def merge_step_metrics(workers, target=None):
+    """
+    Combine the step_metrics-<worker>.json files of every worker into one summary.
+
+    Returns:
+        str: Path of the merged summary, or None if no worker recorded a step
+    """
+    paths = [StepMetrics.summary_path(worker_name(index)) for index in range(workers)]
+    merged = StepMetrics.merge_summaries(paths, target)
+    if merged is not None:
+        print(f"Merged step metrics from {workers} workers into {merged}")
+    return merged
+
+
+def run_pytest_parallel(workers, pytest_args=(), results_dir=ALLURE_RESULTS_ROOT):
+    """
+    Run pytest in one process per shard and merge the allure results.
+
+    Args:
+        workers (int): Number of worker processes
+        pytest_args (sequence): Extra arguments passed to each pytest process
+        results_dir (str): Shared allure results directory
+
+    Returns:
+        int: 0 if every worker passed, otherwise the first non-zero exit code
+    """
+    start = time.monotonic()
+    processes = []
+    worker_dirs = []
+    for index in range(workers):
+        worker_dir = os.path.join(results_dir, worker_name(index))
+        worker_dirs.append(worker_dir)
+        command = [sys.executable, "-m", "pytest", "-q", f"--alluredir={worker_dir}", *pytest_args]
+        processes.append(subprocess.Popen(command, env=worker_environment(index, workers)))
+
+    exit_codes = [process.wait() for process in processes]
+    merge_allure_results(worker_dirs, results_dir)
+    merge_step_metrics(workers)
+    print(f"{workers} workers finished in {time.monotonic() - start:.1f}s with exit codes {exit_codes}")
+    # pytest exits with 5 when a shard collected no tests, which is not a failure here
+    failures = [code for code in exit_codes if code not in (0, 5)]
+    return failures[0] if failures else 0
+
+
+def _run_flow_in_worker(args):
+    index, count, provider = args
+    os.environ.update(worker_environment(index, count, base_env={}))
+    # Imported here so each process launches its own browser after the environment is set
+    from tests.test_saucelabs import SauceLabsTest
+
+    test = SauceLabsTest()
+    outcomes = []
+    try:
+        for position, row in provider.iter_indexed():
+            # Printed so an interrupted run can resume with DATA_OFFSET
+            print(f"[{worker_name(index)}] row {position}: {row['search_term']}")
+            success = test.search_add_cart_checkout_login_flow(row["email"], row["password"], row["search_term"])
+            outcomes.append((row["search_term"], success))
+    finally:
+        test.close_driver()
+        # Pool workers exit without running atexit hooks, so flush screenshots, metrics, latency and locators explicitly
+        from pages.instrumentation import StepMetrics
+        from pages.locator_registry import LocatorRegistry
+        from pages.screenshots import ScreenshotPipeline
+        from pages.timeouts import TimeoutModel
+        ScreenshotPipeline.flush_shared()
+        StepMetrics.shared().write_summary()
+        TimeoutModel.save_shared()
+        LocatorRegistry.save_shared()
+    return outcomes
+
+
+def run_flows_parallel(rows, workers):
+    """
+    Run search_add_cart_checkout_login_flow for every row across worker processes.
+
+    Args:
+        rows (list | DataProvider): Dicts with email, password and search_term; a provider is
+            streamed, each worker reading only its own shard
+        workers (int): Number of worker processes, each with its own browser
+
+    Returns:
+        list: (search_term, success) tuples for every row
+    """
+    provider = rows if isinstance(rows, DataProvider) else DataProvider.from_rows(rows)
+    if provider.length is not None:
+        workers = min(workers, provider.length)
+    workers = max(1, workers)
+    jobs = [(index, workers, part) for index, part in enumerate(provider.split(workers))]
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        results = pool.map(_run_flow_in_worker, jobs)
+    merge_step_metrics(len(jobs))
+    return [outcome for worker_outcomes in results for outcome in worker_outcomes]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the pytest suite sharded across worker processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--alluredir", default=ALLURE_RESULTS_ROOT)
+    args, pytest_args = parser.parse_known_args(argv)
+    return run_pytest_parallel(args.workers, pytest_args, args.alluredir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+A warmed Chrome profile, built once and cloned cheaply for every session.
+
+The template is a user-data-dir whose HTTP cache, code cache and service
+workers were populated by visiting the storefront. Each session gets its own
+clone so sessions never share a live profile:
+
+    reflink   copy-on-write clone (btrfs/XFS FICLONE, APFS clonefile); used whenever the filesystem allows
+    copy      otherwise, every file is copied
+
+Files are never hardlinked: Chrome's simple cache rewrites entry files in place
+(e.g. headers after revalidation), so a shared inode would let one session
+corrupt the template and every other clone.
+
+The template is rebuilt when the base URL, the browser version or the driver
+preset changes, or when it is older than PROFILE_TEMPLATE_TTL seconds (a day by
+default). Enable it with PROFILE_TEMPLATE=1; PROFILE_TEMPLATE_DIR moves it.
+"""
+import errno
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_DIR = ".profile_template"
+DEFAULT_TTL = 24 * 60 * 60
+METADATA_FILE = "template.json"
+FORMAT = 1
+
+# Pages visited to warm the cache; search, product and cart pages share the theme's CSS and JS
+WARM_PATHS = ["/", "/search?q=jacket", "/cart", "/account/login"]
+
+# Locks and sockets of the Chrome instance that built the template
+SKIPPED_FILES = {"SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile", "LOCK"}
+
+BROWSER_CANDIDATES = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+# From linux/fs.h
+FICLONE = 0x40049409
+
+
+def detect_browser_version(environ=None):
+    """
+    Ask the Chrome binary for its version without starting a session.
+
+    Returns:
+        str: e.g. "131.0.6778.85", or None if no Chrome binary was found
+    """
+    environ = os.environ if environ is None else environ
+    candidates = [environ["CHROME_BINARY"]] if environ.get("CHROME_BINARY") else BROWSER_CANDIDATES
+    for candidate in candidates:
+        binary = shutil.which(candidate, path=environ.get("PATH")) or (candidate if os.path.isfile(candidate) else None)
+        if not binary:
+            continue
+        try:
+            output = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r"\d+(?:\.\d+)+", output)
+        if match:
+            return match.group(0)
+    return None
+
+
+def _reflink(source, destination):
+    """Clone a file copy-on-write; return False when the filesystem cannot."""
+    if sys.platform == "darwin":
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.clonefile(os.fsencode(source), os.fsencode(destination), 0) == 0
+    if fcntl is None:
+        return False
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except OSError as e:
+            if e.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EBADF):
+                raise
+    os.unlink(destination)
+    return False
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ProfileTemplate:
+    """
+    Builds, validates and clones the warmed profile template.
+
+    Parallel workers share one template: the first to find it missing or stale
+    builds it under a file lock, the others wait and then clone it.
+    """
+
+    def __init__(self, root=None, ttl=None):
+        """
+        Args:
+            root (str): Directory holding the template and the session clones
+            ttl (float): Seconds after which the template is rebuilt
+        """
+        self.root = os.path.abspath(root or os.environ.get("PROFILE_TEMPLATE_DIR", DEFAULT_DIR))
+        self.ttl = ttl if ttl is not None else float(os.environ.get("PROFILE_TEMPLATE_TTL", DEFAULT_TTL))
+        self.template_dir = os.path.join(self.root, "template")
+        self.sessions_dir = os.path.join(self.root, "sessions")
+        self.reflinks = None
+        self.stats = {"builds": 0, "clones": 0, "reflinked": 0, "copied": 0}
+        self._clones = 0
+
+    @staticmethod
+    def fingerprint(base_url, browser_version, preset):
+        return {"format": FORMAT, "base_url": base_url.rstrip("/"), "browser_version": browser_version, "preset": preset}
+
+    def metadata(self):
+        try:
+            with open(os.path.join(self.template_dir, METADATA_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_valid(self, fingerprint, now=None):
+        metadata = self.metadata()
+        if metadata is None:
+            return False
+        built = dict(metadata.get("fingerprint", {}))
+        if fingerprint["browser_version"] is None:
+            # The binary could not be asked up front; the version is checked once a session reports it
+            built["browser_version"] = None
+        if built != fingerprint:
+            return False
+        return (now if now is not None else time.time()) - metadata["built_at"] < self.ttl
+
+    def invalidate(self):
+        with self._lock():
+            self._remove_template()
+
+    def _remove_template(self):
+        shutil.rmtree(self.template_dir, ignore_errors=True)
+
+    @contextmanager
+    def _lock(self, exclusive=True):
+        # Builds and invalidations are exclusive; clones only need the template to hold still
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def ensure(self, fingerprint, warm):
+        """
+        Make sure a valid template exists, building it if needed.
+
+        Args:
+            fingerprint (dict): From fingerprint(); a template built for anything else is rebuilt
+            warm (callable): Takes a user-data-dir, populates it by browsing and returns the
+                browser version it ran, which is recorded in place of the expected one if they differ
+
+        Returns:
+            bool: True if the template was built by this call
+        """
+        with self._lock():
+            self._prune_sessions()
+            if self.is_valid(fingerprint):
+                return False
+            build_dir = f"{self.template_dir}.{os.getpid()}.build"
+            shutil.rmtree(build_dir, ignore_errors=True)
+            os.makedirs(build_dir)
+            start = time.monotonic()
+            browser_version = warm(build_dir) or fingerprint["browser_version"]
+            built = dict(fingerprint, browser_version=browser_version)
+            with open(os.path.join(build_dir, METADATA_FILE), "w") as f:
+                json.dump({"fingerprint": built, "built_at": time.time()}, f, indent=2)
+            self._remove_template()
+            os.replace(build_dir, self.template_dir)
+            self.stats["builds"] += 1
+            print(f"Built browser profile template for {fingerprint['base_url']} in {time.monotonic() - start:.1f}s")
+            return True
+
+    def clone(self):
+        """
+        Clone the template into a fresh user-data-dir for one session.
+
+        Returns:
+            str: Path of the clone; removed by cleanup() or by the next run once this process is gone
+        """
+        self._clones += 1
+        destination = os.path.join(self.sessions_dir, f"session-{os.getpid()}-{self._clones}")
+        shutil.rmtree(destination, ignore_errors=True)
+        with self._lock(exclusive=False):
+            self._copy_tree(destination)
+        self.stats["clones"] += 1
+        return destination
+
+    def _copy_tree(self, destination):
+        for directory, _, files in os.walk(self.template_dir):
+            relative_dir = os.path.relpath(directory, self.template_dir)
+            target_dir = os.path.normpath(os.path.join(destination, relative_dir))
+            os.makedirs(target_dir, exist_ok=True)
+            for name in files:
+                if name in SKIPPED_FILES or (relative_dir == "." and name == METADATA_FILE):
+                    continue
+                self._clone_file(os.path.join(directory, name), os.path.join(target_dir, name))
+
+    def _clone_file(self, source, destination):
+        # Only a true copy-on-write clone may share blocks with the template; anything else is a full copy
+        if self.reflinks is not False:
+            if _reflink(source, destination):
+                self.reflinks = True
+                self.stats["reflinked"] += 1
+                return
+            self.reflinks = False
+        shutil.copy2(source, destination)
+        self.stats["copied"] += 1
+
+    def cleanup(self, clone_dir):
+        shutil.rmtree(clone_dir, ignore_errors=True)
+
+    def _prune_sessions(self):
+        # Clones of processes that are gone (crashed runs, spawned workers) are never cleaned up otherwise
+        if not os.path.isdir(self.sessions_dir):
+            return
+        for name in os.listdir(self.sessions_dir):
+            match = re.match(r"session-(\d+)-\d+$", name)
+            if match and int(match.group(1)) != os.getpid() and not _pid_alive(int(match.group(1))):
+                shutil.rmtree(os.path.join(self.sessions_dir, name), ignore_errors=True)
+
+    def report(self):
+        metadata = self.metadata() or {}
+        return dict(self.stats, fingerprint=metadata.get("fingerprint"), built_at=metadata.get("built_at"))
@@ -0,0 +1,189 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+
+class PooledSession:
+    """A launched WebDriver session together with its usage bookkeeping."""
+
+    def __init__(self, driver, launch_time):
+        self.driver = driver
+        self.launch_time = launch_time
+        self.uses = 0
+
+
+class SessionPool:
+    """
+    Pool of pre-launched WebDriver sessions that test cases lease and return.
+
+    Between leases the browser state is reset (cookies, storage, cache, extra
+    windows) so each case starts clean without paying for a Chrome cold start.
+    Sessions launched from a warmed profile template keep their HTTP cache
+    (clear_cache=False), since that cache is what the template is for.
+    Sessions are recycled after max_uses leases or when a health check fails.
+    """
+
+    def __init__(self, driver_factory, size=1, max_uses=20, prelaunch=True, dispose=None, clear_cache=True):
+        """
+        Args:
+            driver_factory: Callable returning a new WebDriver instance
+            size (int): Number of idle sessions kept warm
+            max_uses (int): Leases after which a session is quit and replaced
+            prelaunch (bool): Launch the sessions up front instead of on first lease
+            dispose: Callable retiring a driver the pool is done with; defaults to quitting it
+            clear_cache (bool): Clear the HTTP cache between leases; turn off to keep a warmed cache
+        """
+        self.driver_factory = driver_factory
+        self.dispose = dispose
+        self.size = size
+        self.max_uses = max_uses
+        self.clear_cache = clear_cache
+        self._idle = []
+        self._lock = threading.Lock()
+        self.leases = 0
+        self.warm_leases = 0
+        self.launches = 0
+        self.launch_seconds = 0.0
+        self.recycled = 0
+        self.health_failures = 0
+        if prelaunch:
+            for _ in range(size):
+                self._idle.append(self._launch())
+
+    def _launch(self):
+        start = time.monotonic()
+        driver = self.driver_factory()
+        launch_time = time.monotonic() - start
+        self.launches += 1
+        self.launch_seconds += launch_time
+        print(f"Launched pooled browser session in {launch_time:.2f}s")
+        return PooledSession(driver, launch_time)
+
+    def lease(self):
+        """
+        Take a warm session from the pool, launching a new one if none is idle.
+
+        Returns:
+            PooledSession: The leased session; hand it back with release()
+        """
+        with self._lock:
+            session = self._idle.pop() if self._idle else None
+            self.leases += 1
+            if session is not None:
+                self.warm_leases += 1
+        if session is None:
+            session = self._launch()
+        session.uses += 1
+        return session
+
+    def release(self, session):
+        """
+        Return a leased session, resetting its state or recycling it.
+
+        Args:
+            session (PooledSession): A session obtained from lease()
+        """
+        if session.uses >= self.max_uses:
+            self.recycled += 1
+            print(f"Recycling browser session after {session.uses} uses")
+            self._quit(session)
+            return
+        if not self.reset(session.driver) or not self.health_check(session.driver):
+            self.health_failures += 1
+            print("Pooled browser session failed health check, discarding it")
+            self._quit(session)
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(session)
+                return
+        self._quit(session)
+
+    @contextmanager
+    def session(self):
+        """Lease a driver for the duration of a with-block."""
+        session = self.lease()
+        try:
+            yield session.driver
+        finally:
+            self.release(session)
+
+    def reset(self, driver):
+        """
+        Clear browser state left behind by the previous lease.
+
+        Returns:
+            bool: True if the session was reset, False if the browser is unusable
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except WebDriverException:
+                # about:blank and some error pages do not expose storage
+                pass
+            driver.delete_all_cookies()
+            if hasattr(driver, "execute_cdp_cmd"):
+                if self.clear_cache:
+                    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get("about:blank")
+            return True
+        except WebDriverException as e:
+            print(f"Failed to reset pooled browser session: {e}")
+            return False
+
+    def health_check(self, driver):
+        """Return True if the browser still answers script commands."""
+        try:
+            return driver.execute_script("return 1") == 1
+        except WebDriverException:
+            return False
+
+    def _quit(self, session):
+        try:
+            if self.dispose is not None:
+                self.dispose(session.driver)
+            else:
+                session.driver.quit()
+        except WebDriverException:
+            pass
+
+    def stats(self):
+        """
+        Summarize pool effectiveness.
+
+        Returns:
+            dict: Lease counts, hit rate and the startup time avoided by reuse
+        """
+        average_launch = self.launch_seconds / self.launches if self.launches else 0.0
+        reused = max(self.leases - self.launches, 0)
+        return {
+            "leases": self.leases,
+            "warm_leases": self.warm_leases,
+            "hit_rate": self.warm_leases / self.leases if self.leases else 0.0,
+            "launches": self.launches,
+            "recycled": self.recycled,
+            "health_failures": self.health_failures,
+            "average_launch_seconds": round(average_launch, 3),
+            "startup_seconds_saved": round(reused * average_launch, 3),
+        }
+
+    def close(self):
+        """Quit every idle session and print the pool statistics."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            self._quit(session)
+        stats = self.stats()
+        print(
+            f"Session pool: {stats['leases']} leases, hit rate {stats['hit_rate']:.0%}, "
+            f"{stats['launches']} launches, {stats['startup_seconds_saved']:.1f}s startup saved"
+        )
+        return stats
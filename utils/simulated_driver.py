@@ -0,0 +1,948 @@
+"""
+In-process simulated WebDriver for fast page-object tests.
+
+SimulatedDriver implements the slice of the Selenium WebDriver surface the page
+objects use (get, current_url, find_element(s), element click/send_keys/text,
+execute_script, execute_async_script, screenshots and cookies) on top of an
+HTML parser, a small XPath evaluator and a request/response app. By default the
+app is the stand-in StorefrontApp, whose per-session cart and login state form
+the state machine the flow walks through; no browser, socket or sleep is
+involved, so a page-object scenario runs in microseconds.
+
+Failure paths are scripted by rewriting the served HTML:
+
+    driver = SimulatedDriver()
+    driver.rewrite("/products/", 'id="add"', 'id="add-disabled"')
+    assert ProductPage(driver, driver.base_url).add_to_cart() is False
+
+Like the real driver every command goes through execute(), so the
+WireCallCounter sees the same command stream a browser session would produce.
+"""
+import json
+import re
+import struct
+import time
+import zlib
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urljoin, urlparse
+
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.command import Command
+
+from pages import base_page
+from pages.request_blocking import INSPECTOR_BLOCKED, matches
+from utils.storage_state import READ_LOCAL_STORAGE_SCRIPT, WRITE_LOCAL_STORAGE_SCRIPT
+from utils.storefront import StorefrontApp
+
+SIMULATED_ORIGIN = "http://storefront.test"
+
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# Elements that never render, whatever their styling
+NON_RENDERED = {"head", "script", "style", "template", "title", "meta", "link"}
+SUBMIT_KEYS = (Keys.RETURN, Keys.ENTER, "\n")
+
+
+def _png(width=1, height=1, rgb=(255, 255, 255)):
+    """Encode a solid-colour PNG; enough for screenshot plumbing to store and dedupe."""
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    rows = b"".join(b"\x00" + bytes(rgb) * width for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+SCREENSHOT_PNG = _png()
+
+
+# DOM
+
+
+class Node:
+    """An element of a parsed document; children are Nodes and text strings."""
+
+    def __init__(self, tag, attrs, parent=None, document=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.document = document
+        self.children = []
+        # Live form state, which diverges from the value attribute once typed into
+        self.value = attrs.get("value", "")
+
+    def elements(self):
+        return [child for child in self.children if isinstance(child, Node)]
+
+    def descendants(self):
+        for child in self.elements():
+            yield child
+            yield from child.descendants()
+
+    def ancestors(self):
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def text_nodes(self):
+        return [child for child in self.children if isinstance(child, str)]
+
+    def string_value(self):
+        return "".join(child if isinstance(child, str) else child.string_value() for child in self.children)
+
+    def is_displayed(self):
+        for node in (self, *self.ancestors()):
+            if node.tag in NON_RENDERED or "hidden" in node.attrs:
+                return False
+            style = node.attrs.get("style", "").replace(" ", "").lower()
+            if "display:none" in style or "visibility:hidden" in style:
+                return False
+        return not (self.tag == "input" and self.attrs.get("type", "").lower() == "hidden")
+
+    def is_enabled(self):
+        return "disabled" not in self.attrs
+
+    def rendered_text(self):
+        if not self.is_displayed():
+            return ""
+        parts = []
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child)
+            elif child.is_displayed():
+                parts.append(child.rendered_text())
+        return re.sub(r"\s+", " ", " ".join(parts)).strip()
+
+    def form(self):
+        return next((node for node in self.ancestors() if node.tag == "form"), None)
+
+    def __repr__(self):
+        return f"<{self.tag} {self.attrs}>"
+
+
+class Document:
+    def __init__(self, url, source):
+        self.url = url
+        self.source = source
+        self.root = Node("#document", {}, document=self)
+        self.title = ""
+
+
+class DocumentBuilder(HTMLParser):
+    """Build a Document tree, tolerating the unclosed tags real pages contain."""
+
+    def __init__(self, document):
+        super().__init__(convert_charrefs=True)
+        self.document = document
+        self.stack = [document.root]
+
+    def handle_starttag(self, tag, attrs):
+        parent = self.stack[-1]
+        node = Node(tag, {name: value if value is not None else "" for name, value in attrs}, parent, self.document)
+        parent.children.append(node)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].tag == tag:
+                del self.stack[depth:]
+                return
+
+    def handle_data(self, data):
+        parent = self.stack[-1]
+        if parent.tag == "title":
+            self.document.title += data
+        parent.children.append(data)
+
+
+def parse_document(url, source):
+    document = Document(url, source)
+    builder = DocumentBuilder(document)
+    builder.feed(source)
+    builder.close()
+    return document
+
+
+# XPath subset
+
+
+XPATH_TOKEN = re.compile(
+    r"\s*(?:(?P<string>'[^']*'|\"[^\"]*\")|(?P<number>\d+(?:\.\d+)?)|(?P<op>//|!=|[/\[\]()@=,*.|])|(?P<name>[A-Za-z_][\w.-]*))"
+)
+
+
+def _tokenize(xpath):
+    tokens, position = [], 0
+    xpath = xpath.strip()
+    while position < len(xpath):
+        match = XPATH_TOKEN.match(xpath, position)
+        if not match or match.end() == position:
+            raise InvalidSelectorException(f"Unsupported xpath syntax at {position}: {xpath}")
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        tokens.append((kind, value[1:-1] if kind == "string" else value))
+    return tokens
+
+
+def _string(value):
+    """XPath string() of an evaluated operand."""
+    if isinstance(value, list):
+        return value[0] if value else ""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _truthy(value):
+    if isinstance(value, list):
+        return bool(value)
+    if value is None:
+        return False
+    return bool(value)
+
+
+def _equals(left, right):
+    # Node-set comparisons hold when any member matches, and never for an empty set
+    lefts = left if isinstance(left, list) else [] if left is None else [left]
+    rights = right if isinstance(right, list) else [] if right is None else [right]
+    return any(_string(a) == _string(b) for a in lefts for b in rights)
+
+
+XPATH_FUNCTIONS = {
+    "contains": lambda haystack, needle: _string(needle) in _string(haystack),
+    "starts-with": lambda haystack, prefix: _string(haystack).startswith(_string(prefix)),
+    "normalize-space": lambda value: " ".join(_string(value).split()),
+    "not": lambda value: not _truthy(value),
+    "string": _string,
+    "concat": lambda *values: "".join(_string(value) for value in values),
+}
+
+
+class XPathParser:
+    """
+    Recursive-descent compiler for the XPath subset the page objects use.
+
+    Supports absolute, relative (.//) and grouped ((...)[n]) location paths with
+    / and // steps, name and * tests, positional and boolean predicates, @attr,
+    text(), string and number literals, = and !=, and/or, and the functions in
+    XPATH_FUNCTIONS. Anything else raises InvalidSelectorException, as a browser
+    would for an expression it cannot compile.
+    """
+
+    def __init__(self, xpath):
+        self.xpath = xpath
+        self.tokens = _tokenize(xpath)
+        self.position = 0
+
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token[0] is None or (expected is not None and token[1] != expected):
+            raise InvalidSelectorException(f"Expected {expected or 'a token'} in xpath: {self.xpath}")
+        self.position += 1
+        return token
+
+    def compile(self):
+        path = self.path()
+        if self.peek()[0] is not None:
+            raise InvalidSelectorException(f"Unexpected '{self.peek()[1]}' in xpath: {self.xpath}")
+        return path
+
+    # Location paths
+
+    def path(self):
+        if self.peek()[1] == "(":
+            self.take("(")
+            inner = self.path()
+            self.take(")")
+            predicates = self.predicates()
+
+            def grouped(context):
+                return self.apply_predicates(inner(context), predicates)
+
+            return grouped
+        relative = self.peek()[1] == "."
+        if relative:
+            self.take(".")
+        steps = []
+        while self.peek()[1] in ("/", "//"):
+            axis = self.take()[1]
+            kind, name = self.take()
+            if name != "*" and kind != "name":
+                raise InvalidSelectorException(f"Unsupported node test '{name}' in xpath: {self.xpath}")
+            steps.append((axis, name, self.predicates()))
+        if not steps:
+            raise InvalidSelectorException(f"Expected a location path: {self.xpath}")
+
+        def evaluate(context):
+            nodes = [context if relative else context.document.root]
+            for axis, name, predicates in steps:
+                matched, seen = [], set()
+                for node in nodes:
+                    candidates = node.descendants() if axis == "//" else node.elements()
+                    step_nodes = [c for c in candidates if name == "*" or c.tag == name]
+                    for found in self.apply_predicates(step_nodes, predicates):
+                        if id(found) not in seen:
+                            seen.add(id(found))
+                            matched.append(found)
+                nodes = matched
+            return nodes
+
+        return evaluate
+
+    def predicates(self):
+        predicates = []
+        while self.peek()[1] == "[":
+            self.take("[")
+            predicates.append(self.or_expr())
+            self.take("]")
+        return predicates
+
+    @staticmethod
+    def apply_predicates(nodes, predicates):
+        for predicate in predicates:
+            kept = []
+            for position, node in enumerate(nodes, start=1):
+                result = predicate(node)
+                if isinstance(result, float) and not isinstance(result, bool):
+                    if int(result) == position:
+                        kept.append(node)
+                elif _truthy(result):
+                    kept.append(node)
+            nodes = kept
+        return nodes
+
+    # Predicate expressions
+
+    def or_expr(self):
+        operands = [self.and_expr()]
+        while self.peek() == ("name", "or"):
+            self.take()
+            operands.append(self.and_expr())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda node: any(_truthy(operand(node)) for operand in operands)
+
+    def and_expr(self):
+        operands = [self.comparison()]
+        while self.peek() == ("name", "and"):
+            self.take()
+            operands.append(self.comparison())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda node: all(_truthy(operand(node)) for operand in operands)
+
+    def comparison(self):
+        left = self.primary()
+        if self.peek()[1] in ("=", "!="):
+            negate = self.take()[1] == "!="
+            right = self.primary()
+            return lambda node: _equals(left(node), right(node)) != negate
+        return left
+
+    def primary(self):
+        kind, value = self.peek()
+        if kind == "string":
+            self.take()
+            return lambda node: value
+        if kind == "number":
+            self.take()
+            number = float(value)
+            return lambda node: number
+        if value == "(":
+            self.take("(")
+            inner = self.or_expr()
+            self.take(")")
+            return inner
+        if value == "@":
+            self.take("@")
+            name = self.take()[1]
+            return lambda node: node.attrs.get(name)
+        if value == ".":
+            self.take(".")
+            return lambda node: [node.string_value()]
+        if kind == "name" and self.peek(1)[1] == "(":
+            return self.function()
+        raise InvalidSelectorException(f"Unsupported expression '{value}' in xpath: {self.xpath}")
+
+    def function(self):
+        name = self.take()[1]
+        self.take("(")
+        if name == "text":
+            self.take(")")
+            return lambda node: node.text_nodes()
+        if name not in XPATH_FUNCTIONS:
+            raise InvalidSelectorException(f"Unsupported function {name}() in xpath: {self.xpath}")
+        arguments = []
+        while self.peek()[1] != ")":
+            arguments.append(self.or_expr())
+            if self.peek()[1] == ",":
+                self.take(",")
+        self.take(")")
+        function = XPATH_FUNCTIONS[name]
+        return lambda node: function(*(argument(node) for argument in arguments))
+
+
+_compiled_xpaths = {}
+
+
+def compile_xpath(xpath):
+    """Compile an xpath once; the result maps a context Node to matching Nodes in document order."""
+    compiled = _compiled_xpaths.get(xpath)
+    if compiled is None:
+        compiled = _compiled_xpaths[xpath] = XPathParser(xpath).compile()
+    return compiled
+
+
+def to_xpath(by, value):
+    """Translate the locator strategies the page objects use into xpath."""
+    if by == By.XPATH:
+        return value
+    if by == By.ID:
+        return f"//*[@id='{value}']"
+    if by == By.NAME:
+        return f"//*[@name='{value}']"
+    if by == By.TAG_NAME:
+        return f"//{value}"
+    if by == By.CLASS_NAME:
+        return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')]"
+    raise InvalidSelectorException(f"Simulated driver does not support locating by {by}")
+
+
+# WebDriver surface
+
+
+class SimulatedElement:
+    """WebElement stand-in; every call is a command routed through the driver."""
+
+    def __init__(self, driver, element_id):
+        self._parent = driver
+        self.id = element_id
+
+    def _execute(self, command, params=None):
+        params = dict(params or {}, id=self.id)
+        return self._parent.execute(command, params)["value"]
+
+    @property
+    def tag_name(self):
+        return self._execute(Command.GET_ELEMENT_TAG_NAME)
+
+    @property
+    def text(self):
+        return self._execute(Command.GET_ELEMENT_TEXT)
+
+    def click(self):
+        self._execute(Command.CLICK_ELEMENT)
+
+    def send_keys(self, *value):
+        self._execute(Command.SEND_KEYS_TO_ELEMENT, {"text": "".join(str(v) for v in value)})
+
+    def clear(self):
+        self._execute(Command.CLEAR_ELEMENT)
+
+    def submit(self):
+        self._execute(Command.SEND_KEYS_TO_ELEMENT, {"text": Keys.RETURN})
+
+    def get_attribute(self, name):
+        return self._execute(Command.GET_ELEMENT_ATTRIBUTE, {"name": name})
+
+    def is_displayed(self):
+        return self._execute("isElementDisplayed")
+
+    def is_enabled(self):
+        return self._execute(Command.IS_ELEMENT_ENABLED)
+
+    def find_element(self, by=By.ID, value=None):
+        return self._execute(Command.FIND_CHILD_ELEMENT, {"using": by, "value": value})
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._execute(Command.FIND_CHILD_ELEMENTS, {"using": by, "value": value})
+
+    def __eq__(self, other):
+        return isinstance(other, SimulatedElement) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"<SimulatedElement {self.id}>"
+
+
+class SimulatedSwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver.execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+
+
+class SimulatedDriver:
+    """
+    A WebDriver backed by an in-process app instead of a browser.
+
+    Elements from a previous page go stale on navigation, hidden elements are
+    reported as not displayed, and scripts are recognised by their source:
+    BasePage's resolution and action scripts run synchronously against the DOM
+    (a candidate that is not there now will not appear later, so the in-page
+    poll answers immediately), and further scripts can be taught with
+    register_script.
+    """
+
+    def __init__(self, app=None, origin=SIMULATED_ORIGIN, latency=0.0):
+        """
+        Args:
+            app: Object with handle(method, target, cookies, form) -> Response; defaults to a fresh StorefrontApp
+            origin (str): Scheme and host reported in current_url
+            latency (float): Seconds every command blocks, standing in for the browser round trip
+        """
+        self.app = app if app is not None else StorefrontApp()
+        self.base_url = origin
+        self.latency = latency
+        self.cookies = {}
+        self.local_storage = {}
+        self.commands = []
+        self.rewrites = []
+        self.switch_to = SimulatedSwitchTo(self)
+        self.window_handles = ["main"]
+        self.session_id = "simulated"
+        self._document = parse_document("about:blank", "<html><body></body></html>")
+        self._elements = {}
+        self._next_element = 0
+        # DevTools state: ordered (pattern, block) rules and the network events of the performance log
+        self.blocked_url_patterns = []
+        self.performance_log = []
+        self._next_request = 0
+        self._scripts = {
+            "return 1": lambda driver, *args: 1,
+            "return document.readyState": lambda driver, *args: "complete",
+            "return document.title": lambda driver, *args: driver._document.title,
+            "window.localStorage.clear(); window.sessionStorage.clear();": lambda driver, *args: driver._clear_storage(),
+            READ_LOCAL_STORAGE_SCRIPT: lambda driver: dict(driver.local_storage.get(driver.base_url, {})),
+            WRITE_LOCAL_STORAGE_SCRIPT: lambda driver, state: driver.local_storage.setdefault(driver.base_url, {}).update(state),
+        }
+        self._async_scripts = {
+            base_page.FIRST_VISIBLE_SCRIPT: SimulatedDriver._first_visible,
+            base_page.ACTION_SCRIPT: SimulatedDriver._perform_action,
+        }
+
+    # Scenario scripting
+
+    def rewrite(self, path_fragment, old, new):
+        """
+        Replace text in every page whose path contains path_fragment before it is parsed.
+
+        Used to script failure paths: rename an id so the ALT locator has to win,
+        drop a button so an action fails, or hide an element.
+        """
+        self.rewrites.append((path_fragment, old, new))
+
+    def register_script(self, source, handler, asynchronous=False):
+        """Teach the driver a script; handler receives (driver, *args) and returns the script result."""
+        (self._async_scripts if asynchronous else self._scripts)[source] = handler
+
+    # Command layer
+
+    def execute(self, driver_command, params=None):
+        """Run one command; the single entry point wrapped by WireCallCounter, as on a real driver."""
+        params = params or {}
+        self.commands.append(driver_command)
+        if self.latency:
+            time.sleep(self.latency)
+        handler = getattr(self, f"_command_{driver_command}", None)
+        if handler is None:
+            raise NotImplementedError(f"Simulated driver does not implement {driver_command}")
+        return {"value": handler(params)}
+
+    def _command_get(self, params):
+        self._navigate("GET", params["url"])
+
+    def _command_getCurrentUrl(self, params):
+        return self._document.url
+
+    def _command_getTitle(self, params):
+        return self._document.title
+
+    def _command_getPageSource(self, params):
+        return self._document.source
+
+    def _command_findElement(self, params):
+        nodes = self._find(self._document.root, params["using"], params["value"])
+        if not nodes:
+            raise NoSuchElementException(f"Unable to locate element: {params['value']}")
+        return self._wrap(nodes[0])
+
+    def _command_findElements(self, params):
+        return [self._wrap(node) for node in self._find(self._document.root, params["using"], params["value"])]
+
+    def _command_findChildElement(self, params):
+        nodes = self._find(self._node(params["id"]), params["using"], params["value"])
+        if not nodes:
+            raise NoSuchElementException(f"Unable to locate element: {params['value']}")
+        return self._wrap(nodes[0])
+
+    def _command_findChildElements(self, params):
+        return [self._wrap(node) for node in self._find(self._node(params["id"]), params["using"], params["value"])]
+
+    def _command_getElementTagName(self, params):
+        return self._node(params["id"]).tag
+
+    def _command_getElementText(self, params):
+        return self._node(params["id"]).rendered_text()
+
+    def _command_getElementAttribute(self, params):
+        node = self._node(params["id"])
+        if params["name"] == "value":
+            return node.value
+        return node.attrs.get(params["name"])
+
+    def _command_isElementDisplayed(self, params):
+        return self._node(params["id"]).is_displayed()
+
+    def _command_isElementEnabled(self, params):
+        return self._node(params["id"]).is_enabled()
+
+    def _command_clickElement(self, params):
+        self._click(self._node(params["id"]))
+
+    def _command_clearElement(self, params):
+        self._node(params["id"]).value = ""
+
+    def _command_sendKeysToElement(self, params):
+        node = self._node(params["id"])
+        text = params["text"]
+        submit = any(key in text for key in SUBMIT_KEYS)
+        for key in SUBMIT_KEYS:
+            text = text.replace(key, "")
+        node.value += text
+        if submit and node.form() is not None:
+            self._submit(node.form())
+
+    def _command_w3cExecuteScript(self, params):
+        return self._run_script(self._scripts, params["script"], params["args"])
+
+    def _command_w3cExecuteScriptAsync(self, params):
+        return self._run_script(self._async_scripts, params["script"], params["args"])
+
+    def _command_setTimeouts(self, params):
+        return None
+
+    def _command_screenshot(self, params):
+        return SCREENSHOT_PNG
+
+    def _command_getCookies(self, params):
+        return [{"name": name, "value": value, "path": "/", "domain": urlparse(self.base_url).hostname}
+                for name, value in self.cookies.items()]
+
+    def _command_addCookie(self, params):
+        cookie = params["cookie"]
+        self.cookies[cookie["name"]] = cookie["value"]
+
+    def _command_deleteCookie(self, params):
+        self.cookies.pop(params["name"], None)
+
+    def _command_deleteAllCookies(self, params):
+        self.cookies.clear()
+
+    def _command_refresh(self, params):
+        self._navigate("GET", self._document.url)
+
+    def _command_switchToWindow(self, params):
+        return None
+
+    def _command_close(self, params):
+        return None
+
+    def _command_quit(self, params):
+        self._elements.clear()
+
+    def _command_executeCdpCommand(self, params):
+        if params["cmd"] == "Network.setBlockedURLs":
+            cmd_args = params["params"]
+            if "urlPatterns" in cmd_args:
+                self.blocked_url_patterns = [(rule["urlPattern"], rule["block"]) for rule in cmd_args["urlPatterns"]]
+            else:
+                self.blocked_url_patterns = [(pattern, True) for pattern in cmd_args["urls"]]
+        return {}
+
+    def _command_getLog(self, params):
+        if params["type"] != "performance":
+            return []
+        entries, self.performance_log = self.performance_log, []
+        return entries
+
+    # Selenium-compatible API
+
+    def get(self, url):
+        self.execute(Command.GET, {"url": url})
+
+    @property
+    def current_url(self):
+        return self.execute(Command.GET_CURRENT_URL)["value"]
+
+    @property
+    def title(self):
+        return self.execute(Command.GET_TITLE)["value"]
+
+    @property
+    def page_source(self):
+        return self.execute(Command.GET_PAGE_SOURCE)["value"]
+
+    def find_element(self, by=By.ID, value=None):
+        return self.execute(Command.FIND_ELEMENT, {"using": by, "value": value})["value"]
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.execute(Command.FIND_ELEMENTS, {"using": by, "value": value})["value"]
+
+    def execute_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT, {"script": script, "args": list(args)})["value"]
+
+    def execute_async_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT_ASYNC, {"script": script, "args": list(args)})["value"]
+
+    def set_script_timeout(self, time_to_wait):
+        self.execute(Command.SET_TIMEOUTS, {"script": int(time_to_wait * 1000)})
+
+    def implicitly_wait(self, time_to_wait):
+        self.execute(Command.SET_TIMEOUTS, {"implicit": int(time_to_wait * 1000)})
+
+    def get_screenshot_as_png(self):
+        return self.execute(Command.SCREENSHOT)["value"]
+
+    def get_screenshot_as_file(self, filename):
+        with open(filename, "wb") as f:
+            f.write(self.get_screenshot_as_png())
+        return True
+
+    save_screenshot = get_screenshot_as_file
+
+    def get_cookies(self):
+        return self.execute(Command.GET_ALL_COOKIES)["value"]
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+    def get_log(self, log_type):
+        return self.execute(Command.GET_LOG, {"type": log_type})["value"]
+
+    def get_cookie(self, name):
+        return next((cookie for cookie in self.get_cookies() if cookie["name"] == name), None)
+
+    def add_cookie(self, cookie_dict):
+        self.execute(Command.ADD_COOKIE, {"cookie": cookie_dict})
+
+    def delete_cookie(self, name):
+        self.execute(Command.DELETE_COOKIE, {"name": name})
+
+    def delete_all_cookies(self):
+        self.execute(Command.DELETE_ALL_COOKIES)
+
+    def refresh(self):
+        self.execute(Command.REFRESH)
+
+    def close(self):
+        self.execute(Command.CLOSE)
+
+    def quit(self):
+        self.execute(Command.QUIT)
+
+    # Internals
+
+    def _wrap(self, node):
+        self._next_element += 1
+        element_id = f"element-{self._next_element}"
+        self._elements[element_id] = node
+        return SimulatedElement(self, element_id)
+
+    def _node(self, element_id):
+        node = self._elements.get(element_id)
+        if node is None or node.document is not self._document:
+            raise StaleElementReferenceException(f"Element {element_id} is no longer attached to the page")
+        return node
+
+    def _find(self, context, by, value):
+        return compile_xpath(to_xpath(by, value))(context)
+
+    def _navigate(self, method, url, form=None):
+        url = urljoin(self._document.url if self._document.url != "about:blank" else self.base_url + "/", url)
+        if url == "about:blank":
+            self._document = parse_document(url, "<html><body></body></html>")
+            return
+        parsed = urlparse(url)
+        self.base_url = f"{parsed.scheme}://{parsed.netloc}"
+        # Follow redirects the way the browser would, switching to GET after a POST
+        for _ in range(10):
+            target = parsed.path or "/"
+            if parsed.query:
+                target += f"?{parsed.query}"
+            response = self.app.handle(method, target, dict(self.cookies), form)
+            for name, value in response.cookies.items():
+                if value is None:
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = value
+            if response.status in (301, 302, 303) and response.location:
+                url = urljoin(url, response.location)
+                parsed = urlparse(url)
+                method, form = "GET", None
+                continue
+            break
+        body = response.body
+        for fragment, old, new in self.rewrites:
+            if fragment in parsed.path:
+                body = body.replace(old, new)
+        self._document = parse_document(url, body)
+        self._load_subresources()
+
+    def _log_network_event(self, method, **params):
+        message = {"message": {"method": f"Network.{method}", "params": dict(params, timestamp=time.monotonic())}}
+        self.performance_log.append({"level": "INFO", "message": json.dumps(message), "timestamp": int(time.time() * 1000)})
+
+    def _load_subresources(self):
+        # Scripts, preloads and images are requested the way Chrome would, honouring the DevTools
+        # block rules; other origins are unreachable, as for an offline browser
+        for node in self._document.root.descendants():
+            reference = node.attrs.get("href") if node.tag == "link" else node.attrs.get("src")
+            if node.tag not in ("script", "link", "img") or not reference or reference.startswith("data:"):
+                continue
+            url = urljoin(self._document.url, reference)
+            self._next_request += 1
+            request_id = str(self._next_request)
+            self._log_network_event("requestWillBeSent", requestId=request_id, request={"url": url})
+            if next((block for pattern, block in self.blocked_url_patterns if matches(pattern, url)), False):
+                self._log_network_event("loadingFailed", requestId=request_id, blockedReason=INSPECTOR_BLOCKED)
+                continue
+            parsed = urlparse(url)
+            if f"{parsed.scheme}://{parsed.netloc}" != self.base_url:
+                self._log_network_event("loadingFailed", requestId=request_id, errorText="net::ERR_NAME_NOT_RESOLVED")
+                continue
+            target = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+            response = self.app.handle("GET", target, dict(self.cookies))
+            self._log_network_event("loadingFinished", requestId=request_id, encodedDataLength=len(response.body.encode()))
+
+    def _click(self, node):
+        if node.tag == "a" and node.attrs.get("href"):
+            self._navigate("GET", node.attrs["href"])
+            return
+        is_submit = (node.tag == "input" and node.attrs.get("type", "").lower() in ("submit", "image")) or (
+            node.tag == "button" and node.attrs.get("type", "submit").lower() == "submit"
+        )
+        if is_submit and node.is_enabled() and node.form() is not None:
+            self._submit(node.form(), submitter=node)
+
+    def _submit(self, form, submitter=None):
+        fields = {}
+        for node in form.descendants():
+            name = node.attrs.get("name")
+            if not name or not node.is_enabled() or node.tag not in ("input", "select", "textarea", "button"):
+                continue
+            kind = node.attrs.get("type", "").lower()
+            if kind in ("submit", "image", "button", "reset") or node.tag == "button":
+                if node is not submitter:
+                    continue
+            if kind in ("checkbox", "radio") and "checked" not in node.attrs:
+                continue
+            fields[name] = node.value
+        action = form.attrs.get("action") or self._document.url
+        if form.attrs.get("method", "get").lower() == "post":
+            self._navigate("POST", action, fields)
+        else:
+            self._navigate("GET", f"{action.split('?')[0]}?{urlencode(fields)}")
+
+    def _run_script(self, scripts, source, args):
+        handler = scripts.get(source)
+        if handler is None:
+            raise JavascriptException(f"Simulated driver cannot run script: {source.strip()[:80]}")
+        args = [self._node(arg.id) if isinstance(arg, SimulatedElement) else arg for arg in args]
+        return handler(self, *args)
+
+    def _clear_storage(self):
+        self.local_storage.pop(self.base_url, None)
+
+    def _first_visible(self, candidates, timeout_ms, poll_ms):
+        for index, xpath in enumerate(candidates):
+            try:
+                nodes = compile_xpath(xpath)(self._document.root)
+            except InvalidSelectorException:
+                continue
+            for node in nodes:
+                if node.is_displayed():
+                    return [index, self._wrap(node)]
+        return [-1, None]
+
+    def _perform_action(self, xpath, action, value, timeout_ms, poll_ms, native_events):
+        try:
+            nodes = compile_xpath(xpath)(self._document.root)
+        except InvalidSelectorException:
+            nodes = []
+        node = nodes[0] if nodes else None
+        status = "missing" if node is None else "not visible" if not node.is_displayed() else "not enabled" if not node.is_enabled() else None
+        if status:
+            return [status, None]
+        element = self._wrap(node)
+        if native_events:
+            return ["ready", element]
+        if action == "click":
+            self._click(node)
+        else:
+            node.value = value
+            if action == "type_submit":
+                if node.form() is None:
+                    return ["ready", element]
+                self._submit(node.form())
+        return ["done", element]
+
+
+class VirtualClock:
+    """Monotonic clock whose sleep advances time instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@contextmanager
+def virtual_waits():
+    """
+    Run WebDriverWait polls against a VirtualClock.
+
+    The simulated DOM only changes in response to commands, so a wait that is not
+    satisfied on its first poll never will be; under this context such waits
+    time out immediately instead of sleeping for their full ceiling.
+    """
+    from selenium.webdriver.support import wait
+
+    original = wait.time
+    wait.time = VirtualClock()
+    try:
+        yield wait.time
+    finally:
+        wait.time = original
@@ -0,0 +1,180 @@
+"""
+Cache of authenticated browser storage state, so repeated cases skip the UI login.
+
+After the first successful login the flow captures the browser's cookies and
+localStorage. The entry is keyed by account and base URL and expires after a
+TTL, or sooner if one of the captured cookies does. Later sessions inject the
+state before the flow navigates, so the store already knows the customer when
+checkout is reached. If the store no longer honours the state, the entry is
+dropped and the flow logs in through the UI again.
+
+The cache file holds live session cookies: it is written with owner-only
+permissions and must never be committed or shared.
+"""
+import json
+import os
+import threading
+import time
+
+import allure
+
+# Cookies that describe the visitor's cart rather than the login; restoring them
+# would carry one case's cart into the next
+CART_COOKIES = ("cart", "cart_sig", "cart_ts", "cart_ver", "cart_currency")
+
+# A tiny same-origin document: WebDriver only accepts cookies and storage for the
+# origin currently loaded, and this avoids paying for a full storefront page
+LANDING_PATH = "/robots.txt"
+
+READ_LOCAL_STORAGE_SCRIPT = """
+var state = {};
+for (var i = 0; i < window.localStorage.length; i++) {
+    var key = window.localStorage.key(i);
+    state[key] = window.localStorage.getItem(key);
+}
+return state;
+"""
+
+WRITE_LOCAL_STORAGE_SCRIPT = """
+var state = arguments[0];
+for (var key in state) {
+    window.localStorage.setItem(key, state[key]);
+}
+"""
+
+
+class StorageStateCache:
+    """
+    Stores cookies and localStorage per (account, base URL) with a time-to-live.
+
+    Entries are persisted to a JSON file so the saving carries across runs and
+    parallel workers; a missing, expired or rejected entry simply means the
+    flow performs the UI login and captures a fresh one.
+    """
+
+    DEFAULT_PATH = ".storage_state.json"
+    DEFAULT_TTL = 30 * 60
+
+    _shared = None
+
+    def __init__(self, path=None, ttl=None, excluded_cookies=CART_COOKIES):
+        self.path = path or os.environ.get("STORAGE_STATE_PATH", self.DEFAULT_PATH)
+        self.ttl = float(os.environ.get("STORAGE_STATE_TTL", self.DEFAULT_TTL)) if ttl is None else ttl
+        self.excluded_cookies = set(excluded_cookies)
+        self.stats = {"captured": 0, "restored": 0, "missed": 0, "expired": 0, "rejected": 0}
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    @classmethod
+    def shared(cls):
+        """Return the process-wide cache used by the flows."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @staticmethod
+    def key(account, base_url):
+        return f"{base_url.rstrip('/')}|{account}"
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        # Write-then-rename so concurrent workers never leave a truncated file behind
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def get(self, account, base_url, now=None):
+        """
+        Return the cached state for an account if it is still valid.
+
+        Returns:
+            dict or None: Entry with cookies, local_storage, captured_at and expires_at
+        """
+        now = time.time() if now is None else now
+        key = self.key(account, base_url)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["missed"] += 1
+                return None
+            if entry["expires_at"] <= now:
+                self.stats["expired"] += 1
+                del self.entries[key]
+                self.save()
+                return None
+            return entry
+
+    def capture(self, driver, account, base_url, now=None):
+        """
+        Record the browser's current cookies and localStorage for an account.
+
+        Args:
+            driver: WebDriver whose current page belongs to base_url
+            account (str): Account the browser is logged in as
+            base_url (str): Storefront root URL
+
+        Returns:
+            dict: The stored entry
+        """
+        now = time.time() if now is None else now
+        cookies = [cookie for cookie in driver.get_cookies() if cookie["name"] not in self.excluded_cookies]
+        try:
+            local_storage = driver.execute_script(READ_LOCAL_STORAGE_SCRIPT) or {}
+        except Exception:
+            local_storage = {}
+        expires_at = now + self.ttl
+        # A cookie that expires before the TTL ends the entry's validity with it
+        cookie_expiries = [cookie["expiry"] for cookie in cookies if cookie.get("expiry")]
+        if cookie_expiries:
+            expires_at = min(expires_at, min(cookie_expiries))
+        entry = {"cookies": cookies, "local_storage": local_storage, "captured_at": now, "expires_at": expires_at}
+        with self._lock:
+            self.entries[self.key(account, base_url)] = entry
+            self.stats["captured"] += 1
+            self.save()
+        print(f"Captured storage state for {account} ({len(cookies)} cookies, valid {expires_at - now:.0f}s)")
+        return entry
+
+    def restore(self, driver, account, base_url):
+        """
+        Inject the cached state into the browser before the flow's first navigation.
+
+        Returns:
+            bool: True if a valid entry was injected, False if the UI login is needed
+        """
+        entry = self.get(account, base_url)
+        if entry is None:
+            return False
+        driver.get(f"{base_url.rstrip('/')}{LANDING_PATH}")
+        for cookie in entry["cookies"]:
+            # Domain and sameSite as captured can be rejected by add_cookie; the current origin applies
+            driver.add_cookie({k: v for k, v in cookie.items() if k in ("name", "value", "path", "secure", "httpOnly", "expiry")})
+        if entry["local_storage"]:
+            driver.execute_script(WRITE_LOCAL_STORAGE_SCRIPT, entry["local_storage"])
+        with self._lock:
+            self.stats["restored"] += 1
+        print(f"Restored storage state for {account}")
+        return True
+
+    def invalidate(self, account, base_url):
+        """Drop an entry the store no longer honours."""
+        with self._lock:
+            if self.entries.pop(self.key(account, base_url), None) is not None:
+                self.stats["rejected"] += 1
+                self.save()
+        print(f"Cached storage state for {account} was rejected; falling back to UI login")
+
+    def report(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def attach_report(self, name="storage_state"):
+        allure.attach(json.dumps(self.report(), indent=2), name=name, attachment_type=allure.attachment_type.JSON)
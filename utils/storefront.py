@@ -0,0 +1,483 @@
+"""
+Local stand-in for the Sauce demo Shopify storefront.
+
+Serves the DOM contract the page objects rely on (search field, product links,
+add-to-cart form, cart drawer link, checkout button, customer login and
+registration forms) so flows can run offline and be benchmarked reproducibly.
+
+    python -m utils.storefront --port 8000 --latency 0.05
+    BASE_URL=http://127.0.0.1:8000 python -m pytest -q
+"""
+import argparse
+import html
+import json
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+# The cart and the customer login live in separate cookies, as on Shopify
+CART_COOKIE = "cart"
+CUSTOMER_COOKIE = "customer_session"
+
+PRODUCTS = {
+    "grey-jacket": {"title": "Grey jacket", "price": "55.00", "variant_id": 39001},
+    "noir-jacket": {"title": "Noir jacket", "price": "60.00", "variant_id": 39002},
+    "striped-top": {"title": "Striped top", "price": "50.00", "variant_id": 39003},
+    "black-heels": {"title": "Black heels", "price": "45.00", "variant_id": 39004},
+    "bronze-sandals": {"title": "Bronze sandals", "price": "39.99", "variant_id": 39005},
+    "brown-shades": {"title": "Brown shades", "price": "20.00", "variant_id": 39006},
+}
+# Like Shopify, carts are filled by variant id rather than product handle
+VARIANTS = {product["variant_id"]: handle for handle, product in PRODUCTS.items()}
+
+
+def search_products(term):
+    """Return (handle, product) pairs whose title contains every word of the term."""
+    words = term.lower().split()
+    return [
+        (handle, product)
+        for handle, product in PRODUCTS.items()
+        if words and all(word in product["title"].lower() for word in words)
+    ]
+
+
+def json_response(data, status=200):
+    return Response(status, json.dumps(data), content_type="application/json; charset=utf-8")
+
+# Stand-ins for the web font and Shopify analytics script every page of the real store pulls in;
+# none of the assertions read them, which makes them the default request-blocking targets
+ASSETS = {
+    "/cdn/fonts/futura_n4.woff2": ("font/woff2", "\0" * 32 * 1024),
+    "/cdn/shopifycloud/trekkie.storefront.min.js": ("application/javascript", "/* analytics */" + " " * 64 * 1024),
+}
+
+LAYOUT = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title} - Sauce Demo (stand-in)</title>
+<link rel="preload" href="/cdn/fonts/futura_n4.woff2" as="font" type="font/woff2" crossorigin>
+<script src="/cdn/shopifycloud/trekkie.storefront.min.js" async></script>
+</head>
+<body>
+<header>
+  <ul id="customer-links">{customer_links}</ul>
+  <form action="/search" method="get" class="search">
+    <input type="text" id="search-field" name="q" value="{query}">
+    <button type="submit" class="search-button" aria-label="Search">Search</button>
+  </form>
+  <a href="/cart" class="toggle-drawer cart">My Cart <span id="cart-target-desktop"><span>({cart_count})</span></span></a>
+</header>
+<main>
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+class StorefrontState:
+    """In-memory carts, customer logins and accounts shared by all request threads."""
+
+    def __init__(self, accounts=None):
+        # None accepts any non-empty credentials, which is what benchmarks want
+        self.accounts = dict(accounts) if accounts is not None else None
+        self.carts = {}
+        self.customers = {}
+        self.lock = threading.Lock()
+
+    def cart(self, token):
+        with self.lock:
+            return self.carts.setdefault(token, {})
+
+    def customer(self, token):
+        with self.lock:
+            return self.customers.get(token)
+
+    def log_in(self, email):
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.customers[token] = email
+        return token
+
+    def log_out(self, token):
+        with self.lock:
+            self.customers.pop(token, None)
+
+    def authenticate(self, email, password):
+        if not email or not password:
+            return False
+        if self.accounts is None:
+            return True
+        return self.accounts.get(email) == password
+
+    def register(self, email, password):
+        if self.accounts is not None:
+            with self.lock:
+                self.accounts[email] = password
+
+
+class Response:
+    """What the storefront answers to one request, independent of how it is transported."""
+
+    def __init__(self, status, body="", content_type="text/html; charset=utf-8", location=None):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.location = location
+        # Cookie name -> value to set; None expires the cookie
+        self.cookies = {}
+
+
+class StorefrontApp:
+    """
+    Routes requests to storefront views without any networking.
+
+    The HTTP server and the simulated WebDriver both drive the same app, so
+    offline tests and the in-process driver see an identical DOM contract.
+    """
+
+    def __init__(self, accounts=None):
+        """
+        Args:
+            accounts (dict): email -> password accepted at login; None accepts any credentials
+        """
+        self.state = StorefrontState(accounts)
+
+    def handle(self, method, target, cookies=None, form=None):
+        """
+        Answer one request.
+
+        Args:
+            method (str): "GET" or "POST"
+            target (str): Path and query string, e.g. "/search?q=jacket"
+            cookies (dict): Cookie name -> value sent by the client
+            form (dict): Decoded form fields of a POST
+
+        Returns:
+            Response: Status, body, redirect location and cookies to set
+        """
+        cookies = cookies or {}
+        cart_token = cookies.get(CART_COOKIE)
+        new_cart_token = None
+        if not cart_token:
+            cart_token = new_cart_token = secrets.token_hex(16)
+        customer_token = cookies.get(CUSTOMER_COOKIE)
+        customer = self.state.customer(customer_token) if customer_token else None
+        session = {"cart": self.state.cart(cart_token), "customer": customer}
+
+        url = urlparse(target)
+        path = url.path.rstrip("/") or "/"
+        if method == "POST":
+            response = self._post(session, path, form or {})
+        else:
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            response = self._get(session, path, query)
+
+        if new_cart_token:
+            response.cookies[CART_COOKIE] = new_cart_token
+        if session["customer"] != customer:
+            if customer_token:
+                self.state.log_out(customer_token)
+            response.cookies[CUSTOMER_COOKIE] = self.state.log_in(session["customer"]) if session["customer"] else None
+        return response
+
+    # Routes
+
+    def _get(self, session, path, query):
+        if path == "/":
+            items = "".join(
+                f'<li><a href="/products/{handle}">{html.escape(p["title"])}</a></li>' for handle, p in PRODUCTS.items()
+            )
+            return self._page(session, "Home", f'<h1>Sauce Demo</h1><ul class="featured">{items}</ul>')
+        if path in ASSETS:
+            content_type, body = ASSETS[path]
+            return Response(200, body, content_type=content_type)
+        if path == "/robots.txt":
+            return Response(200, "User-agent: *\nDisallow: /checkout\n", content_type="text/plain; charset=utf-8")
+        if path == "/search":
+            return self._search(session, query.get("q", ""))
+        if path == "/search/suggest.json":
+            products = [
+                {"handle": handle, "title": product["title"], "url": f"/products/{handle}"}
+                for handle, product in search_products(query.get("q", ""))
+            ]
+            return json_response({"resources": {"results": {"products": products}}})
+        if path.startswith("/products/") and path.endswith(".js"):
+            return self._product_json(path.split("/")[-1][:-len(".js")])
+        if path.startswith("/products/"):
+            return self._product(session, path.split("/")[-1])
+        if path == "/cart.js":
+            return json_response(self._cart_json(session))
+        if path == "/cart":
+            return self._cart(session)
+        if path == "/checkout":
+            return self._checkout(session)
+        if path == "/account/login":
+            return self._login_form(session, query.get("checkout_url", "/account"))
+        if path == "/account/register":
+            return self._register_form(session)
+        if path == "/account":
+            return self._account(session)
+        if path == "/account/logout":
+            session["customer"] = None
+            return Response(302, location="/")
+        return Response(404, "<h1>404 Page Not Found</h1>")
+
+    def _post(self, session, path, form):
+        if path in ("/cart/add", "/cart/add.js"):
+            handle = self._add_to_cart(session, form)
+            if path == "/cart/add.js":
+                if handle is None:
+                    return json_response({"status": 404, "description": "Cannot find variant"}, status=404)
+                return json_response(self._line_item(handle, session["cart"][handle]))
+            if handle is None:
+                return Response(404, "<h1>Product not found</h1>")
+            return Response(302, location="/cart")
+        if path == "/account/login":
+            if self.state.authenticate(form.get("customer[email]"), form.get("customer[password]")):
+                session["customer"] = form["customer[email]"]
+                return Response(302, location=form.get("checkout_url") or "/account")
+            return self._login_form(session, form.get("checkout_url", "/account"), error="Incorrect email or password.")
+        if path == "/account":
+            email, password = form.get("customer[email]"), form.get("customer[password]")
+            if not email or not password:
+                return self._register_form(session, error="Email and password can't be blank.")
+            self.state.register(email, password)
+            session["customer"] = email
+            return Response(302, location="/account")
+        return Response(404, "<h1>404 Page Not Found</h1>")
+
+    # Cart
+
+    @staticmethod
+    def _add_to_cart(session, form):
+        try:
+            handle = VARIANTS.get(int(form.get("id", "")))
+        except ValueError:
+            handle = None
+        if handle is None:
+            return None
+        session["cart"][handle] = session["cart"].get(handle, 0) + int(form.get("quantity", 1))
+        return handle
+
+    @staticmethod
+    def _line_item(handle, quantity):
+        product = PRODUCTS[handle]
+        return {"id": product["variant_id"], "handle": handle, "title": product["title"], "quantity": quantity}
+
+    def _cart_json(self, session):
+        items = [self._line_item(handle, quantity) for handle, quantity in session["cart"].items()]
+        return {"item_count": sum(session["cart"].values()), "items": items}
+
+    def _product_json(self, handle):
+        product = PRODUCTS.get(handle)
+        if product is None:
+            return json_response({"status": 404, "description": "Not Found"}, status=404)
+        variant = {"id": product["variant_id"], "title": "Default Title", "price": product["price"], "available": True}
+        return json_response({"handle": handle, "title": product["title"], "variants": [variant]})
+
+    # Views
+
+    def _page(self, session, title, body, query=""):
+        if session["customer"]:
+            links = '<li><a href="/account">Account</a></li><li><a href="/account/logout">Log Out</a></li>'
+        else:
+            links = (
+                '<li><a href="/account/login" class="customer-login">Log in</a></li>'
+                '<li><a href="/account/register" class="customer-register">Sign up</a></li>'
+            )
+        content = LAYOUT.format(
+            title=html.escape(title),
+            customer_links=links,
+            query=html.escape(query),
+            cart_count=sum(session["cart"].values()),
+            body=body,
+        )
+        return Response(200, content)
+
+    def _search(self, session, term):
+        matches = search_products(term)
+        results = "".join(
+            f'<div class="product-card"><a id="product-{index}" href="/products/{handle}">'
+            f'{html.escape(product["title"])}</a></div>'
+            for index, (handle, product) in enumerate(matches, start=1)
+        )
+        body = f"<h1>Search results for &quot;{html.escape(term)}&quot;</h1>{results or '<p>No results</p>'}"
+        return self._page(session, "Search", body, query=term)
+
+    def _product(self, session, handle):
+        product = PRODUCTS.get(handle)
+        if product is None:
+            return Response(404, "<h1>Product not found</h1>")
+        body = f"""<div class="product">
+  <img id="feature-image" src="data:image/gif;base64,R0lGODlhAQABAAAAACw=" width="300" height="300" alt="{html.escape(product['title'])}">
+  <h1>{html.escape(product['title'])}</h1>
+  <p class="price">&pound;{product['price']}</p>
+  <form action="/cart/add" method="post">
+    <input type="hidden" name="id" value="{product['variant_id']}">
+    <input type="submit" id="add" value="Add to Cart">
+  </form>
+</div>"""
+        return self._page(session, product["title"], body)
+
+    def _cart(self, session):
+        rows = "".join(
+            f'<tr><td>{html.escape(PRODUCTS[handle]["title"])}</td><td class="quantity">{quantity}</td></tr>'
+            for handle, quantity in session["cart"].items()
+        )
+        body = f'<h1>My Cart</h1><table id="cart-items">{rows}</table><a class="checkout" href="/checkout">Check Out</a>'
+        return self._page(session, "Cart", body)
+
+    def _checkout(self, session):
+        if session["customer"]:
+            status = f'<div class="customer-account">Logged in as {html.escape(session["customer"])}</div>'
+        else:
+            status = (
+                '<p>Already have an account? '
+                f'<a id="customer_login_link" href="/account/login?checkout_url={quote("/checkout")}">Log in</a></p>'
+            )
+        return self._page(session, "Checkout", f"<h1>Checkout</h1>{status}")
+
+    def _login_form(self, session, checkout_url, error=""):
+        body = f"""<h1>Login</h1>
+<p class="errors">{html.escape(error)}</p>
+<form action="/account/login" method="post" id="customer_login">
+  <input type="hidden" name="checkout_url" value="{html.escape(checkout_url)}">
+  <input type="email" id="customer_email" name="customer[email]">
+  <input type="password" id="customer_password" name="customer[password]">
+  <input type="submit" value="Sign In">
+</form>"""
+        return self._page(session, "Login", body)
+
+    def _register_form(self, session, error=""):
+        body = f"""<h1>Create Account</h1>
+<p class="errors">{html.escape(error)}</p>
+<form action="/account" method="post" id="create_customer">
+  <input type="text" id="first_name" name="customer[first_name]">
+  <input type="text" id="last_name" name="customer[last_name]">
+  <input type="email" id="email" name="customer[email]">
+  <input type="password" id="password" name="customer[password]">
+  <input type="submit" value="Create">
+</form>"""
+        return self._page(session, "Create Account", body)
+
+    def _account(self, session):
+        if not session["customer"]:
+            return Response(302, location="/account/login")
+        body = f'<div class="customer-account"><h1>My Account</h1><p>Welcome {html.escape(session["customer"])}</p></div>'
+        return self._page(session, "Account", body)
+
+
+class StorefrontHandler(BaseHTTPRequestHandler):
+    server_version = "SauceDemoStandIn/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        cookies = {name: morsel.value for name, morsel in SimpleCookie(self.headers.get("Cookie", "")).items()}
+        form = None
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            data = self.rfile.read(length).decode("utf-8") if length else ""
+            form = {key: values[0] for key, values in parse_qs(data).items()}
+        response = self.server.app.handle(method, self.path, cookies, form)
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        payload = response.body.encode("utf-8")
+        self.send_response(response.status)
+        for name, value in response.cookies.items():
+            if value is None:
+                self.send_header("Set-Cookie", f"{name}=; Path=/; Max-Age=0")
+            else:
+                self.send_header("Set-Cookie", f"{name}={value}; Path=/; HttpOnly")
+        if response.location:
+            self.send_header("Location", response.location)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class StorefrontServer:
+    """
+    Runs the stand-in storefront on a background thread.
+
+    Use as a context manager; base_url is ready to hand to the page objects.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, accounts=None, verbose=False, app=None):
+        """
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind; 0 picks a free one
+            latency (float): Seconds added to every response to mimic the real store
+            accounts (dict): email -> password accepted at login; None accepts any credentials
+            verbose (bool): Log every request to stderr
+            app (StorefrontApp): App to serve, e.g. one a SimulatedDriver also drives; built from accounts if omitted
+        """
+        self.httpd = ThreadingHTTPServer((host, port), StorefrontHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.verbose = verbose
+        self.httpd.app = app if app is not None else StorefrontApp(accounts)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def app(self):
+        return self.httpd.app
+
+    @property
+    def state(self):
+        return self.httpd.app.state
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="storefront", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the offline stand-in storefront")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    server = StorefrontServer(args.host, args.port, latency=args.latency, verbose=args.verbose)
+    print(f"Stand-in storefront listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()